@@ -0,0 +1,41 @@
+"""
+Micro-benchmark of the behaviour descriptors used by the DIAYN discriminator.
+
+Usage: python scripts/benchmark_behaviour_functions.py --batch-size 256 --device cuda
+"""
+import argparse
+import timeit
+
+import numpy as np
+import torch as th
+
+from stable_baselines3.common.behaviour_functions import behaviour_registry
+
+FUNCTION_KWARGS = {"discretize_xy": dict(dims=[10, 10], min_values=[-1, -1], max_values=[1, 1])}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--obs-dim", type=int, default=158)
+    parser.add_argument("--n-repeats", type=int, default=1000)
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+
+    obs_numpy = np.random.uniform(-1, 1, size=(args.batch_size, args.obs_dim)).astype(np.float32)
+    obs_torch = th.as_tensor(obs_numpy, device=args.device)
+
+    print(f"{'descriptor':<26} {'numpy (us)':>12} {args.device + ' (us)':>12}")
+    for name, (function, _) in behaviour_registry.items():
+        kwargs = FUNCTION_KWARGS.get(name, {})
+        timings = []
+        for obs in (obs_numpy, obs_torch):
+            # Warmup, builds the cached indices
+            function(obs, **kwargs)
+
+            def run():
+                function(obs, **kwargs)
+                if obs is obs_torch and obs_torch.is_cuda:
+                    th.cuda.synchronize()
+
+            timings.append(timeit.timeit(run, number=args.n_repeats) / args.n_repeats * 1e6)
+        print(f"{name:<26} {timings[0]:>12.2f} {timings[1]:>12.2f}")
@@ -0,0 +1,70 @@
+"""
+Benchmark of a training step of the critics (forward and backward passes),
+comparing ``ContinuousCritic`` (one network per critic) to ``VectorizedContinuousCritic``
+(weights stacked along an ensemble axis).
+
+Usage: python scripts/benchmark_ensemble_critic.py --net-arch 256 256 --n-critics 10 --device cpu
+"""
+import argparse
+import time
+
+import gym
+import numpy as np
+import torch as th
+
+from stable_baselines3.common.policies import ContinuousCritic, VectorizedContinuousCritic
+from stable_baselines3.common.torch_layers import FlattenExtractor
+
+
+def make_critic(critic_class, obs_dim, action_dim, net_arch, n_critics, device):
+    observation_space = gym.spaces.Box(-np.inf, np.inf, (obs_dim,), dtype=np.float32)
+    action_space = gym.spaces.Box(-1, 1, (action_dim,), dtype=np.float32)
+    return critic_class(
+        observation_space,
+        action_space,
+        net_arch,
+        FlattenExtractor(observation_space),
+        obs_dim,
+        n_critics=n_critics,
+        share_features_extractor=False,
+    ).to(device)
+
+
+def benchmark(critic, batch_size, n_steps, device):
+    obs = th.randn(batch_size, critic.observation_space.shape[0], device=device)
+    actions = th.rand(batch_size, critic.action_space.shape[0], device=device)
+    target = th.randn(batch_size, 1, device=device)
+
+    def train_step():
+        loss = sum(th.nn.functional.mse_loss(q_values, target) for q_values in critic(obs, actions))
+        critic.zero_grad()
+        loss.backward()
+
+    for _ in range(10):
+        train_step()
+    if device.type == "cuda":
+        th.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        train_step()
+    if device.type == "cuda":
+        th.cuda.synchronize()
+    return (time.perf_counter() - start) / n_steps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--obs-dim", type=int, default=17)
+    parser.add_argument("--action-dim", type=int, default=6)
+    parser.add_argument("--net-arch", type=int, nargs="+", default=[256, 256])
+    parser.add_argument("--n-critics", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-steps", type=int, default=200)
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+
+    device = th.device(args.device)
+    for name, critic_class in [("loop", ContinuousCritic), ("ensemble", VectorizedContinuousCritic)]:
+        critic = make_critic(critic_class, args.obs_dim, args.action_dim, args.net_arch, args.n_critics, device)
+        duration = benchmark(critic, args.batch_size, args.n_steps, device)
+        print(f"{name:>8}: {duration * 1e3:8.2f} ms per step ({args.n_critics} critics)")
@@ -0,0 +1,58 @@
+"""
+Benchmark of the bfloat16 mixed precision mode of the off-policy algorithms:
+training speed and final return, compared to full precision training.
+The returns only tell the accuracy impact apart from the seed variance
+with several seeds and runs long enough for the algorithm to converge.
+
+Usage: python scripts/benchmark_mixed_precision.py --algo sac --env Pendulum-v0 --n-timesteps 10000 --seeds 0 1
+"""
+import argparse
+import time
+
+import numpy as np
+import torch as th
+
+from stable_baselines3 import SAC, TD3
+from stable_baselines3.common.evaluation import evaluate_policy
+
+ALGOS = {"sac": SAC, "td3": TD3}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--algo", type=str, default="sac", choices=list(ALGOS))
+    parser.add_argument("--env", type=str, default="Pendulum-v0")
+    parser.add_argument("--n-timesteps", type=int, default=10000)
+    parser.add_argument("--net-arch", type=int, nargs="+", default=[256, 256])
+    parser.add_argument("--obs-dtype", type=str, default=None, help="Storage dtype of the observations (e.g. float16)")
+    parser.add_argument("--n-eval-episodes", type=int, default=10)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+
+    th.set_num_threads(1)
+    for mixed_precision in [False, True]:
+        durations, returns = [], []
+        for seed in args.seeds:
+            replay_buffer_kwargs = {}
+            if mixed_precision and args.obs_dtype is not None:
+                replay_buffer_kwargs["obs_dtype"] = np.dtype(args.obs_dtype)
+            model = ALGOS[args.algo](
+                "MlpPolicy",
+                args.env,
+                policy_kwargs=dict(net_arch=args.net_arch),
+                replay_buffer_kwargs=replay_buffer_kwargs,
+                mixed_precision=mixed_precision,
+                device=args.device,
+                seed=seed,
+            )
+            start = time.perf_counter()
+            model.learn(args.n_timesteps)
+            durations.append(time.perf_counter() - start)
+            mean_return, _ = evaluate_policy(model, model.get_env(), n_eval_episodes=args.n_eval_episodes)
+            returns.append(mean_return)
+        name = "bf16" if mixed_precision else "fp32"
+        print(
+            f"{name}: {args.n_timesteps / np.mean(durations):7.1f} steps/s, "
+            f"final return {np.mean(returns):8.1f} +/- {np.std(returns):.1f} ({len(args.seeds)} seeds)"
+        )
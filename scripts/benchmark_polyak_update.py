@@ -0,0 +1,64 @@
+"""
+Benchmark of the Polyak update of the target networks, comparing the fused multi-tensor
+implementation of ``polyak_update`` to the previous loop over the parameters.
+
+Usage: python scripts/benchmark_polyak_update.py --net-arch 256 256 --n-critics 2 --device cpu
+"""
+import argparse
+import time
+
+import torch as th
+
+from stable_baselines3.common.utils import polyak_update, zip_strict
+
+
+def loop_polyak_update(params, target_params, tau):
+    """Previous implementation: two operations per parameter."""
+    with th.no_grad():
+        for param, target_param in zip_strict(params, target_params):
+            target_param.data.mul_(1 - tau)
+            th.add(target_param.data, param.data, alpha=tau, out=target_param.data)
+
+
+def make_critic(obs_dim, net_arch, n_critics, device):
+    q_networks = []
+    for _ in range(n_critics):
+        layers, last_dim = [], obs_dim
+        for layer_dim in net_arch:
+            layers += [th.nn.Linear(last_dim, layer_dim), th.nn.ReLU()]
+            last_dim = layer_dim
+        layers.append(th.nn.Linear(last_dim, 1))
+        q_networks.append(th.nn.Sequential(*layers))
+    return th.nn.ModuleList(q_networks).to(device)
+
+
+def benchmark(update_fn, critic, critic_target, n_updates, device):
+    params, target_params = list(critic.parameters()), list(critic_target.parameters())
+    for _ in range(10):
+        update_fn(params, target_params, 0.005)
+    if device.type == "cuda":
+        th.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(n_updates):
+        update_fn(params, target_params, 0.005)
+    if device.type == "cuda":
+        th.cuda.synchronize()
+    return (time.perf_counter() - start) / n_updates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--obs-dim", type=int, default=17)
+    parser.add_argument("--net-arch", type=int, nargs="+", default=[256, 256])
+    parser.add_argument("--n-critics", type=int, default=2)
+    parser.add_argument("--n-updates", type=int, default=2000)
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+
+    device = th.device(args.device)
+    critic = make_critic(args.obs_dim, args.net_arch, args.n_critics, device)
+    critic_target = make_critic(args.obs_dim, args.net_arch, args.n_critics, device)
+    n_params = len(list(critic.parameters()))
+    for name, update_fn in [("loop", loop_polyak_update), ("fused", polyak_update)]:
+        duration = benchmark(update_fn, critic, critic_target, args.n_updates, device)
+        print(f"{name:>5}: {duration * 1e6:8.1f} us per update ({n_params} parameters)")
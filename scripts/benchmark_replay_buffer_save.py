@@ -0,0 +1,76 @@
+"""
+Benchmark of the replay buffer persistence: pickle file compared to the chunked folder format,
+with and without compression. Reports the save and load times, the size on disk
+and the peak memory allocated in addition to the buffer.
+
+Usage: python scripts/benchmark_replay_buffer_save.py --buffer-size 200000 --n-filled 150000 --obs-dim 64 --n-threads 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import gym
+import numpy as np
+
+from stable_baselines3.common.buffers import ReplayBuffer
+from stable_baselines3.common.save_util import load_from_pkl, load_replay_buffer_chunks, save_replay_buffer_chunks, save_to_pkl
+
+
+def disk_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, file_name)) for file_name in os.listdir(path))
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buffer-size", type=int, default=200000)
+    parser.add_argument("--n-filled", type=int, default=150000)
+    parser.add_argument("--obs-dim", type=int, default=64)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--n-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    observation_space = gym.spaces.Box(-np.inf, np.inf, (args.obs_dim,), np.float32)
+    buffer = ReplayBuffer(args.buffer_size, observation_space, gym.spaces.Box(-1, 1, (6,), np.float32))
+    # Smooth trajectories, as produced by physics simulators
+    observations = np.cumsum(np.random.randn(args.n_filled + 1, 1, args.obs_dim).astype(np.float32) * 0.01, axis=0)
+    buffer.observations[: args.n_filled] = observations[:-1]
+    buffer.next_observations[: args.n_filled] = observations[1:]
+    buffer.actions[: args.n_filled] = np.random.uniform(-1, 1, buffer.actions[: args.n_filled].shape)
+    buffer.pos = args.n_filled
+    print(f"Buffer: {sum(array.nbytes for array in buffer._storage_arrays().values()) / 1e6:.0f} MB")
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "replay_buffer.pkl")
+        _, save_time, save_peak = measure(lambda: save_to_pkl(path, buffer))
+        _, load_time, load_peak = measure(lambda: load_from_pkl(path))
+        results = [("pickle", save_time, load_time, disk_size(path), save_peak, load_peak)]
+        for compression in [None, "zlib", "lzma"]:
+            path = os.path.join(tmp_dir, f"replay_buffer_{compression}")
+            _, save_time, save_peak = measure(
+                lambda: save_replay_buffer_chunks(path, buffer, args.chunk_size, compression, args.n_threads)
+            )
+            _, load_time, load_peak = measure(lambda: load_replay_buffer_chunks(path, args.n_threads))
+            results.append((f"chunks ({compression})", save_time, load_time, disk_size(path), save_peak, load_peak))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print(f"{'format':<16} {'save (s)':>9} {'load (s)':>9} {'disk (MB)':>10} {'save peak (MB)':>15} {'load peak (MB)':>15}")
+    for name, save_time, load_time, size, save_peak, load_peak in results:
+        sizes = f"{size / 1e6:10.0f} {save_peak / 1e6:15.0f} {load_peak / 1e6:15.0f}"
+        print(f"{name:<16} {save_time:9.2f} {load_time:9.2f} {sizes}")
@@ -0,0 +1,53 @@
+"""
+Benchmark of the step throughput of SubprocVecEnv with large observations.
+
+Usage: python scripts/benchmark_subproc_vec_env.py --n-envs 16 --obs-shape 84 84 4 --n-envs-per-worker 4
+"""
+import argparse
+import time
+
+import gym
+import numpy as np
+
+from stable_baselines3.common.vec_env import SubprocVecEnv
+
+
+class ConstantEnv(gym.Env):
+    """Environment doing no computation, so that the transport dominates."""
+
+    def __init__(self, obs_shape):
+        self.observation_space = gym.spaces.Box(low=0, high=255, shape=obs_shape, dtype=np.uint8)
+        self.action_space = gym.spaces.Discrete(2)
+        self.obs = self.observation_space.sample()
+
+    def reset(self):
+        return self.obs
+
+    def step(self, action):
+        return self.obs, 0.0, False, {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-envs", type=int, default=16)
+    parser.add_argument("--obs-shape", type=int, nargs="+", default=[84, 84, 4])
+    parser.add_argument("--n-steps", type=int, default=1000)
+    parser.add_argument("--n-envs-per-worker", type=int, default=4)
+    args = parser.parse_args()
+
+    configurations = [
+        dict(),
+        dict(shared_memory=True),
+        dict(n_envs_per_worker=args.n_envs_per_worker),
+        dict(shared_memory=True, n_envs_per_worker=args.n_envs_per_worker),
+    ]
+    for vec_env_kwargs in configurations:
+        vec_env = SubprocVecEnv([lambda: ConstantEnv(tuple(args.obs_shape)) for _ in range(args.n_envs)], **vec_env_kwargs)
+        vec_env.reset()
+        actions = np.zeros(args.n_envs, dtype=np.int64)
+        start_time = time.perf_counter()
+        for _ in range(args.n_steps):
+            vec_env.step(actions)
+        fps = args.n_steps * args.n_envs / (time.perf_counter() - start_time)
+        vec_env.close()
+        print(f"{str(vec_env_kwargs):<50} {fps:>10.0f} steps/s")
@@ -0,0 +1,56 @@
+"""
+Benchmark of the step throughput of DummyVecEnv (sequential and threaded) and SubprocVecEnv
+with an environment releasing the GIL while it steps (as native simulators do).
+
+Usage: python scripts/benchmark_vec_envs.py --n-envs 8 --step-time 0.001 --n-threads 8
+"""
+import argparse
+import time
+
+import gym
+import numpy as np
+
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+
+class SleepEnv(gym.Env):
+    """Environment whose step waits without holding the GIL."""
+
+    def __init__(self, step_time):
+        self.observation_space = gym.spaces.Box(low=-1, high=1, shape=(16,), dtype=np.float32)
+        self.action_space = gym.spaces.Discrete(2)
+        self.step_time = step_time
+        self.obs = self.observation_space.sample()
+
+    def reset(self):
+        return self.obs
+
+    def step(self, action):
+        time.sleep(self.step_time)
+        return self.obs, 0.0, False, {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-envs", type=int, default=8)
+    parser.add_argument("--step-time", type=float, default=0.001)
+    parser.add_argument("--n-threads", type=int, default=8)
+    parser.add_argument("--n-steps", type=int, default=500)
+    args = parser.parse_args()
+
+    configurations = [
+        ("DummyVecEnv", DummyVecEnv, dict()),
+        ("DummyVecEnv (no infos copy)", DummyVecEnv, dict(copy_infos=False)),
+        ("DummyVecEnv (threaded)", DummyVecEnv, dict(n_threads=args.n_threads, copy_infos=False)),
+        ("SubprocVecEnv", SubprocVecEnv, dict()),
+    ]
+    for name, vec_env_class, vec_env_kwargs in configurations:
+        vec_env = vec_env_class([lambda: SleepEnv(args.step_time) for _ in range(args.n_envs)], **vec_env_kwargs)
+        vec_env.reset()
+        actions = np.zeros(args.n_envs, dtype=np.int64)
+        start_time = time.perf_counter()
+        for _ in range(args.n_steps):
+            vec_env.step(actions)
+        fps = args.n_steps * args.n_envs / (time.perf_counter() - start_time)
+        vec_env.close()
+        print(f"{name:<30} {fps:>10.0f} steps/s")
@@ -48,6 +48,9 @@ class A2C(OnPolicyAlgorithm):
     :param seed: Seed for the pseudo random generators
     :param device: Device (cpu, cuda, ...) on which the code should be run.
         Setting it to auto, the code will be run on the GPU if possible.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
     :param _init_setup_model: Whether or not to build the network at the creation of the instance
     """
 
@@ -73,6 +76,8 @@ class A2C(OnPolicyAlgorithm):
         verbose: int = 0,
         seed: Optional[int] = None,
         device: Union[th.device, str] = "auto",
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
         _init_setup_model: bool = True,
     ):
 
@@ -101,6 +106,8 @@ class A2C(OnPolicyAlgorithm):
                 spaces.MultiDiscrete,
                 spaces.MultiBinary,
             ),
+            compile=compile,
+            compile_kwargs=compile_kwargs,
         )
 
         self.normalize_advantage = normalize_advantage
@@ -166,6 +173,8 @@ class A2C(OnPolicyAlgorithm):
 
         self._n_updates += 1
         self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        if self.compile:
+            self.logger.record("train/compile_mode", self.compile_mode, exclude="tensorboard")
         self.logger.record("train/explained_variance", explained_var)
         self.logger.record("train/entropy_loss", entropy_loss.item())
         self.logger.record("train/policy_loss", policy_loss.item())
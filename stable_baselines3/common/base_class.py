@@ -19,23 +19,33 @@ from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.noise import ActionNoise
 from stable_baselines3.common.policies import BasePolicy, get_policy_from_name
 from stable_baselines3.common.preprocessing import check_for_nested_spaces, is_image_space, is_image_space_channels_first
-from stable_baselines3.common.save_util import load_from_zip_file, recursive_getattr, recursive_setattr, save_to_zip_file
+from stable_baselines3.common.save_util import (
+    load_from_file,
+    recursive_getattr,
+    recursive_setattr,
+    save_to_stream_file,
+    save_to_zip_file,
+)
 from stable_baselines3.common.type_aliases import GymEnv, MaybeCallback, Schedule
 from stable_baselines3.common.utils import (
     check_for_correct_spaces,
     get_device,
     get_schedule_fn,
+    safe_mean,
     set_random_seed,
     update_learning_rate,
 )
 from stable_baselines3.common.vec_env import (
     DummyVecEnv,
     VecEnv,
+    VecMonitor,
     VecNormalize,
     VecTransposeImage,
     is_vecenv_wrapped,
     unwrap_vec_normalize,
+    unwrap_vec_wrapper,
 )
+from stable_baselines3.common.vec_env.vec_monitor import EpisodeRecordBuffer
 
 
 def maybe_make_env(env: Union[GymEnv, str, None], verbose: int) -> Optional[GymEnv]:
@@ -80,6 +90,10 @@ class BaseAlgorithm(ABC):
     :param sde_sample_freq: Sample a new noise matrix every n steps when using gSDE
         Default: -1 (only sample at the beginning of the rollout)
     :param supported_action_spaces: The action spaces supported by the algorithm.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()`` (see ``_get_compiled_functions()``), falling back to eager mode
+        when the compilation fails. The mode used is logged as ``train/compile_mode``.
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
     """
 
     def __init__(
@@ -99,6 +113,8 @@ class BaseAlgorithm(ABC):
         use_sde: bool = False,
         sde_sample_freq: int = -1,
         supported_action_spaces: Optional[Tuple[gym.spaces.Space, ...]] = None,
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
     ):
 
         if isinstance(policy, str) and policy_base is not None:
@@ -114,6 +130,8 @@ class BaseAlgorithm(ABC):
         self.env = None  # type: Optional[GymEnv]
         # get VecNormalize object if needed
         self._vec_normalize_env = unwrap_vec_normalize(env)
+        # ``VecMonitor`` wrapper of the env if any, resolved when the env is set
+        self._vec_monitor = None  # type: Optional[VecMonitor]
         self.verbose = verbose
         self.policy_kwargs = {} if policy_kwargs is None else policy_kwargs
         self.observation_space = None  # type: Optional[gym.spaces.Space]
@@ -142,7 +160,11 @@ class BaseAlgorithm(ABC):
         # this is used to update the learning rate
         self._current_progress_remaining = 1
         # Buffers for logging
+        # Note: with a ``VecMonitor``, it only receives the info dicts with extra keys
+        # (the episodes are in ``ep_record_buffer``)
         self.ep_info_buffer = None  # type: Optional[deque]
+        # Episodes recorded by a ``VecMonitor`` wrapper
+        self.ep_record_buffer = None  # type: Optional[EpisodeRecordBuffer]
         self.ep_success_buffer = None  # type: Optional[deque]
         # For logging (and TD3 delayed updates)
         self._n_updates = 0  # type: int
@@ -150,6 +172,10 @@ class BaseAlgorithm(ABC):
         self._logger = None  # type: Logger
         # Whether the user passed a custom logger or not
         self._custom_logger = False
+        # Compiled functions, created when the learning starts
+        self.compile = compile
+        self.compile_kwargs = {} if compile_kwargs is None else compile_kwargs
+        self.compiled_functions = None  # type: Optional[List[utils.CompiledFunction]]
 
         # Create and wrap the env if needed
         if env is not None:
@@ -314,10 +340,12 @@ class BaseAlgorithm(ABC):
             "replay_buffer",
             "rollout_buffer",
             "_vec_normalize_env",
+            "_vec_monitor",
             "_episode_storage",
             "_logger",
             "_custom_logger",
-        ]
+            "compiled_functions",
+        ] + [name for owner, name in self._get_compiled_functions() if owner is self]
 
     def _get_torch_save_params(self) -> Tuple[List[str], List[str]]:
         """
@@ -400,9 +428,11 @@ class BaseAlgorithm(ABC):
         :return:
         """
         self.start_time = time.time()
+        self._vec_monitor = unwrap_vec_wrapper(self.env, VecMonitor)
         if self.ep_info_buffer is None or reset_num_timesteps:
             # Initialize buffers if they don't exist, or reinitialize if resetting counters
             self.ep_info_buffer = deque(maxlen=1000)
+            self.ep_record_buffer = EpisodeRecordBuffer(maxlen=1000)
             self.ep_success_buffer = deque(maxlen=1000)
 
         if self.action_noise is not None:
@@ -433,29 +463,92 @@ class BaseAlgorithm(ABC):
         if not self._custom_logger:
             self._logger = utils.configure_logger(self.verbose, self.tensorboard_log, tb_log_name, reset_num_timesteps)
 
+        if self.compile and self.compiled_functions is None:
+            self._compile()
+
         # Create eval callback if needed
         callback = self._init_callback(callback, eval_env, eval_freq, n_eval_episodes, log_path)
 
         return total_timesteps, callback
 
+    def _get_compiled_functions(self) -> List[Tuple[Any, str]]:
+        """
+        Returns the functions compiled when ``compile=True``,
+        as ``(owner, attribute name)`` pairs. By default, the forward pass of the policy.
+
+        :return: List of the functions to compile
+        """
+        return [(self.policy, "forward")]
+
+    def _compile(self) -> None:
+        """
+        Replace the functions returned by ``_get_compiled_functions()`` by their compiled version.
+        """
+        self.compiled_functions = []
+        for owner, name in self._get_compiled_functions():
+            compiled_function = utils.CompiledFunction(getattr(owner, name), **self.compile_kwargs)
+            setattr(owner, name, compiled_function)
+            self.compiled_functions.append(compiled_function)
+
+    @property
+    def compile_mode(self) -> str:
+        """
+        :return: "compile" when all the compiled functions work, "eager" when none were compiled
+            (or all the compilations failed) and "partial" otherwise.
+        """
+        if not self.compiled_functions:
+            return "eager"
+        n_failed = sum(compiled_function.failed for compiled_function in self.compiled_functions)
+        if n_failed == 0:
+            return "compile"
+        return "eager" if n_failed == len(self.compiled_functions) else "partial"
+
     def _update_info_buffer(self, infos: List[Dict[str, Any]], dones: Optional[np.ndarray] = None) -> None:
         """
         Retrieve reward, episode length, episode success and update the buffer
         if using Monitor wrapper or a GoalEnv.
+        With a ``VecMonitor``, the episodes are added to ``ep_record_buffer`` instead of ``ep_info_buffer``,
+        which only receives the info dicts carrying extra keys.
 
         :param infos: List of additional information about the transition.
         :param dones: Termination signals
         """
         if dones is None:
-            dones = np.array([False] * len(infos))
-        for idx, info in enumerate(infos):
-            maybe_ep_info = info.get("episode")
-            maybe_is_success = info.get("is_success")
-            if maybe_ep_info is not None:
+            indices = range(len(infos))
+        else:
+            # The episode information is only added at the end of the episodes
+            indices = np.flatnonzero(dones)
+        # The episodes recorded by a ``VecMonitor`` are added at once,
+        # their info dicts are only kept when they carry extra keys (e.g. the per-skill rewards of DIAYN)
+        recorded_envs = ()
+        if self._vec_monitor is not None and self.ep_record_buffer is not None and dones is not None:
+            self.ep_record_buffer.extend(self._vec_monitor.episode_records)
+            recorded_envs = set(self._vec_monitor.episode_records["env_idx"].tolist())
+        for idx in indices:
+            maybe_ep_info = infos[idx].get("episode")
+            maybe_is_success = infos[idx].get("is_success")
+            if maybe_ep_info is not None and (idx not in recorded_envs or maybe_ep_info.keys() - {"r", "l", "t"}):
                 self.ep_info_buffer.extend([maybe_ep_info])
-            if maybe_is_success is not None and dones[idx]:
+            if maybe_is_success is not None and dones is not None:
                 self.ep_success_buffer.append(maybe_is_success)
 
+    def _get_episode_stats(self) -> Optional[Tuple[float, float]]:
+        """
+        Mean return and length of the last episodes, for logging.
+        The records of a ``VecMonitor`` are used when present, the ``info["episode"]`` dicts otherwise.
+
+        :return: The mean return and length, None if no episode is done yet
+        """
+        if self.ep_record_buffer is not None and len(self.ep_record_buffer) > 0:
+            records = self.ep_record_buffer.records
+            return float(records["r"].mean()), float(records["l"].mean())
+        if len(self.ep_info_buffer) > 0 and len(self.ep_info_buffer[0]) > 0:
+            return (
+                safe_mean([ep_info["r"] for ep_info in self.ep_info_buffer]),
+                safe_mean([ep_info["l"] for ep_info in self.ep_info_buffer]),
+            )
+        return None
+
     def get_env(self) -> Optional[VecEnv]:
         """
         Returns the current environment (can be None if not defined).
@@ -491,6 +584,7 @@ class BaseAlgorithm(ABC):
 
         self.n_envs = env.num_envs
         self.env = env
+        self._vec_monitor = unwrap_vec_wrapper(env, VecMonitor)
 
     @abstractmethod
     def learn(
@@ -562,8 +656,8 @@ class BaseAlgorithm(ABC):
         device: Union[th.device, str] = "auto",
     ) -> None:
         """
-        Load parameters from a given zip-file or a nested dictionary containing parameters for
-        different modules (see ``get_parameters``).
+        Load parameters from a given zip-file (or stream checkpoint) or a nested dictionary containing
+        parameters for different modules (see ``get_parameters``).
 
         :param load_path_or_iter: Location of the saved data (path or file-like, see ``save``), or a nested
             dictionary containing nn.Module parameters used by the policy. The dictionary maps
@@ -577,7 +671,7 @@ class BaseAlgorithm(ABC):
         if isinstance(load_path_or_dict, dict):
             params = load_path_or_dict
         else:
-            _, params, _ = load_from_zip_file(load_path_or_dict, device=device)
+            _, params, _ = load_from_file(load_path_or_dict, device=device)
 
         # Keep track which objects were updated.
         # `_get_torch_save_params` returns [params, other_pytorch_variables].
@@ -630,10 +724,13 @@ class BaseAlgorithm(ABC):
         env: Optional[GymEnv] = None,
         device: Union[th.device, str] = "auto",
         custom_objects: Optional[Dict[str, Any]] = None,
+        params_to_load: Optional[List[str]] = None,
+        mmap: bool = False,
+        n_threads: int = 1,
         **kwargs,
     ) -> "BaseAlgorithm":
         """
-        Load the model from a zip-file
+        Load the model from a zip-file or a stream checkpoint (see ``save``)
 
         :param path: path to the file (or a file-like) where to
             load the agent from
@@ -646,9 +743,15 @@ class BaseAlgorithm(ABC):
             will be used instead. Similar to custom_objects in
             ``keras.models.load_model``. Useful when you have an object in
             file that can not be deserialized.
+        :param params_to_load: Names of the state_dicts to load, e.g. ``["policy"]`` to only load what is needed
+            for inference. The other state_dicts (optimizers, ...) and the pytorch variables keep their initial values.
+        :param mmap: Whether to memory-map the tensors of a stream checkpoint instead of reading them
+        :param n_threads: Number of threads reading the tensors of a stream checkpoint
         :param kwargs: extra arguments to change the model when loading
         """
-        data, params, pytorch_variables = load_from_zip_file(path, device=device, custom_objects=custom_objects)
+        data, params, pytorch_variables = load_from_file(
+            path, device=device, custom_objects=custom_objects, params_to_load=params_to_load, mmap=mmap, n_threads=n_threads
+        )
 
         # Remove stored device information and replace with ours
         if "policy_kwargs" in data:
@@ -688,7 +791,7 @@ class BaseAlgorithm(ABC):
         model._setup_model()
 
         # put state_dicts back in place
-        model.set_parameters(params, exact_match=True, device=device)
+        model.set_parameters(params, exact_match=params_to_load is None, device=device)
 
         # put other pytorch variables back in place
         if pytorch_variables is not None:
@@ -725,18 +828,17 @@ class BaseAlgorithm(ABC):
             params[name] = attr.state_dict()
         return params
 
-    def save(
+    def _get_save_data(
         self,
-        path: Union[str, pathlib.Path, io.BufferedIOBase],
-        exclude: Optional[Iterable[str]] = ['beta_buffer','ep_info_buffer'],
+        exclude: Optional[Iterable[str]] = ['beta_buffer','ep_info_buffer','ep_record_buffer'],
         include: Optional[Iterable[str]] = None,
-    ) -> None:
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict], Optional[Dict[str, th.Tensor]]]:
         """
-        Save all the attributes of the object and the model parameters in a zip-file.
+        Gather what is saved by ``save()``.
 
-        :param path: path to the file where the rl agent should be saved
         :param exclude: name of parameters that should be excluded in addition to the default ones
         :param include: name of parameters that might be excluded but should be included anyway
+        :return: The attributes of the object, the state_dicts and the other pytorch variables
         """
         # Copy parameter list so we don't mutate the original dict
         data = self.__dict__.copy()
@@ -771,5 +873,25 @@ class BaseAlgorithm(ABC):
                 pytorch_variables[name] = attr
 
         # Build dict of state_dicts
-        params_to_save = self.get_parameters()
-        save_to_zip_file(path, data=data, params=params_to_save, pytorch_variables=pytorch_variables)
+        return data, self.get_parameters(), pytorch_variables
+
+    def save(
+        self,
+        path: Union[str, pathlib.Path, io.BufferedIOBase],
+        exclude: Optional[Iterable[str]] = ['beta_buffer','ep_info_buffer','ep_record_buffer'],
+        include: Optional[Iterable[str]] = None,
+        file_format: str = "zip",
+    ) -> None:
+        """
+        Save all the attributes of the object and the model parameters in a zip-file.
+
+        :param path: path to the file where the rl agent should be saved
+        :param exclude: name of parameters that should be excluded in addition to the default ones
+        :param include: name of parameters that might be excluded but should be included anyway
+        :param file_format: "zip" for a zip-file, "stream" for a stream checkpoint: uncompressed tensors
+            and a JSON index, that can be memory-mapped or partially loaded (see ``save_to_stream_file``)
+        """
+        assert file_format in ("zip", "stream"), f"Unknown file format {file_format}"
+        data, params_to_save, pytorch_variables = self._get_save_data(exclude, include)
+        save_function = save_to_zip_file if file_format == "zip" else save_to_stream_file
+        save_function(path, data=data, params=params_to_save, pytorch_variables=pytorch_variables)
@@ -1,91 +1,130 @@
+from functools import lru_cache
+from typing import Sequence, Tuple, Union
+
 import numpy as np
 import torch
 
+ArrayOrTensor = Union[np.ndarray, torch.Tensor]
 
-# Crawler
-def crawler_disc_on_y_legs(obs):
+
+class GatherDescriptor(object):
     """
-    Return only the position of the legs relative to the body.
+    Behaviour descriptor that selects a fixed set of columns of the observation.
+
+    The selection is done with a single gather on the device of the observation,
+    the index tensor being created once per device and observation size.
+
+    :param indices: Columns to select, negative indices count from the end
+    :param doc: Description of the behaviour descriptor
     """
-    if isinstance(obs, np.ndarray):
-        disc_obs = np.zeros((len(obs), 4))
-    elif isinstance(obs, torch.Tensor):
-        disc_obs = torch.zeros((len(obs), 4))
-    for i in range(4):
-        idx = 8 + i * 14
-        disc_obs[:, i] = obs[:, idx]
-    return disc_obs
 
+    def __init__(self, indices: Sequence[int], doc: str = ""):
+        self.indices = tuple(indices)
+        self.__doc__ = doc
+        self._index_cache = {}
+
+    def _get_indices(self, obs: ArrayOrTensor) -> ArrayOrTensor:
+        device = obs.device if isinstance(obs, torch.Tensor) else None
+        key = (device, obs.shape[1])
+        if key not in self._index_cache:
+            indices = np.array(self.indices) % obs.shape[1]
+            if device is not None:
+                indices = torch.as_tensor(indices, device=device)
+            self._index_cache[key] = indices
+        return self._index_cache[key]
+
+    def __call__(self, obs: ArrayOrTensor) -> ArrayOrTensor:
+        indices = self._get_indices(obs)
+        if isinstance(obs, torch.Tensor):
+            return obs.index_select(1, indices)
+        return obs.take(indices, axis=1)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # Device tensors are rebuilt lazily
+        state["_index_cache"] = {}
+        return state
+
+
+# Crawler
+crawler_disc_on_y_legs = GatherDescriptor(
+    [8 + i * 14 for i in range(4)],
+    doc="Return only the position of the legs relative to the body.",
+)
 
-def crawler_is_flying(obs):
+crawler_forelegs_contact = GatherDescriptor(
+    [-14, -10, -6, -2],
+    doc="Return the contact sensors of the four forelegs.",
+)
+
+_crawler_legs_indices = GatherDescriptor([idx for i in range(4) for idx in range(3 + 6 * i, 6 + 6 * i)])
+_crawler_body_indices = GatherDescriptor([0, 1, 2] * 4)
+
+
+def crawler_is_flying(obs: ArrayOrTensor) -> ArrayOrTensor:
     """
-    Return only the position of the legs relative to the body.
+    Return 1 when all the legs are at the position of the body, 0 otherwise.
     """
-    if isinstance(obs, np.ndarray):
-        disc_obs = np.zeros((len(obs), 12))
-        is_flying = np.zeros((len(obs), 1))
-    elif isinstance(obs, torch.Tensor):
-        disc_obs = torch.zeros((len(obs), 12))
-        is_flying = torch.zeros((len(obs), 1))
-    for i in range(4):
-        idx_start = 3 + 6 * i
-        idx_end = 6 + 6 * i
-        disc_obs[:, 3 * i : 3 * (i + 1)] = obs[:, idx_start:idx_end] - obs[:, :3]
-
-    is_flying[:, 0] = (disc_obs == 0).all(axis=1)
-    return is_flying
-
-
-def crawler_sensor_outputs(obs):
+    is_flying = (_crawler_legs_indices(obs) - _crawler_body_indices(obs) == 0).all(1)[:, None]
+    if isinstance(obs, torch.Tensor):
+        return is_flying.to(obs.dtype)
+    return is_flying.astype(obs.dtype)
+
+
+def crawler_sensor_outputs(obs: ArrayOrTensor) -> ArrayOrTensor:
     return obs[:, :128]
 
 
-def crawler_forelegs_contact(obs):
-    if isinstance(obs, np.ndarray):
-        disc_obs = np.zeros((len(obs), 4))
-    elif isinstance(obs, torch.Tensor):
-        disc_obs = torch.zeros((len(obs), 4))
-
-    for i in range(4):
-        disc_obs[:, 4 - (i + 1)] = obs[:, -4 * (i + 1) + 2]
-    return disc_obs
-
-
-"""
-def discretize_xy(obs, dims, min_values, max_values, n=2):
-    if isinstance(obs, np.ndarray):
-        obs = obs.copy()[:, :n]
-        for i in range(n):
-            bins = np.linspace(min_values[i], max_values[i], dims[i])
-            obs[:, i] = bins[
-                np.clip(np.digitize(obs[:, i], bins, right=True), 0, dims[i] - 1)
-            ]
-    elif isinstance(obs, torch.Tensor):
-        obs = obs.clone()[:, :n]
-        for i in range(n):
-            bins = torch.linspace(min_values[i], max_values[i], dims[i])
-            obs[:, i] = bins[
-                torch.clamp(
-                    torch.bucketize(obs[:, i], bins, right=True), max=dims[i] - 1
-                )
-            ]
-    return obs[:, :n]
-"""
-
-
-def discretize_xy(obs, dims, min_values, max_values, n=2):
-    if isinstance(obs, np.ndarray):
-
-        for i in range(n):
-            pos = np.linspace(min_values[i], max_values[i], dims[i])
-            obs[:, i] = pos[np.abs((pos[None] - obs[:, i, None])).argmin(axis=1)]
-
-    elif isinstance(obs, torch.Tensor):
-        device = obs.device
-        for i in range(n):
-            pos = torch.linspace(min_values[i], max_values[i], dims[i]).to(device)
-            obs[:, i] = pos[torch.abs((pos[None] - obs[:, i, None])).argmin(axis=1)]
-    return obs[:, :n]
+@lru_cache(maxsize=None)
+def _discretization_grid(
+    dims: Tuple[int, ...],
+    min_values: Tuple[float, ...],
+    max_values: Tuple[float, ...],
+    device: Union[torch.device, None],
+    dtype: Union[torch.dtype, np.dtype],
+) -> Tuple[ArrayOrTensor, ArrayOrTensor, ArrayOrTensor]:
+    low = np.array(min_values, dtype=np.float64)
+    n_bins = np.array(dims, dtype=np.float64)
+    step = (np.array(max_values, dtype=np.float64) - low) / np.maximum(n_bins - 1, 1)
+    # Avoid a division by zero for single-bin dimensions, they are clipped to the lower bound
+    step[step == 0] = 1.0
+    if device is None:
+        return tuple(array.astype(dtype) for array in (low, step, n_bins - 1))
+    return tuple(torch.as_tensor(array, dtype=dtype, device=device) for array in (low, step, n_bins - 1))
+
+
+def discretize_xy(
+    obs: ArrayOrTensor,
+    dims: Sequence[int],
+    min_values: Sequence[float],
+    max_values: Sequence[float],
+    n: int = 2,
+) -> ArrayOrTensor:
+    """
+    Snap the ``n`` first dimensions of the observation to the closest point of a regular grid.
+
+    :param obs: Batch of observations
+    :param dims: Number of points of the grid along each dimension
+    :param min_values: Lower bound of the grid along each dimension
+    :param max_values: Upper bound of the grid along each dimension
+    :param n: Number of dimensions to discretize
+    :return: The discretized dimensions, the observation is left untouched
+    """
+    is_tensor = isinstance(obs, torch.Tensor)
+    low, step, max_index = _discretization_grid(
+        tuple(dims[:n]),
+        tuple(min_values[:n]),
+        tuple(max_values[:n]),
+        obs.device if is_tensor else None,
+        obs.dtype,
+    )
+    # Closest grid point, ties are broken towards the lower one
+    if is_tensor:
+        index = torch.ceil((obs[:, :n] - low) / step - 0.5)
+        index = torch.minimum(torch.clamp(index, min=0), max_index)
+    else:
+        index = np.clip(np.ceil((obs[:, :n] - low) / step - 0.5), 0, max_index)
+    return low + index * step
 
 
 behaviour_registry = {
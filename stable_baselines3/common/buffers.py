@@ -1,3 +1,6 @@
+import functools
+import queue
+import threading
 import warnings
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Generator, List, Optional, Union
@@ -43,8 +46,18 @@ class BaseBuffer(ABC):
     :param device: PyTorch device
         to which the values will be converted
     :param n_envs: Number of parallel environments
+    :param normalize_on_device: Whether to normalize the sampled observations on the device,
+        with ``VecNormalize.normalize_obs_th()``, instead of normalizing them with numpy
+        before the transfer
     """
 
+    # Stage the sampled arrays in page-locked memory before moving them to the device
+    # (set by ``PrefetchBuffer`` when the buffer lives on a CUDA device)
+    pin_memory = False
+    # Arrays of ``buffer_size`` elements that are not indexed by row (e.g. indexed by episode),
+    # they are saved in full with the state of the buffer instead of by chunks of rows
+    _non_row_arrays = ()
+
     def __init__(
         self,
         buffer_size: int,
@@ -52,6 +65,7 @@ class BaseBuffer(ABC):
         action_space: spaces.Space,
         device: Union[th.device, str] = "cpu",
         n_envs: int = 1,
+        normalize_on_device: bool = False,
     ):
         super(BaseBuffer, self).__init__()
         self.buffer_size = buffer_size
@@ -64,6 +78,7 @@ class BaseBuffer(ABC):
         self.full = False
         self.device = device
         self.n_envs = n_envs
+        self.normalize_on_device = normalize_on_device
 
     @staticmethod
     def swap_and_flatten(arr: np.ndarray) -> np.ndarray:
@@ -131,6 +146,55 @@ class BaseBuffer(ABC):
         """
         raise NotImplementedError()
 
+    @staticmethod
+    def _obs_storage_dtype(
+        observation_space: spaces.Space, obs_dtype: Optional[np.dtype] = None
+    ) -> np.dtype:
+        """
+        :param observation_space: Observation space (or subspace for dict observations)
+        :param obs_dtype: Storage dtype of the floating point observations,
+            the dtype of the observation space is used when None
+        :return: The dtype of the stored observations
+        """
+        is_float = np.issubdtype(observation_space.dtype, np.floating)
+        if obs_dtype is not None and is_float:
+            return np.dtype(obs_dtype)
+        return observation_space.dtype
+
+    def _storage_size(self) -> int:
+        """
+        :return: Number of rows of the storage arrays
+            (transitions, or episodes for the buffers storing whole episodes)
+        """
+        return self.buffer_size
+
+    def _storage_pos(self) -> int:
+        """
+        :return: Row of the storage arrays currently written
+        """
+        return self.pos
+
+    def _storage_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Arrays storing the content of the buffer, indexed by row along their first dimension.
+        Used to save the buffer by chunks of rows
+        (see ``save_util.save_replay_buffer_chunks()``).
+        The arrays listed in ``_non_row_arrays`` are left out.
+
+        :return: The arrays, by attribute name (``"attribute/key"`` for dict attributes)
+        """
+        n_rows = self._storage_size()
+        arrays = {}
+        for name, value in self.__dict__.items():
+            if name in self._non_row_arrays:
+                continue
+            items = value.items() if isinstance(value, dict) else [(None, value)]
+            for key, array in items:
+                is_array = isinstance(array, np.ndarray) and array.ndim > 0
+                if is_array and len(array) == n_rows:
+                    arrays[name if key is None else f"{name}/{key}"] = array
+        return arrays
+
     def to_torch(self, array: np.ndarray, copy: bool = True) -> th.Tensor:
         """
         Convert a numpy array to a PyTorch tensor.
@@ -141,16 +205,28 @@ class BaseBuffer(ABC):
             (may be useful to avoid changing things be reference)
         :return:
         """
+        if isinstance(array, th.Tensor):
+            # Already converted (e.g. observations normalized on the device)
+            return array.to(self.device)
+        if array.dtype == np.float16:
+            # Observations stored in half precision (see ``obs_dtype``) are transferred
+            # in half precision and converted on the device
+            return th.as_tensor(array).to(self.device, th.float32)
+        if self.pin_memory:
+            # ``pin_memory()`` always copies, so the copy semantics are preserved
+            return th.as_tensor(array).pin_memory().to(self.device, non_blocking=True)
         if copy:
             return th.tensor(array).to(self.device)
         return th.as_tensor(array).to(self.device)
 
-    @staticmethod
     def _normalize_obs(
+        self,
         obs: Union[np.ndarray, Dict[str, np.ndarray]],
         env: Optional[VecNormalize] = None,
-    ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+    ) -> Union[np.ndarray, th.Tensor, Dict[str, Union[np.ndarray, th.Tensor]]]:
         if env is not None:
+            if self.normalize_on_device and env.norm_obs:
+                return env.normalize_obs_th(obs, self.device)
             return env.normalize_obs(obs)
         return obs
 
@@ -162,6 +238,22 @@ class BaseBuffer(ABC):
             return env.normalize_reward(reward).astype(np.float32)
         return reward
 
+    def _update_ep_lengths(self, ep_index: np.ndarray) -> None:
+        """
+        Count the new transitions in the length of their episode,
+        for the buffers that store the episode lengths (``ep_lengths``)
+        indexed by ``episode index % buffer_size``.
+
+        :param ep_index: Index of the episode of the new transition, for each env
+        """
+        for env_ep_index in np.asarray(ep_index, dtype=np.int64).reshape(self.n_envs):
+            ep_slot = env_ep_index % self.buffer_size
+            if self.ep_lengths_index[ep_slot] != env_ep_index:
+                # New episode, replaces the (already overwritten) episode stored in that slot
+                self.ep_lengths_index[ep_slot] = env_ep_index
+                self.ep_lengths[ep_slot] = 0
+            self.ep_lengths[ep_slot] += 1
+
 
 class ReplayBuffer(BaseBuffer):
     """
@@ -180,6 +272,12 @@ class ReplayBuffer(BaseBuffer):
     :param handle_timeout_termination: Handle timeout termination (due to timelimit)
         separately and treat the task as infinite horizon task.
         https://github.com/DLR-RM/stable-baselines3/issues/284
+    :param obs_dtype: Storage dtype of the floating point observations
+        (e.g. ``np.float32`` when the observation space is float64, or ``np.float16``),
+        defaults to the dtype of the observation space.
+        Half precision observations are converted to float32 when sampled.
+    :param normalize_on_device: Whether to normalize the sampled observations on the device
+        (see ``BaseBuffer``)
     """
 
     def __init__(
@@ -191,9 +289,16 @@ class ReplayBuffer(BaseBuffer):
         n_envs: int = 1,
         optimize_memory_usage: bool = False,
         handle_timeout_termination: bool = True,
+        obs_dtype: Optional[np.dtype] = None,
+        normalize_on_device: bool = False,
     ):
         super(ReplayBuffer, self).__init__(
-            buffer_size, observation_space, action_space, device, n_envs=n_envs
+            buffer_size,
+            observation_space,
+            action_space,
+            device,
+            n_envs=n_envs,
+            normalize_on_device=normalize_on_device,
         )
 
         assert n_envs == 1, "Replay buffer only support single environment for now"
@@ -206,7 +311,7 @@ class ReplayBuffer(BaseBuffer):
 
         self.observations = np.zeros(
             (self.buffer_size, self.n_envs) + self.obs_shape,
-            dtype=observation_space.dtype,
+            dtype=self._obs_storage_dtype(observation_space, obs_dtype),
         )
 
         if optimize_memory_usage:
@@ -215,7 +320,7 @@ class ReplayBuffer(BaseBuffer):
         else:
             self.next_observations = np.zeros(
                 (self.buffer_size, self.n_envs) + self.obs_shape,
-                dtype=observation_space.dtype,
+                dtype=self._obs_storage_dtype(observation_space, obs_dtype),
             )
 
         self.actions = np.zeros(
@@ -347,8 +452,17 @@ class ReplayBufferZ(BaseBuffer):
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
         and https://github.com/DLR-RM/stable-baselines3/pull/28#issuecomment-637559274
+    :param obs_dtype: Storage dtype of the floating point observations
+        (e.g. ``np.float32`` when the observation space is float64, or ``np.float16``),
+        defaults to the dtype of the observation space.
+        Half precision observations are converted to float32 when sampled.
+    :param normalize_on_device: Whether to normalize the sampled observations on the device
+        (see ``BaseBuffer``)
     """
 
+    # Indexed by ``episode index % buffer_size``
+    _non_row_arrays = ("ep_lengths", "ep_lengths_index")
+
     def __init__(
         self,
         buffer_size: int,
@@ -358,9 +472,16 @@ class ReplayBufferZ(BaseBuffer):
         device: Union[th.device, str] = "cpu",
         n_envs: int = 1,
         optimize_memory_usage: bool = False,
+        obs_dtype: Optional[np.dtype] = None,
+        normalize_on_device: bool = False,
     ):
         super(ReplayBufferZ, self).__init__(
-            buffer_size, observation_space, action_space, device, n_envs=n_envs
+            buffer_size,
+            observation_space,
+            action_space,
+            device,
+            n_envs=n_envs,
+            normalize_on_device=normalize_on_device,
         )
 
         assert n_envs == 1, "Replay buffer only support single environment for now"
@@ -372,7 +493,7 @@ class ReplayBufferZ(BaseBuffer):
         self.optimize_memory_usage = optimize_memory_usage
         self.observations = np.zeros(
             (self.buffer_size, self.n_envs) + self.obs_shape,
-            dtype=observation_space.dtype,
+            dtype=self._obs_storage_dtype(observation_space, obs_dtype),
         )
         if optimize_memory_usage:
             # `observations` contains also the next observation
@@ -380,7 +501,7 @@ class ReplayBufferZ(BaseBuffer):
         else:
             self.next_observations = np.zeros(
                 (self.buffer_size, self.n_envs) + self.obs_shape,
-                dtype=observation_space.dtype,
+                dtype=self._obs_storage_dtype(observation_space, obs_dtype),
             )
         self.actions = np.zeros(
             (self.buffer_size, self.n_envs, self.action_dim), dtype=action_space.dtype
@@ -392,6 +513,10 @@ class ReplayBufferZ(BaseBuffer):
         self.zs = np.zeros((self.buffer_size, z_size[0]), dtype=np.float32)
 
         self.ep_index = np.zeros((self.buffer_size, self.n_envs),dtype=np.int64)
+        # Length of the episodes present in the buffer, indexed by ``ep_index % buffer_size``
+        # (there are at most ``buffer_size`` episodes in the buffer)
+        self.ep_lengths = np.zeros(self.buffer_size, dtype=np.float32)
+        self.ep_lengths_index = np.full(self.buffer_size, -1, dtype=np.int64)
         if psutil is not None:
             total_memory_usage = (
                 self.observations.nbytes
@@ -400,6 +525,8 @@ class ReplayBufferZ(BaseBuffer):
                 + self.dones.nbytes
                 + self.zs.nbytes
                 + self.ep_index.nbytes
+                + self.ep_lengths.nbytes
+                + self.ep_lengths_index.nbytes
             )
             if self.next_observations is not None:
                 total_memory_usage += self.next_observations.nbytes
@@ -442,6 +569,7 @@ class ReplayBufferZ(BaseBuffer):
         self.dones[self.pos] = np.array(done).copy()
         self.zs[self.pos] = np.array(z).copy()
         self.ep_index[self.pos] = np.array(ep_index).copy()
+        self._update_ep_lengths(ep_index)
         self.pos += 1
         if self.pos == self.buffer_size:
             self.full = True
@@ -492,12 +620,12 @@ class ReplayBufferZ(BaseBuffer):
             self.dones[batch_inds],
             self._normalize_reward(self.rewards[batch_inds], env),
             self.zs[batch_inds],
-            self.ep_index[batch_inds]
+            self.ep_index[batch_inds],
+            self.ep_lengths[self.ep_index[batch_inds] % self.buffer_size],
         )
         return ReplayBufferSamplesZ(*tuple(map(self.to_torch, data)))
 
 
-
 class ReplayBufferZExternalDisc(BaseBuffer):
     """
     Replay buffer used in off-policy algorithms like SAC/TD3.
@@ -512,8 +640,17 @@ class ReplayBufferZExternalDisc(BaseBuffer):
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
         and https://github.com/DLR-RM/stable-baselines3/pull/28#issuecomment-637559274
+    :param obs_dtype: Storage dtype of the floating point observations
+        (e.g. ``np.float32`` when the observation space is float64, or ``np.float16``),
+        defaults to the dtype of the observation space.
+        Half precision observations are converted to float32 when sampled.
+    :param normalize_on_device: Whether to normalize the sampled observations on the device
+        (see ``BaseBuffer``)
     """
 
+    # Indexed by ``episode index % buffer_size``
+    _non_row_arrays = ("ep_lengths", "ep_lengths_index")
+
     def __init__(
         self,
         buffer_size: int,
@@ -524,9 +661,16 @@ class ReplayBufferZExternalDisc(BaseBuffer):
         device: Union[th.device, str] = "cpu",
         n_envs: int = 1,
         optimize_memory_usage: bool = False,
+        obs_dtype: Optional[np.dtype] = None,
+        normalize_on_device: bool = False,
     ):
         super(ReplayBufferZExternalDisc, self).__init__(
-            buffer_size, observation_space, action_space, device, n_envs=n_envs
+            buffer_size,
+            observation_space,
+            action_space,
+            device,
+            n_envs=n_envs,
+            normalize_on_device=normalize_on_device,
         )
 
         assert n_envs == 1, "Replay buffer only support single environment for now"
@@ -538,7 +682,7 @@ class ReplayBufferZExternalDisc(BaseBuffer):
         self.optimize_memory_usage = optimize_memory_usage
         self.observations = np.zeros(
             (self.buffer_size, self.n_envs) + self.obs_shape,
-            dtype=observation_space.dtype,
+            dtype=self._obs_storage_dtype(observation_space, obs_dtype),
         )
         if optimize_memory_usage:
             # `observations` contains also the next observation
@@ -546,7 +690,7 @@ class ReplayBufferZExternalDisc(BaseBuffer):
         else:
             self.next_observations = np.zeros(
                 (self.buffer_size, self.n_envs) + self.obs_shape,
-                dtype=observation_space.dtype,
+                dtype=self._obs_storage_dtype(observation_space, obs_dtype),
             )
         self.actions = np.zeros(
             (self.buffer_size, self.n_envs, self.action_dim), dtype=action_space.dtype
@@ -561,6 +705,10 @@ class ReplayBufferZExternalDisc(BaseBuffer):
                                  dtype=np.float32)
 
         self.ep_index = np.zeros((self.buffer_size, self.n_envs),dtype=np.int64)
+        # Length of the episodes present in the buffer, indexed by ``ep_index % buffer_size``
+        # (there are at most ``buffer_size`` episodes in the buffer)
+        self.ep_lengths = np.zeros(self.buffer_size, dtype=np.float32)
+        self.ep_lengths_index = np.full(self.buffer_size, -1, dtype=np.int64)
         if psutil is not None:
             total_memory_usage = (
                 self.observations.nbytes
@@ -570,6 +718,8 @@ class ReplayBufferZExternalDisc(BaseBuffer):
                 + self.zs.nbytes
                 + self.disc_obs.nbytes
                 + self.ep_index.nbytes
+                + self.ep_lengths.nbytes
+                + self.ep_lengths_index.nbytes
             )
             if self.next_observations is not None:
                 total_memory_usage += self.next_observations.nbytes
@@ -614,6 +764,7 @@ class ReplayBufferZExternalDisc(BaseBuffer):
         self.zs[self.pos] = np.array(z).copy()
         self.disc_obs[self.pos] = np.array(disc_obs).copy()
         self.ep_index[self.pos] = np.array(ep_index).copy()
+        self._update_ep_lengths(ep_index)
 
         self.pos += 1
         if self.pos == self.buffer_size:
@@ -668,7 +819,8 @@ class ReplayBufferZExternalDisc(BaseBuffer):
             self._normalize_reward(self.rewards[batch_inds], env),
             self.zs[batch_inds],
             self.disc_obs[batch_inds, 0, :],
-            self.ep_index[batch_inds]
+            self.ep_index[batch_inds],
+            self.ep_lengths[self.ep_index[batch_inds] % self.buffer_size],
         )
         return ReplayBufferSamplesZExternalDisc(*tuple(map(self.to_torch, data)))
 
@@ -768,6 +920,12 @@ class ReplayBufferZExternalDiscTraj(BaseBuffer):
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
         and https://github.com/DLR-RM/stable-baselines3/pull/28#issuecomment-637559274
+    :param obs_dtype: Storage dtype of the floating point observations
+        (e.g. ``np.float32`` when the observation space is float64, or ``np.float16``),
+        defaults to float32.
+        Half precision observations are converted to float32 when sampled.
+    :param normalize_on_device: Whether to normalize the sampled observations on the device
+        (see ``BaseBuffer``)
     """
 
     def __init__(
@@ -781,9 +939,16 @@ class ReplayBufferZExternalDiscTraj(BaseBuffer):
         device: Union[th.device, str] = "cpu",
         n_envs: int = 1,
         optimize_memory_usage: bool = False,
+        obs_dtype: Optional[np.dtype] = None,
+        normalize_on_device: bool = False,
     ):
         super(ReplayBufferZExternalDiscTraj, self).__init__(
-            buffer_size, observation_space, action_space, device, n_envs=n_envs
+            buffer_size,
+            observation_space,
+            action_space,
+            device,
+            n_envs=n_envs,
+            normalize_on_device=normalize_on_device,
         )
 
         assert n_envs == 1, "Replay buffer only support single environment for now"
@@ -794,9 +959,11 @@ class ReplayBufferZExternalDiscTraj(BaseBuffer):
         self.max_steps = max_steps
         self.n_episodes = 0
         self.optimize_memory_usage = optimize_memory_usage
+        # The trajectories are padded with -inf, they are stored as floats
+        obs_dtype = np.float32 if obs_dtype is None else obs_dtype
         self.observations = np.full(
             (self.buffer_size, self.max_steps, self.n_envs) + self.obs_shape, -np.inf,
-            dtype=np.float32,
+            dtype=obs_dtype,
         )
         if optimize_memory_usage:
             # `observations` contains also the next observation
@@ -804,7 +971,7 @@ class ReplayBufferZExternalDiscTraj(BaseBuffer):
         else:
             self.next_observations = np.full(
                 (self.buffer_size, self.max_steps, self.n_envs) + self.obs_shape, -np.inf,
-                dtype=np.float32,
+                dtype=obs_dtype,
             )
         self.actions = np.full(
             (self.buffer_size, self.max_steps, self.n_envs, self.action_dim), -np.inf, dtype=np.float32
@@ -906,6 +1073,10 @@ class ReplayBufferZExternalDiscTraj(BaseBuffer):
 
         
 
+    def _storage_pos(self) -> int:
+        # The rows are episodes
+        return self.current_episode
+
     def sample(
         self, batch_size: int, env: Optional[VecNormalize] = None
     ) -> ReplayBufferSamples:
@@ -1175,6 +1346,12 @@ class DictReplayBuffer(ReplayBuffer):
     :param handle_timeout_termination: Handle timeout termination (due to timelimit)
         separately and treat the task as infinite horizon task.
         https://github.com/DLR-RM/stable-baselines3/issues/284
+    :param obs_dtype: Storage dtype of the floating point observations
+        (e.g. ``np.float32`` when the observation space is float64, or ``np.float16``),
+        defaults to the dtype of the observation space.
+        Half precision observations are converted to float32 when sampled.
+    :param normalize_on_device: Whether to normalize the sampled observations on the device
+        (see ``BaseBuffer``)
     """
 
     def __init__(
@@ -1186,9 +1363,16 @@ class DictReplayBuffer(ReplayBuffer):
         n_envs: int = 1,
         optimize_memory_usage: bool = False,
         handle_timeout_termination: bool = True,
+        obs_dtype: Optional[np.dtype] = None,
+        normalize_on_device: bool = False,
     ):
         super(ReplayBuffer, self).__init__(
-            buffer_size, observation_space, action_space, device, n_envs=n_envs
+            buffer_size,
+            observation_space,
+            action_space,
+            device,
+            n_envs=n_envs,
+            normalize_on_device=normalize_on_device,
         )
 
         assert isinstance(
@@ -1210,14 +1394,14 @@ class DictReplayBuffer(ReplayBuffer):
         self.observations = {
             key: np.zeros(
                 (self.buffer_size, self.n_envs) + _obs_shape,
-                dtype=observation_space[key].dtype,
+                dtype=self._obs_storage_dtype(observation_space[key], obs_dtype),
             )
             for key, _obs_shape in self.obs_shape.items()
         }
         self.next_observations = {
             key: np.zeros(
                 (self.buffer_size, self.n_envs) + _obs_shape,
-                dtype=observation_space[key].dtype,
+                dtype=self._obs_storage_dtype(observation_space[key], obs_dtype),
             )
             for key, _obs_shape in self.obs_shape.items()
         }
@@ -1499,3 +1683,207 @@ class DictRolloutBuffer(RolloutBuffer):
             advantages=self.to_torch(self.advantages[batch_inds].flatten()),
             returns=self.to_torch(self.returns[batch_inds].flatten()),
         )
+
+
+class PrefetchBuffer(object):
+    """
+    Wrapper around a replay buffer that prepares the next ``n_batches`` minibatches
+    on a background thread, so the NumPy gathers, the normalization and the copy to the device
+    overlap with the gradient computation.
+    Every other attribute and method is forwarded to the wrapped buffer,
+    under the lock used by the sampling thread.
+
+    Batches of different sizes (e.g. the uneven splits of ``batched_gradient_steps`` in DIAYN)
+    are prefetched in separate queues, so alternating between batch sizes does not discard
+    the prefetched batches.
+    The batch indices are drawn from dedicated random generators seeded with ``seed``
+    (one per batch size), so sampling is reproducible independently of the global NumPy RNG.
+    Buffers that override ``sample()`` with a custom strategy (e.g. trajectory buffers)
+    sample with the global NumPy RNG, they are therefore sampled synchronously in the main thread.
+
+    Note: the prefetched batches are drawn from the content of the buffer
+    at the time they were prepared, they do not contain transitions added afterward
+    (at most ``n_batches`` gradient steps old).
+
+    :param buffer: The replay buffer to sample from
+    :param n_batches: Number of minibatches to prepare in advance
+    :param seed: Seed for the random generators used to draw the batch indices
+    """
+
+    # Buffers for which sampling only means drawing uniform indices
+    # and calling ``_get_samples()``
+    _index_based_samplers = (
+        BaseBuffer.sample,
+        ReplayBuffer.sample,
+        ReplayBufferZ.sample,
+        ReplayBufferZExternalDisc.sample,
+        DictReplayBuffer.sample,
+    )
+
+    def __init__(self, buffer: BaseBuffer, n_batches: int = 2, seed: Optional[int] = None):
+        assert n_batches > 0, "You must prefetch at least one batch"
+        self.buffer = buffer
+        self.n_batches = n_batches
+        self.seed = seed
+        # One random generator per batch size
+        self.rngs = {}
+        self.buffer.pin_memory = th.device(buffer.device).type == "cuda" and th.cuda.is_available()
+        self._index_based = type(buffer).sample in self._index_based_samplers
+        if not self._index_based:
+            warnings.warn(
+                f"{type(buffer).__name__} overrides `sample()`, "
+                "its minibatches will be sampled synchronously, without prefetching"
+            )
+        self._lock = threading.Lock()
+        self._env = None
+        self._samplers = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when the attribute was not found on the wrapper
+        if name in ["buffer", "_lock"]:
+            raise AttributeError(name)
+        with self._lock:
+            value = getattr(self.buffer, name)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def locked_method(*args, **kwargs):
+            with self._lock:
+                return value(*args, **kwargs)
+
+        return locked_method
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Gets state for pickling.
+
+        Excludes the sampling threads and their queues, they are restarted on the next call to ``sample()``.
+        """
+        self.close()
+        state = self.__dict__.copy()
+        for key in ["_lock", "_env", "_samplers"]:
+            del state[key]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restores pickled state.
+
+        :param state:
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._env = None
+        self._samplers = {}
+
+    def add(self, *args, **kwargs) -> None:
+        """
+        Add elements to the wrapped buffer.
+        """
+        with self._lock:
+            self.buffer.add(*args, **kwargs)
+
+    def reset(self) -> None:
+        """
+        Reset the wrapped buffer and discard the prefetched batches.
+        """
+        self.close()
+        with self._lock:
+            self.buffer.reset()
+
+    def _sample_batch_inds(self, rng: np.random.Generator, batch_size: int) -> np.ndarray:
+        """
+        Draw the batch indices like ``ReplayBuffer.sample()`` does, using our own random generator.
+
+        :param rng: Random generator of this batch size
+        :param batch_size: Number of element to sample
+        :return:
+        """
+        buffer = self.buffer
+        # Do not sample the element with index `pos` when using the memory efficient variant
+        if getattr(buffer, "optimize_memory_usage", False) and buffer.full:
+            return (rng.integers(1, buffer.buffer_size, size=batch_size) + buffer.pos) % buffer.buffer_size
+        upper_bound = buffer.buffer_size if buffer.full else buffer.pos
+        return rng.integers(0, upper_bound, size=batch_size)
+
+    def _worker(
+        self,
+        batches: queue.Queue,
+        stop_event: threading.Event,
+        rng: np.random.Generator,
+        batch_size: int,
+        env: Optional[VecNormalize] = None,
+    ) -> None:
+        while not stop_event.is_set():
+            # Saved with the batch, to rewind the generator over the batches that are never used
+            rng_state = rng.bit_generator.state
+            try:
+                with self._lock:
+                    batch = self.buffer._get_samples(self._sample_batch_inds(rng, batch_size), env=env)
+            except Exception as error:
+                # Re-raised in the main thread by ``sample()``
+                batch = error
+            # Wait for a free slot, checking regularly if we should stop
+            while not stop_event.is_set():
+                try:
+                    batches.put((rng_state, batch), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                rng.bit_generator.state = rng_state
+                return
+            if isinstance(batch, Exception):
+                return
+
+    def _start(self, batch_size: int, env: Optional[VecNormalize] = None) -> None:
+        if batch_size not in self.rngs:
+            self.rngs[batch_size] = np.random.default_rng(None if self.seed is None else [self.seed, batch_size])
+        batches = queue.Queue(maxsize=self.n_batches)
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=self._worker, args=(batches, stop_event, self.rngs[batch_size], batch_size, env), daemon=True
+        )
+        self._samplers[batch_size] = (batches, stop_event, thread)
+        thread.start()
+
+    def sample(self, batch_size: int, env: Optional[VecNormalize] = None):
+        """
+        Return the next prefetched minibatch of size ``batch_size``.
+        The sampling thread of this batch size is started when it is not running,
+        all the sampling threads are restarted when ``env`` changed since the previous call.
+
+        :param batch_size: Number of element to sample
+        :param env: associated gym VecEnv
+            to normalize the observations/rewards when sampling
+        :return:
+        """
+        if not self._index_based:
+            with self._lock:
+                return self.buffer.sample(batch_size, env=env)
+        if env is not self._env:
+            self.close()
+            self._env = env
+        if batch_size not in self._samplers:
+            self._start(batch_size, env)
+        _, batch = self._samplers[batch_size][0].get()
+        if isinstance(batch, Exception):
+            self.close()
+            raise batch
+        return batch
+
+    def close(self) -> None:
+        """
+        Stop the sampling threads and discard the prefetched batches.
+        The random generators are rewound to the first unused batch,
+        so closing does not change the batches sampled afterward.
+        """
+        for batch_size, (batches, stop_event, thread) in self._samplers.items():
+            stop_event.set()
+            thread.join()
+            if not batches.empty():
+                rng_state, _ = batches.get()
+                self.rngs[batch_size].bit_generator.state = rng_state
+        self._env = None
+        self._samplers = {}
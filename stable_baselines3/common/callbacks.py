@@ -1,14 +1,20 @@
+import functools
+import multiprocessing as mp
 import os
 import warnings
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, Optional, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import gym
 import numpy as np
+import torch as th
 
 from stable_baselines3.common import base_class  # pytype: disable=pyi-error
 from stable_baselines3.common.evaluation import evaluate_policy
-from stable_baselines3.common.vec_env import DummyVecEnv, VecEnv, sync_envs_normalization
+from stable_baselines3.common.vec_env import DummyVecEnv, VecEnv, sync_envs_normalization, unwrap_vec_normalize
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper
 
 
 class BaseCallback(ABC):
@@ -221,31 +227,168 @@ class CheckpointCallback(BaseCallback):
       will effectively correspond to ``n_envs`` steps.
       To account for that, you can use ``save_freq = max(save_freq // n_envs, 1)``
 
+    The replay buffer of off-policy algorithms can be saved too, in the folder ``{name_prefix}_replay_buffer``
+    (see ``save_util.load_replay_buffer_chunks()``). It is saved incrementally: only the chunks of the buffer
+    modified since the previous checkpoint are written.
+
     :param save_freq:
     :param save_path: Path to the folder where the model will be saved.
     :param name_prefix: Common prefix to the saved models
     :param verbose:
+    :param save_replay_buffer: Whether to save the replay buffer too
+    :param async_save: Whether to write the checkpoints in a background thread. The model (and the modified
+        chunks of the replay buffer) are copied to cpu memory when saving, then the training continues while
+        they are written. A checkpoint waits for the previous one to be written.
+    :param file_format: Format of the model checkpoints, "zip" or "stream" (see ``BaseAlgorithm.save()``)
+    :param buffer_chunk_size: Number of rows (transitions, or episodes for the buffers storing whole episodes)
+        of the chunks of the replay buffer
+    :param buffer_compression: Compression of the chunks of the replay buffer, None, "zlib" or "lzma"
     """
 
-    def __init__(self, save_freq: int, save_path: str, name_prefix: str = "rl_model", verbose: int = 0):
+    def __init__(
+        self,
+        save_freq: int,
+        save_path: str,
+        name_prefix: str = "rl_model",
+        verbose: int = 0,
+        save_replay_buffer: bool = False,
+        async_save: bool = False,
+        file_format: str = "zip",
+        buffer_chunk_size: int = 10000,
+        buffer_compression: Optional[str] = None,
+    ):
         super(CheckpointCallback, self).__init__(verbose)
+        assert file_format in ("zip", "stream"), f"Unknown file format {file_format}"
         self.save_freq = save_freq
         self.save_path = save_path
         self.name_prefix = name_prefix
+        self.save_replay_buffer = save_replay_buffer
+        self.async_save = async_save
+        self.file_format = file_format
+        self.buffer_chunk_size = buffer_chunk_size
+        self.buffer_compression = buffer_compression
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pending_save: Optional[Future] = None
+        # Row of the replay buffer being written and number of timesteps at the last written save
+        self.last_buffer_pos: Optional[int] = None
+        self.last_buffer_timesteps: Optional[int] = None
+        # The same, for the save being written in the background
+        self.pending_buffer_pos: Optional[Tuple[int, int]] = None
 
     def _init_callback(self) -> None:
         # Create folder if needed
         if self.save_path is not None:
             os.makedirs(self.save_path, exist_ok=True)
+        if self.save_replay_buffer:
+            assert hasattr(self.model, "replay_buffer"), "Only the off-policy algorithms have a replay buffer"
+        if self.async_save and self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
 
     def _on_step(self) -> bool:
         if self.n_calls % self.save_freq == 0:
             path = os.path.join(self.save_path, f"{self.name_prefix}_{self.num_timesteps}_steps")
-            self.model.save(path)
+            self._save_checkpoint(path)
             if self.verbose > 1:
                 print(f"Saving model checkpoint to {path}")
         return True
 
+    def _modified_buffer_chunks(self, buffer: Any) -> Optional[List[int]]:
+        """
+        :param buffer: The replay buffer
+        :return: Indices of the chunks of the buffer modified since the previous save,
+            None if they may all have been modified
+        """
+        n_rows = buffer._storage_size()
+        # At most one row is written per timestep
+        if self.last_buffer_pos is None or self.num_timesteps - self.last_buffer_timesteps >= n_rows:
+            return None
+        # From the row written at the previous save to the current one, wrapping around the end of the buffer
+        start = self.last_buffer_pos
+        stop = start + (buffer._storage_pos() - start) % n_rows + 1
+        chunk_indices = set()
+        for low, high in [(start, min(stop, n_rows)), (0, stop - n_rows)]:
+            if high > low:
+                chunk_indices.update(range(low // self.buffer_chunk_size, (high - 1) // self.buffer_chunk_size + 1))
+        return sorted(chunk_indices)
+
+    def _save_checkpoint(self, path: str) -> None:
+        # Import here to avoid a circular import
+        from stable_baselines3.common import save_util
+
+        if self.async_save:
+            # Only one checkpoint is kept in memory
+            self._wait_pending_save()
+        data, params, pytorch_variables = self.model._get_save_data()
+        if self.async_save:
+            # The class parameters are serialized and the tensors copied now, they are written in the background
+            data = save_util.data_to_json(data)
+            params, pytorch_variables = _copy_to_cpu((params, pytorch_variables))
+        save_function = save_util.save_to_zip_file if self.file_format == "zip" else save_util.save_to_stream_file
+        save_tasks = [functools.partial(save_function, path, data=data, params=params, pytorch_variables=pytorch_variables)]
+
+        if self.save_replay_buffer and self.model.replay_buffer is not None:
+            buffer = self.model._unwrapped_replay_buffer()
+            index, chunks = save_util.replay_buffer_to_chunks(
+                buffer, self.buffer_chunk_size, self._modified_buffer_chunks(buffer), copy_chunks=self.async_save
+            )
+            buffer_path = os.path.join(self.save_path, f"{self.name_prefix}_replay_buffer")
+            save_tasks.append(
+                functools.partial(save_util.write_replay_buffer_chunks, buffer_path, index, chunks, self.buffer_compression)
+            )
+            buffer_pos = (buffer._storage_pos(), self.num_timesteps)
+        else:
+            buffer_pos = None
+
+        # The next incremental save starts from this one only once it is written
+        if self.async_save:
+            self.pending_save = self.executor.submit(_run_tasks, save_tasks)
+            self.pending_buffer_pos = buffer_pos
+        else:
+            _run_tasks(save_tasks)
+            if buffer_pos is not None:
+                self.last_buffer_pos, self.last_buffer_timesteps = buffer_pos
+
+    def _wait_pending_save(self) -> None:
+        """
+        Wait for the checkpoint being written in the background, its errors are raised here.
+        """
+        if self.pending_save is not None:
+            pending_save, self.pending_save = self.pending_save, None
+            buffer_pos, self.pending_buffer_pos = self.pending_buffer_pos, None
+            pending_save.result()
+            if buffer_pos is not None:
+                self.last_buffer_pos, self.last_buffer_timesteps = buffer_pos
+
+    def _on_training_end(self) -> None:
+        if self.executor is not None:
+            self._wait_pending_save()
+            self.executor.shutdown()
+            self.executor = None
+
+
+def _copy_to_cpu(obj: Any) -> Any:
+    """
+    Copy the tensors of a nested structure (state_dicts, optimizer states, ...) to cpu memory.
+
+    :param obj: The structure
+    :return: Its copy
+    """
+    if isinstance(obj, th.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        obj_copy = type(obj)((key, _copy_to_cpu(value)) for key, value in obj.items())
+        if hasattr(obj, "_metadata"):
+            obj_copy._metadata = obj._metadata
+        return obj_copy
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_copy_to_cpu(item) for item in obj)
+    return obj
+
+
+def _run_tasks(tasks: List[Callable[[], None]]) -> None:
+    for task in tasks:
+        task()
+
 
 class ConvertCallback(BaseCallback):
     """
@@ -290,6 +433,13 @@ class EvalCallback(EventCallback):
     :param verbose:
     :param warn: Passed to ``evaluate_policy`` (warns if ``eval_env`` has not been
         wrapped with a Monitor wrapper)
+    :param async_eval: Whether to evaluate in a separate process while the training continues.
+        A copy of the policy on the CPU and the evaluation environment (which must be picklable with cloudpickle)
+        are sent once to the process, then a snapshot of the weights at each evaluation.
+        The results are processed (logged, best model saved, ...) at the first step after they are available.
+        An evaluation is skipped if the previous one is not done yet. ``render`` is not supported.
+        The process is stopped at the end of the training, and started again by the next one.
+    :param start_method: method used to start the evaluation process (see ``SubprocVecEnv``)
     """
 
     def __init__(
@@ -304,8 +454,11 @@ class EvalCallback(EventCallback):
         render: bool = False,
         verbose: int = 1,
         warn: bool = True,
+        async_eval: bool = False,
+        start_method: Optional[str] = None,
     ):
         super(EvalCallback, self).__init__(callback_on_new_best, verbose=verbose)
+        assert not (async_eval and render), "Rendering is not supported with `async_eval=True`"
         self.n_eval_episodes = n_eval_episodes
         self.eval_freq = eval_freq
         self.best_mean_reward = -np.inf
@@ -330,6 +483,12 @@ class EvalCallback(EventCallback):
         # For computing success rate
         self._is_success_buffer = []
         self.evaluations_successes = []
+        self.async_eval = async_eval
+        self.start_method = start_method
+        # Evaluation process, its pipe, and the timesteps and weights of the evaluation in progress
+        self.eval_process = None
+        self.eval_remote = None
+        self.pending_eval = None
 
     def _init_callback(self) -> None:
         # Does not work in some corner cases, where the wrapper is not the same
@@ -359,11 +518,19 @@ class EvalCallback(EventCallback):
                 self._is_success_buffer.append(maybe_is_success)
 
     def _on_step(self) -> bool:
+        continue_training = True
+        if self.async_eval and self.pending_eval is not None and self.eval_remote.poll():
+            continue_training = self._receive_async_evaluation()
 
         if self.eval_freq > 0 and self.n_calls % self.eval_freq == 0:
             # Sync training and eval env if there is VecNormalize
             sync_envs_normalization(self.training_env, self.eval_env)
 
+            if self.async_eval:
+                if self.pending_eval is None:
+                    self._start_async_evaluation()
+                return continue_training
+
             # Reset success rate buffer
             self._is_success_buffer = []
 
@@ -377,55 +544,146 @@ class EvalCallback(EventCallback):
                 warn=self.warn,
                 callback=self._log_success_callback,
             )
+            continue_training = self._process_evaluation(self.num_timesteps, episode_rewards, episode_lengths)
 
-            if self.log_path is not None:
-                self.evaluations_timesteps.append(self.num_timesteps)
-                self.evaluations_results.append(episode_rewards)
-                self.evaluations_length.append(episode_lengths)
-
-                kwargs = {}
-                # Save success log if present
-                if len(self._is_success_buffer) > 0:
-                    self.evaluations_successes.append(self._is_success_buffer)
-                    kwargs = dict(successes=self.evaluations_successes)
-
-                np.savez(
-                    self.log_path,
-                    timesteps=self.evaluations_timesteps,
-                    results=self.evaluations_results,
-                    ep_lengths=self.evaluations_length,
-                    **kwargs,
-                )
+        return continue_training
+
+    def _process_evaluation(self, num_timesteps: int, episode_rewards: List[float], episode_lengths: List[int]) -> bool:
+        """
+        Log and save the results of an evaluation, and save the best model.
+
+        :param num_timesteps: Number of timesteps of the evaluated model
+        :param episode_rewards: Reward of each episode
+        :param episode_lengths: Length of each episode
+        :return: Whether the training should continue (see ``callback_on_new_best``)
+        """
+        if self.log_path is not None:
+            self.evaluations_timesteps.append(num_timesteps)
+            self.evaluations_results.append(episode_rewards)
+            self.evaluations_length.append(episode_lengths)
+
+            kwargs = {}
+            # Save success log if present
+            if len(self._is_success_buffer) > 0:
+                self.evaluations_successes.append(self._is_success_buffer)
+                kwargs = dict(successes=self.evaluations_successes)
+
+            np.savez(
+                self.log_path,
+                timesteps=self.evaluations_timesteps,
+                results=self.evaluations_results,
+                ep_lengths=self.evaluations_length,
+                **kwargs,
+            )
 
-            mean_reward, std_reward = np.mean(episode_rewards), np.std(episode_rewards)
-            mean_ep_length, std_ep_length = np.mean(episode_lengths), np.std(episode_lengths)
-            self.last_mean_reward = mean_reward
+        mean_reward, std_reward = np.mean(episode_rewards), np.std(episode_rewards)
+        mean_ep_length, std_ep_length = np.mean(episode_lengths), np.std(episode_lengths)
+        self.last_mean_reward = mean_reward
 
+        if self.verbose > 0:
+            print(f"Eval num_timesteps={num_timesteps}, " f"episode_reward={mean_reward:.2f} +/- {std_reward:.2f}")
+            print(f"Episode length: {mean_ep_length:.2f} +/- {std_ep_length:.2f}")
+        # Add to current Logger
+        self.logger.record("eval/mean_reward", float(mean_reward))
+        self.logger.record("eval/mean_ep_length", mean_ep_length)
+
+        if len(self._is_success_buffer) > 0:
+            success_rate = np.mean(self._is_success_buffer)
             if self.verbose > 0:
-                print(f"Eval num_timesteps={self.num_timesteps}, " f"episode_reward={mean_reward:.2f} +/- {std_reward:.2f}")
-                print(f"Episode length: {mean_ep_length:.2f} +/- {std_ep_length:.2f}")
-            # Add to current Logger
-            self.logger.record("eval/mean_reward", float(mean_reward))
-            self.logger.record("eval/mean_ep_length", mean_ep_length)
+                print(f"Success rate: {100 * success_rate:.2f}%")
+            self.logger.record("eval/success_rate", success_rate)
 
-            if len(self._is_success_buffer) > 0:
-                success_rate = np.mean(self._is_success_buffer)
-                if self.verbose > 0:
-                    print(f"Success rate: {100 * success_rate:.2f}%")
-                self.logger.record("eval/success_rate", success_rate)
-
-            if mean_reward > self.best_mean_reward:
-                if self.verbose > 0:
-                    print("New best mean reward!")
-                if self.best_model_save_path is not None:
-                    self.model.save(os.path.join(self.best_model_save_path, "best_model"))
-                self.best_mean_reward = mean_reward
-                # Trigger callback if needed
-                if self.callback is not None:
-                    return self._on_event()
+        if mean_reward > self.best_mean_reward:
+            if self.verbose > 0:
+                print("New best mean reward!")
+            if self.best_model_save_path is not None:
+                self._save_best_model()
+            self.best_mean_reward = mean_reward
+            # Trigger callback if needed
+            if self.callback is not None:
+                return self._on_event()
 
         return True
 
+    def _save_best_model(self) -> None:
+        path = os.path.join(self.best_model_save_path, "best_model")
+        if self.pending_eval is None:
+            self.model.save(path)
+            return
+        # Import here to avoid a circular import
+        from stable_baselines3.common import save_util
+
+        # Save the evaluated weights, without modifying the policy being trained
+        num_timesteps, weights = self.pending_eval
+        data, params, pytorch_variables = self.model._get_save_data()
+        data["num_timesteps"] = num_timesteps
+        params["policy"] = weights
+        save_util.save_to_zip_file(path, data=data, params=params, pytorch_variables=pytorch_variables)
+
+    def _start_async_evaluation(self) -> None:
+        """
+        Send a snapshot of the weights (and of the normalization statistics) to the evaluation process.
+        The process is started at the first evaluation.
+        """
+        if self.eval_process is None:
+            policy = deepcopy(self.model.policy).to("cpu")
+            kwargs = dict(n_eval_episodes=self.n_eval_episodes, deterministic=self.deterministic, warn=self.warn)
+            start_method = self.start_method
+            if start_method is None:
+                # Same default as ``SubprocVecEnv``
+                start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+            ctx = mp.get_context(start_method)
+            self.eval_remote, work_remote = ctx.Pipe()
+            # ``VecNormalize`` does not pickle the environment it wraps, it is sent separately
+            vec_normalize = unwrap_vec_normalize(self.eval_env)
+            normalized_env = None if vec_normalize is None else vec_normalize.venv
+            payload = CloudpickleWrapper((policy, self.eval_env, normalized_env, kwargs))
+            args = (work_remote, self.eval_remote, payload)
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            self.eval_process = ctx.Process(target=_async_eval_worker, args=args, daemon=True)
+            self.eval_process.start()
+            work_remote.close()
+
+        weights = {key: value.detach().cpu().clone() for key, value in self.model.policy.state_dict().items()}
+        vec_normalize = unwrap_vec_normalize(self.eval_env)
+        normalization = None if vec_normalize is None else (vec_normalize.obs_rms, vec_normalize.ret_rms)
+        self.eval_remote.send(("evaluate", (weights, normalization)))
+        self.pending_eval = (self.num_timesteps, weights)
+
+    def _receive_async_evaluation(self) -> bool:
+        """
+        Process the results of the evaluation in progress, waiting for them if needed.
+
+        :return: Whether the training should continue (see ``callback_on_new_best``)
+        """
+        episode_rewards, episode_lengths, self._is_success_buffer = self.eval_remote.recv()
+        continue_training = self._process_evaluation(self.pending_eval[0], episode_rewards, episode_lengths)
+        self.pending_eval = None
+        return continue_training
+
+    def _on_training_end(self) -> None:
+        if self.pending_eval is not None:
+            # Record the last evaluation
+            self._receive_async_evaluation()
+        # The process is started again at the first evaluation of the next training
+        self.close()
+        super(EvalCallback, self)._on_training_end()
+
+    def close(self) -> None:
+        """
+        Stop the evaluation process (when using ``async_eval=True``).
+        It is called at the end of the training.
+        """
+        if self.eval_process is None:
+            return
+        if self.pending_eval is not None:
+            self.eval_remote.recv()
+            self.pending_eval = None
+        self.eval_remote.send(("close", None))
+        self.eval_process.join()
+        self.eval_remote.close()
+        self.eval_process = None
+
     def update_child_locals(self, locals_: Dict[str, Any]) -> None:
         """
         Update the references to the local variables.
@@ -530,3 +788,46 @@ class StopTrainingOnMaxEpisodes(BaseCallback):
         return continue_training
 
 
+def _async_eval_worker(
+    remote: mp.connection.Connection, parent_remote: mp.connection.Connection, payload: CloudpickleWrapper
+) -> None:
+    """
+    Evaluation process of ``EvalCallback(async_eval=True)``.
+
+    :param remote: Pipe to the main process
+    :param parent_remote: End of the pipe of the main process, closed here
+    :param payload: The policy, the evaluation environment, the environment wrapped by its ``VecNormalize`` (if any)
+        and the keyword arguments of ``evaluate_policy``
+    """
+    parent_remote.close()
+    # Leave the CPU to the training
+    th.set_num_threads(1)
+    policy, eval_env, normalized_env, kwargs = payload.var
+    if normalized_env is not None:
+        unwrap_vec_normalize(eval_env).set_venv(normalized_env)
+    successes = []
+
+    def log_success(locals_: Dict[str, Any], globals_: Dict[str, Any]) -> None:
+        if locals_["done"] and locals_["info"].get("is_success") is not None:
+            successes.append(locals_["info"]["is_success"])
+
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "evaluate":
+                weights, normalization = data
+                policy.load_state_dict(weights)
+                if normalization is not None:
+                    vec_normalize = unwrap_vec_normalize(eval_env)
+                    vec_normalize.obs_rms, vec_normalize.ret_rms = normalization
+                successes.clear()
+                episode_rewards, episode_lengths = evaluate_policy(
+                    policy, eval_env, return_episode_rewards=True, callback=log_success, **kwargs
+                )
+                remote.send((episode_rewards, episode_lengths, list(successes)))
+            elif cmd == "close":
+                eval_env.close()
+                remote.close()
+                break
+    except KeyboardInterrupt:
+        print("EvalCallback evaluation process: got KeyboardInterrupt")
@@ -1,5 +1,6 @@
 """Probability distributions."""
 
+import math
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -7,11 +8,15 @@ import gym
 import torch as th
 from gym import spaces
 from torch import nn
+from torch.nn import functional as F
 import numpy as np
 from torch.distributions import Bernoulli, Categorical, Normal
 
 from stable_baselines3.common.preprocessing import get_action_dim
 
+_LOG_2 = math.log(2.0)
+_HALF_LOG_2_PI = 0.5 * math.log(2.0 * math.pi)
+
 
 class Distribution(ABC):
     """Abstract base class for distributions."""
@@ -248,6 +253,47 @@ class SquashedDiagGaussianDistribution(DiagGaussianDistribution):
         log_prob = self.log_prob(action, self.gaussian_actions)
         return action, log_prob
 
+    def stateless_log_prob_from_params(self, mean_actions: th.Tensor, log_std: th.Tensor) -> Tuple[th.Tensor, th.Tensor]:
+        """
+        Faster version of ``log_prob_from_params()`` that does not create a ``torch.distributions.Normal`` object
+        (see ``squashed_diag_gaussian_log_prob_from_params()``).
+        The distribution is not updated, ``entropy()``, ``log_prob()`` and ``mode()`` do not reflect this call.
+
+        :param mean_actions: Mean of the Gaussian distribution
+        :param log_std: Log standard deviation of the Gaussian distribution
+        :return: Squashed actions and their log probability
+        """
+        return squashed_diag_gaussian_log_prob_from_params(mean_actions, log_std)
+
+
+def squashed_diag_gaussian_log_prob_from_params(
+    mean_actions: th.Tensor, log_std: th.Tensor, deterministic: bool = False
+) -> Tuple[th.Tensor, th.Tensor]:
+    """
+    Sample squashed actions and compute their log probability in a single pass,
+    without creating a ``torch.distributions.Normal`` object.
+
+    The log likelihood of the Gaussian sample is computed from the standard normal noise,
+    and the squash correction uses the numerically stable form
+    ``log(1 - tanh(x)^2) = 2 * (log(2) - x - softplus(-2x))``.
+
+    :param mean_actions: Mean of the Gaussian distribution
+    :param log_std: Log standard deviation of the Gaussian distribution
+    :param deterministic: Whether to return the mode (squashed mean) instead of a sample
+    :return: Squashed actions and their log probability
+    """
+    if deterministic:
+        gaussian_actions = mean_actions
+        log_prob = -log_std - _HALF_LOG_2_PI
+    else:
+        noise = th.randn_like(mean_actions)
+        # Reparametrization trick to pass gradients
+        gaussian_actions = mean_actions + noise * log_std.exp()
+        log_prob = -0.5 * noise.square() - log_std - _HALF_LOG_2_PI
+    log_prob = log_prob - 2.0 * (_LOG_2 - gaussian_actions - F.softplus(-2.0 * gaussian_actions))
+    return th.tanh(gaussian_actions), log_prob.sum(dim=-1)
+
+
 class NormalDistributionONNXable:
     def __init__(self, mean, std):
         self.mean = mean.detach()
@@ -25,6 +25,8 @@ def evaluate_policy(
     different elements of the vector env. This static division of work is done to
     remove bias. See https://github.com/DLR-RM/stable-baselines3/issues/402 for more
     details and discussion.
+    The observations of all the sub environments are passed to a single ``model.predict()`` call,
+    and without ``callback`` only the sub environments that are done are visited at each step.
 
     .. note::
         If environment has not been wrapped with ``Monitor`` wrapper, reward and
@@ -86,7 +88,12 @@ def evaluate_policy(
         observations, rewards, dones, infos = env.step(actions)
         current_rewards += rewards
         current_lengths += 1
-        for i in range(n_envs):
+        if callback is None:
+            # Only the done environments need to be processed
+            env_indices = np.flatnonzero(dones & (episode_counts < episode_count_targets))
+        else:
+            env_indices = range(n_envs)
+        for i in env_indices:
             if episode_counts[i] < episode_count_targets[i]:
 
                 # unpack values so that the callback can access the local variables
@@ -14,15 +14,35 @@ from stable_baselines3.common.vec_env import DummyVecEnv, VecVideoRecorder
 
 
 class DiscriminatorFunction:
-    def __init__(self, f, name, output_size, env="", function_kwargs=None):
+    """
+    Behaviour descriptor passed to the discriminator (``disc_on`` parameter of DIAYN).
+
+    :param f: Function mapping a batch of observations (numpy array or tensor) to its descriptor
+    :param name: Name of the descriptor, used in the run names
+    :param output_size: Size of the descriptor
+    :param env: Name of the environment the descriptor applies to
+    :param function_kwargs: Additional keyword arguments passed to ``f``
+    :param device: Device on which the descriptor is computed. By default, it is computed
+        where the observation lives. Numpy inputs still give numpy outputs.
+    """
+
+    def __init__(self, f, name, output_size, env="", function_kwargs=None, device=None):
         self.env = env
         self.name = name
         self.f = f
         self.output_size = output_size
         self.function_kwargs = function_kwargs
+        self.device = None if device is None else th.device(device)
 
     def __call__(self, obs):
-        return self.f(obs, **self.function_kwargs)
+        function_kwargs = self.function_kwargs or {}
+        # Functions saved before the device option was added
+        device = getattr(self, "device", None)
+        if device is None:
+            return self.f(obs, **function_kwargs)
+        if isinstance(obs, th.Tensor):
+            return self.f(obs.to(device), **function_kwargs)
+        return self.f(th.as_tensor(obs, device=device), **function_kwargs).cpu().numpy()
 
 
 def print_traj_nav_2d_static(
@@ -1,9 +1,12 @@
 import datetime
 import json
 import os
+import queue
 import sys
 import tempfile
+import threading
 import warnings
+import weakref
 from collections import defaultdict
 from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple, Union
 
@@ -326,6 +329,57 @@ class CSVOutputFormat(KVWriter):
         self.file.close()
 
 
+class TidyCSVOutputFormat(KVWriter):
+    def __init__(self, filename: str):
+        """
+        log to a file, in a long CSV format with one ``row,key,value`` line per logged value.
+        Contrary to ``CSVOutputFormat``, new keys do not require rewriting the whole file,
+        ``read_tidy_csv()`` reads it back in the wide format of ``read_csv()``.
+
+        :param filename: the file to write the log to
+        """
+        self.file = open(filename, "wt")
+        self.file.write("row,key,value\n")
+        self.n_rows = 0
+        self.quotechar = '"'
+
+    def _quote(self, string: str) -> str:
+        # escape quotechars by prepending them with another quotechar, and wrap the text with quotechars
+        return self.quotechar + string.replace(self.quotechar, self.quotechar + self.quotechar) + self.quotechar
+
+    def write(self, key_values: Dict[str, Any], key_excluded: Dict[str, Union[str, Tuple[str, ...]]], step: int = 0) -> None:
+        key_values = filter_excluded_keys(key_values, key_excluded, "csv")
+        lines = []
+        for key, value in key_values.items():
+            if isinstance(value, Video):
+                raise FormatUnsupportedError(["csv"], "video")
+
+            elif isinstance(value, Figure):
+                raise FormatUnsupportedError(["csv"], "figure")
+
+            elif isinstance(value, Image):
+                raise FormatUnsupportedError(["csv"], "image")
+
+            elif value is None:
+                continue
+
+            elif isinstance(value, (int, float, np.number)):
+                value = str(value)
+
+            else:
+                value = self._quote(str(value))
+            lines.append(f"{self.n_rows},{self._quote(key)},{value}\n")
+        self.file.write("".join(lines))
+        self.file.flush()
+        self.n_rows += 1
+
+    def close(self) -> None:
+        """
+        closes the file
+        """
+        self.file.close()
+
+
 class TensorBoardOutputFormat(KVWriter):
     def __init__(self, folder: str):
         """
@@ -378,7 +432,8 @@ def make_output_format(_format: str, log_dir: str, log_suffix: str = "") -> KVWr
     """
     return a logger for the requested format
 
-    :param _format: the requested format to log to ('stdout', 'log', 'json' or 'csv' or 'tensorboard')
+    :param _format: the requested format to log to
+        ('stdout', 'log', 'json', 'csv', 'tidy_csv' or 'tensorboard')
     :param log_dir: the logging directory
     :param log_suffix: the suffix for the log file
     :return: the logger
@@ -392,6 +447,8 @@ def make_output_format(_format: str, log_dir: str, log_suffix: str = "") -> KVWr
         return JSONOutputFormat(os.path.join(log_dir, f"progress{log_suffix}.json"))
     elif _format == "csv":
         return CSVOutputFormat(os.path.join(log_dir, f"progress{log_suffix}.csv"))
+    elif _format == "tidy_csv":
+        return TidyCSVOutputFormat(os.path.join(log_dir, f"progress{log_suffix}.tidy.csv"))
     elif _format == "tensorboard":
         return TensorBoardOutputFormat(log_dir)
     else:
@@ -403,21 +460,87 @@ def make_output_format(_format: str, log_dir: str, log_suffix: str = "") -> KVWr
 # ================================================================
 
 
+def _stop_queued_writer(write_queue: queue.Queue, thread: threading.Thread, output_formats: List[KVWriter]) -> None:
+    """
+    Stop the background thread of a queued logger, after it wrote the queue, and close the output formats.
+    Called by ``Logger.close()``, or when the logger is garbage collected or the interpreter exits.
+
+    :param write_queue: the queue of the background thread
+    :param thread: the background thread
+    :param output_formats: the output formats
+    """
+    if thread.is_alive():
+        write_queue.put(None)
+        thread.join()
+    for _format in output_formats:
+        _format.close()
+
+
+def _write_queued(write_queue: queue.Queue, output_formats: List[KVWriter], errors: List[Exception]) -> None:
+    """
+    Loop of the background thread of a queued logger:
+    write the key/values and the sequences of the queue to the output formats, until ``None`` is received.
+    It does not reference the logger, so that the logger can be garbage collected.
+
+    :param write_queue: the queue of ``("kv", (key_values, key_excluded, step))`` and ``("seq", sequence)`` items
+    :param output_formats: the output formats
+    :param errors: list where the exceptions raised by the output formats are stored
+    """
+    while True:
+        item = write_queue.get()
+        try:
+            if item is None:
+                return
+            kind, args = item
+            for _format in output_formats:
+                # A failing output format does not prevent the others from being written
+                try:
+                    if kind == "kv" and isinstance(_format, KVWriter):
+                        _format.write(*args)
+                    elif kind == "seq" and isinstance(_format, SeqWriter):
+                        _format.write_sequence(args)
+                except Exception as error:
+                    errors.append(error)
+        finally:
+            write_queue.task_done()
+
+
 class Logger(object):
     """
     The logger class.
 
+    With ``queue_size > 0``, ``dump()`` and ``log()`` only put a snapshot of the values in a bounded queue,
+    the formatting and the I/O are done by a background thread.
+    ``dump()`` blocks only when the queue is full, ``flush()`` waits for the writes to be done
+    and ``close()`` flushes the queue before closing the outputs.
+    The recorded values are not copied, mutable values (e.g. arrays) must not be modified in place after being recorded.
+    Exceptions raised by the outputs (e.g. ``FormatUnsupportedError``) are re-raised by the next call
+    to ``dump()``, ``flush()`` or ``close()``.
+
     :param folder: the logging location
     :param output_formats: the list of output formats
+    :param queue_size: maximal number of dumps waiting to be written by the background thread,
+        0 to write synchronously
     """
 
-    def __init__(self, folder: Optional[str], output_formats: List[KVWriter]):
+    def __init__(self, folder: Optional[str], output_formats: List[KVWriter], queue_size: int = 0):
         self.name_to_value = defaultdict(float)  # values this iteration
         self.name_to_count = defaultdict(int)
         self.name_to_excluded = defaultdict(str)
         self.level = INFO
         self.dir = folder
         self.output_formats = output_formats
+        assert queue_size >= 0, "`queue_size` must be positive or 0"
+        self.queue_size = queue_size
+        self._queue, self._thread, self._errors, self._finalizer = None, None, [], None
+        if queue_size > 0:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(
+                target=_write_queued, args=(self._queue, output_formats, self._errors), daemon=True
+            )
+            self._thread.start()
+            # Stop the thread when the logger is garbage collected or at exit, if it was not closed
+            self._finalizer = weakref.finalize(self, _stop_queued_writer, self._queue, self._thread, output_formats)
 
     def record(self, key: str, value: Any, exclude: Optional[Union[str, Tuple[str, ...]]] = None) -> None:
         """
@@ -454,14 +577,37 @@ class Logger(object):
         """
         if self.level == DISABLED:
             return
-        for _format in self.output_formats:
-            if isinstance(_format, KVWriter):
-                _format.write(self.name_to_value, self.name_to_excluded, step)
+        if self._queue is not None:
+            self._raise_queued_error()
+            # The dicts are cleared below, the background thread gets copies
+            self._queue.put(("kv", (dict(self.name_to_value), dict(self.name_to_excluded), step)))
+        else:
+            for _format in self.output_formats:
+                if isinstance(_format, KVWriter):
+                    _format.write(self.name_to_value, self.name_to_excluded, step)
 
         self.name_to_value.clear()
         self.name_to_count.clear()
         self.name_to_excluded.clear()
 
+    def flush(self) -> None:
+        """
+        Wait for the background thread to write the queued dumps and logs.
+        Nothing is done if the logger is not queued.
+        """
+        if self._queue is not None:
+            self._queue.join()
+            self._raise_queued_error()
+
+    def _raise_queued_error(self) -> None:
+        """
+        Re-raise the first exception raised by the output formats in the background thread.
+        """
+        if self._errors:
+            error = self._errors.pop(0)
+            self._errors.clear()
+            raise error
+
     def log(self, *args, level: int = INFO) -> None:
         """
         Write the sequence of args, with no separators,
@@ -537,10 +683,15 @@ class Logger(object):
 
     def close(self) -> None:
         """
-        closes the file
+        closes the file, after flushing the queue of a queued logger
         """
-        for _format in self.output_formats:
-            _format.close()
+        if self._finalizer is not None:
+            # No-op if the logger was already closed
+            self._finalizer()
+        else:
+            for _format in self.output_formats:
+                _format.close()
+        self._raise_queued_error()
 
     # Misc
     # ----------------------------------------
@@ -550,12 +701,16 @@ class Logger(object):
 
         :param args: the arguments to log
         """
+        if self._queue is not None:
+            # Keep the order with the queued dumps
+            self._queue.put(("seq", list(map(str, args))))
+            return
         for _format in self.output_formats:
             if isinstance(_format, SeqWriter):
                 _format.write_sequence(map(str, args))
 
 
-def configure(folder: Optional[str] = None, format_strings: Optional[List[str]] = None) -> Logger:
+def configure(folder: Optional[str] = None, format_strings: Optional[List[str]] = None, queue_size: int = 0) -> Logger:
     """
     Configure the current logger.
 
@@ -563,6 +718,8 @@ def configure(folder: Optional[str] = None, format_strings: Optional[List[str]]
         (if None, $SB3_LOGDIR, if still None, tempdir/SB3-[date & time])
     :param format_strings: the output logging format
         (if None, $SB3_LOG_FORMAT, if still None, ['stdout', 'log', 'csv'])
+    :param queue_size: maximal number of dumps waiting to be written by a background thread,
+        0 to write synchronously (see ``Logger``)
     :return: The logger object.
     """
     if folder is None:
@@ -579,7 +736,7 @@ def configure(folder: Optional[str] = None, format_strings: Optional[List[str]]
     format_strings = list(filter(None, format_strings))
     output_formats = [make_output_format(f, folder, log_suffix) for f in format_strings]
 
-    logger = Logger(folder=folder, output_formats=output_formats)
+    logger = Logger(folder=folder, output_formats=output_formats, queue_size=queue_size)
     # Only print when some files will be saved
     if len(format_strings) > 0 and format_strings != ["stdout"]:
         logger.log(f"Logging to {folder}")
@@ -613,3 +770,31 @@ def read_csv(filename: str) -> pandas.DataFrame:
     :return: the data in the csv
     """
     return pandas.read_csv(filename, index_col=None, comment="#")
+
+
+def read_tidy_csv(filename: str) -> pandas.DataFrame:
+    """
+    read a file written by ``TidyCSVOutputFormat``, in the wide format returned by ``read_csv()``:
+    one row per dump, one column per key and NaN for the keys missing in a dump.
+
+    :param filename: the file path to read
+    :return: the data in the csv
+    """
+    data = pandas.read_csv(filename, dtype={"row": np.int64, "key": str, "value": str}, keep_default_na=False)
+    n_rows = data["row"].max() + 1 if len(data) > 0 else 0
+    # Keys in order of appearance, rows without any value are kept
+    wide = data.pivot(index="row", columns="key", values="value")
+    wide = wide.reindex(index=range(n_rows), columns=data["key"].unique())
+    wide.columns.name = None
+    for key in wide.columns:
+        values = wide[key].replace("", np.nan)
+        try:
+            wide[key] = pandas.to_numeric(values)
+        except ValueError:
+            # Booleans, read as bool by pandas.read_csv when no value is missing
+            if values.isin(["True", "False", np.nan]).all():
+                values = values.map({"True": True, "False": False})
+                wide[key] = values.astype(bool) if values.notna().all() else values
+            else:
+                wide[key] = values
+    return wide.reset_index(drop=True)
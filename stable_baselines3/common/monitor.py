@@ -1,11 +1,12 @@
 __all__ = ["Monitor", "ResultsWriter", "get_monitor_files", "load_results"]
 
 import csv
+import io
 import json
 import os
 import time
 from glob import glob
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import gym
 import numpy as np
@@ -24,9 +25,12 @@ class Monitor(gym.Wrapper):
     :param reset_keywords: extra keywords for the reset call,
         if extra parameters are needed at reset
     :param info_keywords: extra information to log, from the information return of env.step()
+    :param results_writer_kwargs: Keyword arguments to pass to the ``ResultsWriter``
+        (e.g. to buffer the episodes or to use the binary format)
     """
 
     EXT = "monitor.csv"
+    BINARY_EXT = "monitor.bin"
 
     def __init__(
         self,
@@ -35,6 +39,7 @@ class Monitor(gym.Wrapper):
         allow_early_resets: bool = True,
         reset_keywords: Tuple[str, ...] = (),
         info_keywords: Tuple[str, ...] = (),
+        results_writer_kwargs: Optional[Dict[str, Any]] = None,
     ):
         super(Monitor, self).__init__(env=env)
         self.t_start = time.time()
@@ -43,13 +48,16 @@ class Monitor(gym.Wrapper):
                 filename,
                 header={"t_start": self.t_start, "env_id": env.spec and env.spec.id},
                 extra_keys=reset_keywords + info_keywords,
+                **(results_writer_kwargs or {}),
             )
         else:
             self.results_writer = None
         self.reset_keywords = reset_keywords
         self.info_keywords = info_keywords
         self.allow_early_resets = allow_early_resets
-        self.rewards = None
+        # Return and length of the current episode
+        self.episode_return = 0.0
+        self.episode_length = 0
         self.needs_reset = True
         self.episode_returns = []
         self.episode_lengths = []
@@ -69,7 +77,8 @@ class Monitor(gym.Wrapper):
                 "Tried to reset an environment before done. If you want to allow early resets, "
                 "wrap your env with Monitor(env, path, allow_early_resets=True)"
             )
-        self.rewards = []
+        self.episode_return = 0.0
+        self.episode_length = 0
         self.needs_reset = False
         for key in self.reset_keywords:
             value = kwargs.get(key)
@@ -88,11 +97,12 @@ class Monitor(gym.Wrapper):
         if self.needs_reset:
             raise RuntimeError("Tried to step environment that needs reset")
         observation, reward, done, info = self.env.step(action)
-        self.rewards.append(reward)
+        self.episode_return += reward
+        self.episode_length += 1
         if done:
             self.needs_reset = True
-            ep_rew = sum(self.rewards)
-            ep_len = len(self.rewards)
+            ep_rew = self.episode_return
+            ep_len = self.episode_length
             ep_info = {"r": round(ep_rew, 6), "l": ep_len, "t": round(time.time() - self.t_start, 6)}
             for key in self.info_keywords:
                 ep_info[key] = info[key]
@@ -159,10 +169,20 @@ class ResultsWriter:
     """
     A result writer that saves the data from the `Monitor` class
 
+    The episodes can be buffered and written in batches, ``flush()`` (or ``close()``)
+    writes the pending episodes.
+
     :param filename: the location to save a log file, can be None for no log
     :param header: the header dictionary object of the saved csv
     :param reset_keywords: the extra information to log, typically is composed of
         ``reset_keywords`` and ``info_keywords``
+    :param buffer_size: Number of episodes kept in memory before being written,
+        the default writes and flushes the file at every episode
+    :param flush_interval: If given, the buffered episodes are also written
+        when this number of seconds has elapsed since the last write
+    :param file_format: "csv" (default) or "binary". The binary format is columnar: each batch of episodes
+        is stored as one numpy array per key, in the order of the keys listed in the header line.
+        It only supports numeric extra keys.
     """
 
     def __init__(
@@ -170,35 +190,111 @@ class ResultsWriter:
         filename: str = "",
         header: Dict[str, Union[float, str]] = None,
         extra_keys: Tuple[str, ...] = (),
+        buffer_size: int = 1,
+        flush_interval: Optional[float] = None,
+        file_format: str = "csv",
     ):
+        assert file_format in {"csv", "binary"}, "`file_format` must be one of following: 'csv', 'binary'"
+        assert buffer_size >= 1, "`buffer_size` must be positive"
         if header is None:
             header = {}
-        if not filename.endswith(Monitor.EXT):
+        ext = Monitor.EXT if file_format == "csv" else Monitor.BINARY_EXT
+        if not filename.endswith(ext):
             if os.path.isdir(filename):
-                filename = os.path.join(filename, Monitor.EXT)
+                filename = os.path.join(filename, ext)
             else:
-                filename = filename + "." + Monitor.EXT
-        self.file_handler = open(filename, "wt")
-        self.file_handler.write("#%s\n" % json.dumps(header))
-        self.logger = csv.DictWriter(self.file_handler, fieldnames=("r", "l", "t") + extra_keys)
-        self.logger.writeheader()
+                filename = filename + "." + ext
+        self.fieldnames = ("r", "l", "t") + extra_keys
+        self.file_format = file_format
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.pending_rows = []
+        self.last_flush = time.time()
+        self.file_handler = open(filename, "wt" if file_format == "csv" else "wb")
+        if file_format == "csv":
+            self.file_handler.write("#%s\n" % json.dumps(header))
+            self.logger = csv.DictWriter(self.file_handler, fieldnames=self.fieldnames)
+            self.logger.writeheader()
+        else:
+            # The keys are needed to read the columns back
+            self.file_handler.write(("#%s\n" % json.dumps(dict(header, fields=list(self.fieldnames)))).encode())
+            self.logger = None
         self.file_handler.flush()
 
     def write_row(self, epinfo: Dict[str, Union[float, int]]) -> None:
         """
-        Close the file handler
+        Write the information of an episode, once enough episodes are buffered
 
         :param epinfo: the information on episodic return, length, and time
         """
-        if self.logger:
-            self.logger.writerow(epinfo)
+        self.write_rows([epinfo])
+
+    def write_rows(self, epinfos: List[Dict[str, Union[float, int]]]) -> None:
+        """
+        Write the information of several episodes, once enough episodes are buffered
+
+        :param epinfos: the information on episodic return, length, and time of each episode
+        """
+        self.pending_rows.extend(epinfos)
+        if len(self.pending_rows) >= self.buffer_size or (
+            self.flush_interval is not None and time.time() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered episodes and flush the file
+        """
+        if self.pending_rows:
+            if self.file_format == "csv":
+                self.logger.writerows(self.pending_rows)
+            else:
+                for key in self.fieldnames:
+                    np.save(self.file_handler, _column(self.pending_rows, key))
+            self.pending_rows = []
             self.file_handler.flush()
+        self.last_flush = time.time()
 
     def close(self) -> None:
         """
         Close the file handler
         """
-        self.file_handler.close()
+        if not self.file_handler.closed:
+            self.flush()
+            self.file_handler.close()
+
+
+def _column(rows: List[Dict[str, Union[float, int]]], key: str) -> np.ndarray:
+    """
+    :param rows: the information of each episode
+    :param key: key to store, ``"l"`` is stored as an integer, the other keys as floats
+    :return: the values of the key for all the episodes
+    """
+    return np.array([row[key] for row in rows], dtype=np.int64 if key == "l" else np.float64)
+
+
+def read_binary_monitor_file(file_name: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """
+    Read a monitor file written with the binary format.
+
+    :param file_name: path of the file
+    :return: the header and the episodes as a numpy structured array
+    """
+    with open(file_name, "rb") as file_handler:
+        first_line = file_handler.readline()
+        assert first_line[:1] == b"#"
+        header = json.loads(first_line[1:].decode())
+        fieldnames = header.pop("fields")
+        columns = {key: [_column([], key)] for key in fieldnames}
+        # Each flush appended one array per key
+        while file_handler.peek(1):
+            for key in fieldnames:
+                columns[key].append(np.load(file_handler))
+    columns = {key: np.concatenate(chunks) for key, chunks in columns.items()}
+    records = np.zeros(len(columns["r"]), dtype=[(key, columns[key].dtype) for key in fieldnames])
+    for key in fieldnames:
+        records[key] = columns[key]
+    return header, records
 
 
 def get_monitor_files(path: str) -> List[str]:
@@ -206,33 +302,72 @@ def get_monitor_files(path: str) -> List[str]:
     get all the monitor files in the given path
 
     :param path: the logging folder
-    :return: the log files
+    :return: the log files (csv files, then binary files)
     """
-    return glob(os.path.join(path, "*" + Monitor.EXT))
+    return glob(os.path.join(path, "*" + Monitor.EXT)) + glob(os.path.join(path, "*" + Monitor.BINARY_EXT))
 
 
 def load_results(path: str) -> pandas.DataFrame:
     """
-    Load all Monitor logs from a given directory path matching ``*monitor.csv``
+    Load all Monitor logs from a given directory path matching ``*monitor.csv`` or ``*monitor.bin``
+
+    The csv files with the same columns are parsed at once,
+    instead of building and concatenating a data frame per file.
 
     :param path: the directory path containing the log file(s)
     :return: the logged data
     """
     monitor_files = get_monitor_files(path)
     if len(monitor_files) == 0:
-        raise LoadMonitorResultsError(f"No monitor files of the form *{Monitor.EXT} found in {path}")
+        raise LoadMonitorResultsError(
+            f"No monitor files of the form *{Monitor.EXT} or *{Monitor.BINARY_EXT} found in {path}"
+        )
     data_frames, headers = [], []
+    # Content of the csv files, grouped by columns
+    csv_groups = {}
     for file_name in monitor_files:
-        with open(file_name, "rt") as file_handler:
-            first_line = file_handler.readline()
-            assert first_line[0] == "#"
-            header = json.loads(first_line[1:])
-            data_frame = pandas.read_csv(file_handler, index_col=None)
-            headers.append(header)
+        if file_name.endswith(Monitor.BINARY_EXT):
+            header, records = read_binary_monitor_file(file_name)
+            data_frame = pandas.DataFrame(records)
             data_frame["t"] += header["t_start"]
-        data_frames.append(data_frame)
+            data_frames.append(data_frame)
+        else:
+            with open(file_name, "rt") as file_handler:
+                first_line = file_handler.readline()
+                assert first_line[0] == "#"
+                header = json.loads(first_line[1:])
+                columns = file_handler.readline()
+                body = file_handler.read()
+            if body and not body.endswith("\n"):
+                body += "\n"
+            csv_groups.setdefault(columns, []).append((header, body))
+        headers.append(header)
+    for columns, files in csv_groups.items():
+        data_frames.append(_read_csv_group(columns, files))
     data_frame = pandas.concat(data_frames)
     data_frame.sort_values("t", inplace=True)
     data_frame.reset_index(inplace=True)
     data_frame["t"] -= min(header["t_start"] for header in headers)
     return data_frame
+
+
+def _read_csv_group(columns: str, files: List[Tuple[Dict[str, Any], str]]) -> pandas.DataFrame:
+    """
+    Parse the content of monitor files with the same columns in a single data frame.
+
+    :param columns: the line of column names
+    :param files: the header and the rows of each file
+    :return: the data frame, with the start time of each file added to ``t``
+    """
+    data_frame = pandas.read_csv(io.StringIO(columns + "".join(body for _, body in files)), index_col=None)
+    n_rows = [body.count("\n") for _, body in files]
+    if sum(n_rows) != len(data_frame):
+        # Quoted values spanning several lines, the files are parsed one by one
+        data_frames = []
+        for header, body in files:
+            file_data_frame = pandas.read_csv(io.StringIO(columns + body), index_col=None)
+            file_data_frame["t"] += header["t_start"]
+            data_frames.append(file_data_frame)
+        return pandas.concat(data_frames)
+    data_frame["t"] += np.repeat([header["t_start"] for header, _ in files], n_rows)
+    return data_frame
@@ -9,11 +9,24 @@ import numpy as np
 import torch as th
 
 from stable_baselines3.common.base_class import BaseAlgorithm
-from stable_baselines3.common.buffers import DictReplayBuffer, ReplayBuffer
+from stable_baselines3.common.buffers import (
+    DictReplayBuffer,
+    PrefetchBuffer,
+    ReplayBuffer,
+    ReplayBufferZ,
+    ReplayBufferZExternalDisc,
+    ReplayBufferZExternalDiscTraj,
+)
 from stable_baselines3.common.callbacks import BaseCallback
 from stable_baselines3.common.noise import ActionNoise
 from stable_baselines3.common.policies import BasePolicy
-from stable_baselines3.common.save_util import load_from_pkl, save_to_pkl
+from stable_baselines3.common.save_util import (
+    is_replay_buffer_chunks,
+    load_from_pkl,
+    load_replay_buffer_chunks,
+    save_replay_buffer_chunks,
+    save_to_pkl,
+)
 from stable_baselines3.common.type_aliases import (
     GymEnv,
     MaybeCallback,
@@ -22,7 +35,7 @@ from stable_baselines3.common.type_aliases import (
     TrainFreq,
     TrainFrequencyUnit,
 )
-from stable_baselines3.common.utils import safe_mean, should_collect_more_steps
+from stable_baselines3.common.utils import AutocastFunction, safe_mean, should_collect_more_steps
 from stable_baselines3.common.vec_env import VecEnv
 from stable_baselines3.her.her_replay_buffer import HerReplayBuffer
 
@@ -55,6 +68,8 @@ class OffPolicyAlgorithm(BaseAlgorithm):
     :param optimize_memory_usage: Enable a memory efficient variant of the replay buffer
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
+    :param prefetch_batches: Number of minibatches to sample in advance on a background thread
+        (see ``PrefetchBuffer``). Set to ``0`` (default) to sample synchronously.
     :param policy_kwargs: Additional arguments to be passed to the policy on creation
     :param tensorboard_log: the log location for tensorboard (if None, no logging)
     :param verbose: The verbosity level: 0 none, 1 training information, 2 debug
@@ -78,6 +93,14 @@ class OffPolicyAlgorithm(BaseAlgorithm):
     :param remove_time_limit_termination: Remove terminations (dones) that are due to time limit.
         See https://github.com/hill-a/stable-baselines/issues/863
     :param supported_action_spaces: The action spaces supported by the algorithm.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
+    :param mixed_precision: Whether to run the forward passes of the networks
+        (see ``_get_mixed_precision_functions()``) under bfloat16 autocast.
+        The weights, the optimizers and the losses remain in float32,
+        as bfloat16 has the range of float32, no loss scaling is needed. Requires PyTorch >= 1.10.
+        Use ``replay_buffer_kwargs=dict(obs_dtype=...)`` to also reduce the storage of the observations.
     """
 
     def __init__(
@@ -97,6 +120,7 @@ class OffPolicyAlgorithm(BaseAlgorithm):
         replay_buffer_class: Optional[ReplayBuffer] = None,
         replay_buffer_kwargs: Optional[Dict[str, Any]] = None,
         optimize_memory_usage: bool = False,
+        prefetch_batches: int = 0,
         policy_kwargs: Dict[str, Any] = None,
         tensorboard_log: Optional[str] = None,
         verbose: int = 0,
@@ -111,6 +135,9 @@ class OffPolicyAlgorithm(BaseAlgorithm):
         sde_support: bool = False,
         remove_time_limit_termination: bool = False,
         supported_action_spaces: Optional[Tuple[gym.spaces.Space, ...]] = None,
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
+        mixed_precision: bool = False,
     ):
 
         super(OffPolicyAlgorithm, self).__init__(
@@ -129,6 +156,8 @@ class OffPolicyAlgorithm(BaseAlgorithm):
             use_sde=use_sde,
             sde_sample_freq=sde_sample_freq,
             supported_action_spaces=supported_action_spaces,
+            compile=compile,
+            compile_kwargs=compile_kwargs,
         )
         self.buffer_size = buffer_size
         self.batch_size = batch_size
@@ -138,6 +167,7 @@ class OffPolicyAlgorithm(BaseAlgorithm):
         self.gradient_steps = gradient_steps
         self.action_noise = action_noise
         self.optimize_memory_usage = optimize_memory_usage
+        self.prefetch_batches = prefetch_batches
         self.replay_buffer_class = replay_buffer_class
         if replay_buffer_kwargs is None:
             replay_buffer_kwargs = {}
@@ -158,6 +188,10 @@ class OffPolicyAlgorithm(BaseAlgorithm):
             self.policy_kwargs["use_sde"] = self.use_sde
         # For gSDE only
         self.use_sde_at_warmup = use_sde_at_warmup
+        # bfloat16 autocast, the functions are wrapped when the learning starts
+        assert not mixed_precision or hasattr(th, "autocast"), "`mixed_precision=True` requires PyTorch >= 1.10"
+        self.mixed_precision = mixed_precision
+        self.autocast_functions = None  # type: Optional[List[AutocastFunction]]
 
     def _convert_train_freq(self) -> None:
         """
@@ -211,6 +245,9 @@ class OffPolicyAlgorithm(BaseAlgorithm):
                     self.action_space,
                     self.device,
                     optimize_memory_usage=self.optimize_memory_usage,
+                    normalize_on_device=self.replay_buffer_kwargs.get(
+                        "normalize_on_device", False
+                    ),
                 )
 
             self.replay_buffer = HerReplayBuffer(
@@ -231,6 +268,8 @@ class OffPolicyAlgorithm(BaseAlgorithm):
                 **self.replay_buffer_kwargs,
             )
 
+        self._wrap_replay_buffer()
+
         self.policy = self.policy_class(  # pytype:disable=not-instantiable
             self.observation_space,
             self.action_space,
@@ -242,40 +281,102 @@ class OffPolicyAlgorithm(BaseAlgorithm):
         # Convert train freq parameter to TrainFreq object
         self._convert_train_freq()
 
+    def _wrap_replay_buffer(self) -> None:
+        """
+        Wrap the replay buffer in a ``PrefetchBuffer`` when ``prefetch_batches > 0``.
+        """
+        if getattr(self, "prefetch_batches", 0) > 0 and not isinstance(self.replay_buffer, PrefetchBuffer):
+            # HER calls the env to relabel the rewards, which is not thread-safe
+            assert not isinstance(
+                self.replay_buffer, HerReplayBuffer
+            ), "`prefetch_batches` is not supported with `HerReplayBuffer`"
+            self.replay_buffer = PrefetchBuffer(self.replay_buffer, self.prefetch_batches, seed=self.seed)
+
+    def _stop_prefetching(self) -> None:
+        """
+        Stop the sampling threads of the ``PrefetchBuffer`` if any,
+        they are restarted by the next call to ``train()``.
+        """
+        if isinstance(self.replay_buffer, PrefetchBuffer):
+            self.replay_buffer.close()
+
+    def _unwrapped_replay_buffer(self) -> Optional[ReplayBuffer]:
+        """
+        :return: The replay buffer, without the ``PrefetchBuffer`` wrapper if any.
+        """
+        if isinstance(self.replay_buffer, PrefetchBuffer):
+            return self.replay_buffer.buffer
+        return self.replay_buffer
+
     def save_replay_buffer(
-        self, path: Union[str, pathlib.Path, io.BufferedIOBase]
+        self,
+        path: Union[str, pathlib.Path, io.BufferedIOBase],
+        file_format: str = "pkl",
+        chunk_size: int = 10000,
+        compression: Optional[str] = None,
+        n_threads: int = 1,
     ) -> None:
         """
         Save the replay buffer as a pickle file.
 
         :param path: Path to the file where the replay buffer should be saved.
             if path is a str or pathlib.Path, the path is automatically created if necessary.
+        :param file_format: "pkl" for a pickle file, "chunks" for a folder where the filled
+            part of the storage arrays is written by chunks, without copying the buffer
+            (see ``save_util.save_replay_buffer_chunks()``)
+        :param chunk_size: Number of rows per chunk
+            (transitions, or episodes for ``HerReplayBuffer``)
+        :param compression: Compression of the chunks, None, "zlib" or "lzma"
+        :param n_threads: Number of threads compressing and writing the chunks
         """
         assert self.replay_buffer is not None, "The replay buffer is not defined"
-        save_to_pkl(path, self.replay_buffer, self.verbose)
+        assert file_format in ("pkl", "chunks"), f"Unknown file format {file_format}"
+        if file_format == "pkl":
+            save_to_pkl(path, self._unwrapped_replay_buffer(), self.verbose)
+        else:
+            save_replay_buffer_chunks(
+                path,
+                self._unwrapped_replay_buffer(),
+                chunk_size,
+                compression,
+                n_threads,
+            )
 
     def load_replay_buffer(
         self,
         path: Union[str, pathlib.Path, io.BufferedIOBase],
         truncate_last_traj: bool = True,
+        n_threads: int = 1,
     ) -> None:
         """
-        Load a replay buffer from a pickle file.
+        Load a replay buffer from a pickle file,
+        or from a folder written by ``save_replay_buffer(file_format="chunks")``.
 
         :param path: Path to the pickled replay buffer.
         :param truncate_last_traj: When using ``HerReplayBuffer`` with online sampling:
             If set to ``True``, we assume that the last trajectory in the replay buffer was finished
             (and truncate it).
             If set to ``False``, we assume that we continue the same trajectory (same episode).
+        :param n_threads: Number of threads reading the chunks of the replay buffer
         """
-        self.replay_buffer = load_from_pkl(path, self.verbose)
+        self._stop_prefetching()
+        if is_replay_buffer_chunks(path):
+            self.replay_buffer = load_replay_buffer_chunks(path, n_threads)
+        else:
+            self.replay_buffer = load_from_pkl(path, self.verbose)
+        replay_buffer_classes = (
+            ReplayBuffer,
+            ReplayBufferZ,
+            ReplayBufferZExternalDisc,
+            ReplayBufferZExternalDiscTraj,
+        )
         assert isinstance(
-            self.replay_buffer, ReplayBuffer
+            self.replay_buffer, replay_buffer_classes
         ), "The replay buffer must inherit from ReplayBuffer class"
 
         # Backward compatibility with SB3 < 2.1.0 replay buffer
         # Keep old behavior: do not handle timeout termination separately
-        if not hasattr(
+        if isinstance(self.replay_buffer, ReplayBuffer) and not hasattr(
             self.replay_buffer, "handle_timeout_termination"
         ):  # pragma: no cover
             self.replay_buffer.handle_timeout_termination = False
@@ -289,6 +390,8 @@ class OffPolicyAlgorithm(BaseAlgorithm):
             if truncate_last_traj:
                 self.replay_buffer.truncate_last_trajectory()
 
+        self._wrap_replay_buffer()
+
     def _setup_learn(
         self,
         total_timesteps: int,
@@ -312,7 +415,7 @@ class OffPolicyAlgorithm(BaseAlgorithm):
         if isinstance(self.replay_buffer, HerReplayBuffer):
             replay_buffer = self.replay_buffer.replay_buffer
         else:
-            replay_buffer = self.replay_buffer
+            replay_buffer = self._unwrapped_replay_buffer()
 
         truncate_last_traj = (
             self.optimize_memory_usage
@@ -332,7 +435,7 @@ class OffPolicyAlgorithm(BaseAlgorithm):
             pos = (replay_buffer.pos - 1) % replay_buffer.buffer_size
             replay_buffer.dones[pos] = True
 
-        return super()._setup_learn(
+        total_timesteps, callback = super()._setup_learn(
             total_timesteps,
             eval_env,
             callback,
@@ -343,6 +446,28 @@ class OffPolicyAlgorithm(BaseAlgorithm):
             tb_log_name,
         )
 
+        # After the compilation: the compiled functions are run under autocast
+        if self.mixed_precision and self.autocast_functions is None:
+            self.autocast_functions = []
+            for owner, name in self._get_mixed_precision_functions():
+                autocast_function = AutocastFunction(getattr(owner, name), self.device.type)
+                setattr(owner, name, autocast_function)
+                self.autocast_functions.append(autocast_function)
+
+        return total_timesteps, callback
+
+    def _get_mixed_precision_functions(self) -> List[Tuple[Any, str]]:
+        """
+        Returns the functions run under bfloat16 autocast when ``mixed_precision=True``,
+        as ``(owner, attribute name)`` pairs. By default, the forward pass of the policy.
+
+        :return: List of the functions to run in mixed precision
+        """
+        return [(self.policy, "forward")]
+
+    def _excluded_save_params(self) -> List[str]:
+        return super()._excluded_save_params() + ["autocast_functions"]
+
     def learn(
         self,
         total_timesteps: int,
@@ -393,6 +518,7 @@ class OffPolicyAlgorithm(BaseAlgorithm):
                 )
                 self.train(batch_size=self.batch_size, gradient_steps=gradient_steps)
 
+        self._stop_prefetching()
         callback.on_training_end()
 
         return self
@@ -457,15 +583,10 @@ class OffPolicyAlgorithm(BaseAlgorithm):
         time_elapsed = time.time() - self.start_time
         fps = int(self.num_timesteps / (time_elapsed + 1e-8))
         self.logger.record("time/episodes", self._episode_num, exclude="tensorboard")
-        if len(self.ep_info_buffer) > 0 and len(self.ep_info_buffer[0]) > 0:
-            self.logger.record(
-                "rollout/ep_rew_mean",
-                safe_mean([ep_info["r"] for ep_info in self.ep_info_buffer]),
-            )
-            self.logger.record(
-                "rollout/ep_len_mean",
-                safe_mean([ep_info["l"] for ep_info in self.ep_info_buffer]),
-            )
+        episode_stats = self._get_episode_stats()
+        if episode_stats is not None:
+            self.logger.record("rollout/ep_rew_mean", episode_stats[0])
+            self.logger.record("rollout/ep_len_mean", episode_stats[1])
         self.logger.record("time/fps", fps)
         self.logger.record(
             "time/time_elapsed", int(time_elapsed), exclude="tensorboard"
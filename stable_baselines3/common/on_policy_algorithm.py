@@ -10,7 +10,7 @@ from stable_baselines3.common.buffers import DictRolloutBuffer, RolloutBuffer
 from stable_baselines3.common.callbacks import BaseCallback
 from stable_baselines3.common.policies import ActorCriticPolicy, BasePolicy
 from stable_baselines3.common.type_aliases import GymEnv, MaybeCallback, Schedule
-from stable_baselines3.common.utils import obs_as_tensor, safe_mean
+from stable_baselines3.common.utils import obs_as_tensor
 from stable_baselines3.common.vec_env import VecEnv
 
 
@@ -47,6 +47,9 @@ class OnPolicyAlgorithm(BaseAlgorithm):
         Setting it to auto, the code will be run on the GPU if possible.
     :param _init_setup_model: Whether or not to build the network at the creation of the instance
     :param supported_action_spaces: The action spaces supported by the algorithm.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
     """
 
     def __init__(
@@ -72,6 +75,8 @@ class OnPolicyAlgorithm(BaseAlgorithm):
         device: Union[th.device, str] = "auto",
         _init_setup_model: bool = True,
         supported_action_spaces: Optional[Tuple[gym.spaces.Space, ...]] = None,
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
     ):
 
         super(OnPolicyAlgorithm, self).__init__(
@@ -89,6 +94,8 @@ class OnPolicyAlgorithm(BaseAlgorithm):
             seed=seed,
             tensorboard_log=tensorboard_log,
             supported_action_spaces=supported_action_spaces,
+            compile=compile,
+            compile_kwargs=compile_kwargs,
         )
 
         self.n_steps = n_steps
@@ -126,6 +133,10 @@ class OnPolicyAlgorithm(BaseAlgorithm):
         )
         self.policy = self.policy.to(self.device)
 
+    def _get_compiled_functions(self) -> List[Tuple[Any, str]]:
+        # Rollout collection and training
+        return [(self.policy, "forward"), (self.policy, "evaluate_actions")]
+
     def collect_rollouts(
         self,
         env: VecEnv,
@@ -181,7 +192,7 @@ class OnPolicyAlgorithm(BaseAlgorithm):
             if callback.on_step() is False:
                 return False
 
-            self._update_info_buffer(infos)
+            self._update_info_buffer(infos, dones)
             n_steps += 1
 
             if isinstance(self.action_space, gym.spaces.Discrete):
@@ -243,9 +254,10 @@ class OnPolicyAlgorithm(BaseAlgorithm):
             if log_interval is not None and iteration % log_interval == 0:
                 fps = int(self.num_timesteps / (time.time() - self.start_time))
                 self.logger.record("time/iterations", iteration, exclude="tensorboard")
-                if len(self.ep_info_buffer) > 0 and len(self.ep_info_buffer[0]) > 0:
-                    self.logger.record("rollout/ep_rew_mean", safe_mean([ep_info["r"] for ep_info in self.ep_info_buffer]))
-                    self.logger.record("rollout/ep_len_mean", safe_mean([ep_info["l"] for ep_info in self.ep_info_buffer]))
+                episode_stats = self._get_episode_stats()
+                if episode_stats is not None:
+                    self.logger.record("rollout/ep_rew_mean", episode_stats[0])
+                    self.logger.record("rollout/ep_len_mean", episode_stats[1])
                 self.logger.record("time/fps", fps)
                 self.logger.record("time/time_elapsed", int(time.time() - self.start_time), exclude="tensorboard")
                 self.logger.record("time/total_timesteps", self.num_timesteps, exclude="tensorboard")
@@ -29,9 +29,11 @@ from stable_baselines3.common.preprocessing import (
 from stable_baselines3.common.torch_layers import (
     BaseFeaturesExtractor,
     CombinedExtractor,
+    EnsembleLinear,
     FlattenExtractor,
     MlpExtractor,
     NatureCNN,
+    create_ensemble_mlp,
     create_mlp,
 )
 from stable_baselines3.common.type_aliases import Schedule
@@ -938,6 +940,114 @@ class ContinuousCritic(BaseModel):
         return self.q_networks[0](th.cat([features, actions], dim=1))
 
 
+class VectorizedContinuousCritic(BaseModel):
+    """
+    Ensemble of critic networks for DDPG/SAC/TD3, evaluated in parallel.
+    It behaves like ``ContinuousCritic`` but the weights of the critics are stacked
+    along an ensemble axis, so each layer of all the critics is computed with a single
+    batched matrix multiplication instead of one small matrix multiplication per critic.
+    This is mostly useful with large ensembles (e.g. REDQ uses 10 critics).
+
+    Checkpoints of ``ContinuousCritic`` (with the same architecture and number of critics)
+    are converted when loaded with ``load_state_dict()``.
+
+    :param observation_space: Obervation space
+    :param action_space: Action space
+    :param net_arch: Network architecture
+    :param features_extractor: Network to extract features
+        (a CNN when using images, a nn.Flatten() layer otherwise)
+    :param features_dim: Number of features
+    :param activation_fn: Activation function
+    :param normalize_images: Whether to normalize images or not,
+         dividing by 255.0 (True by default)
+    :param n_critics: Number of critic networks to create.
+    :param share_features_extractor: Whether the features extractor is shared or not
+        between the actor and the critic (this saves computation time)
+    """
+
+    def __init__(
+        self,
+        observation_space: gym.spaces.Space,
+        action_space: gym.spaces.Space,
+        net_arch: List[int],
+        features_extractor: nn.Module,
+        features_dim: int,
+        activation_fn: Type[nn.Module] = nn.ReLU,
+        normalize_images: bool = True,
+        n_critics: int = 2,
+        share_features_extractor: bool = True,
+    ):
+        super().__init__(
+            observation_space,
+            action_space,
+            features_extractor=features_extractor,
+            normalize_images=normalize_images,
+        )
+
+        action_dim = get_action_dim(self.action_space)
+
+        self.share_features_extractor = share_features_extractor
+        self.n_critics = n_critics
+        q_ensemble = create_ensemble_mlp(
+            n_critics, features_dim + action_dim, 1, net_arch, activation_fn
+        )
+        self.q_ensemble = nn.Sequential(*q_ensemble)
+
+    def forward(self, obs: th.Tensor, actions: th.Tensor) -> Tuple[th.Tensor, ...]:
+        # Learn the features extractor using the policy loss only
+        # when the features_extractor is shared with the actor
+        with th.set_grad_enabled(not self.share_features_extractor):
+            features = self.extract_features(obs)
+        qvalue_input = th.cat([features, actions], dim=1)
+        # (n_critics, batch_size, 1) -> one view per critic
+        return self.q_ensemble(qvalue_input).unbind(0)
+
+    def q1_forward(self, obs: th.Tensor, actions: th.Tensor) -> th.Tensor:
+        """
+        Only predict the Q-value using the first network.
+        This allows to reduce computation when all the estimates are not needed
+        (e.g. when updating the policy in TD3).
+        """
+        with th.no_grad():
+            features = self.extract_features(obs)
+        output = th.cat([features, actions], dim=1)
+        for module in self.q_ensemble:
+            if isinstance(module, EnsembleLinear):
+                output = th.addmm(module.bias[0], output, module.weight[0])
+            else:
+                output = module(output)
+        return output
+
+    def _load_from_state_dict(
+        self, state_dict: Dict[str, th.Tensor], prefix: str, *args, **kwargs
+    ) -> None:
+        # Convert the layout of ContinuousCritic: one ``qf{idx}`` network per critic
+        # with nn.Linear weights of shape (out_features, in_features)
+        if f"{prefix}qf0.0.weight" in state_dict:
+            saved_critics = {
+                key[len(prefix) :].split(".")[0]
+                for key in state_dict
+                if key.startswith(f"{prefix}qf")
+            }
+            n_saved_critics = len(saved_critics)
+            assert n_saved_critics == self.n_critics, (
+                f"Cannot load {n_saved_critics} critics "
+                f"in an ensemble of {self.n_critics} critics"
+            )
+            for layer_idx, module in enumerate(self.q_ensemble):
+                if not isinstance(module, EnsembleLinear):
+                    continue
+                weights, biases = [], []
+                for idx in range(self.n_critics):
+                    layer_prefix = f"{prefix}qf{idx}.{layer_idx}"
+                    weights.append(state_dict.pop(f"{layer_prefix}.weight").t())
+                    biases.append(state_dict.pop(f"{layer_prefix}.bias"))
+                ensemble_prefix = f"{prefix}q_ensemble.{layer_idx}"
+                state_dict[f"{ensemble_prefix}.weight"] = th.stack(weights)
+                state_dict[f"{ensemble_prefix}.bias"] = th.stack(biases).unsqueeze(1)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+
 def create_sde_features_extractor(
     features_dim: int, sde_net_arch: List[int], activation_fn: Type[nn.Module]
 ) -> Tuple[nn.Sequential, int]:
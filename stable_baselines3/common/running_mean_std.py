@@ -1,39 +1,46 @@
-from typing import Tuple
+from typing import Tuple, Type, Union
 
 import numpy as np
 
 
 class RunningMeanStd(object):
-    def __init__(self, epsilon: float = 1e-4, shape: Tuple[int, ...] = ()):
+    def __init__(self, epsilon: float = 1e-4, shape: Tuple[int, ...] = (), dtype: Union[Type, np.dtype] = np.float64):
         """
         Calulates the running mean and std of a data stream
         https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Parallel_algorithm
 
         :param epsilon: helps with arithmetic issues
         :param shape: the shape of the data stream's output
+        :param dtype: the type of the statistics, float32 halves the cost of the updates and of the normalization
         """
-        self.mean = np.zeros(shape, np.float64)
-        self.var = np.ones(shape, np.float64)
+        self.mean = np.zeros(shape, dtype)
+        self.var = np.ones(shape, dtype)
         self.count = epsilon
 
     def update(self, arr: np.ndarray) -> None:
-        batch_mean = np.mean(arr, axis=0)
-        batch_var = np.var(arr, axis=0)
-        batch_count = arr.shape[0]
-        self.update_from_moments(batch_mean, batch_var, batch_count)
+        """
+        :param arr: Batch of samples, all the leading dimensions
+            (e.g. ``(n_steps, n_envs)``) are merged in a single batch
+        """
+        arr = np.asarray(arr)
+        arr = arr.reshape((-1,) + self.mean.shape)
+        batch_mean = arr.mean(axis=0, dtype=self.mean.dtype)
+        batch_var = arr.var(axis=0, dtype=self.mean.dtype)
+        self.update_from_moments(batch_mean, batch_var, arr.shape[0])
 
     def update_from_moments(self, batch_mean: np.ndarray, batch_var: np.ndarray, batch_count: int) -> None:
         delta = batch_mean - self.mean
         tot_count = self.count + batch_count
 
-        new_mean = self.mean + delta * batch_count / tot_count
-        m_a = self.var * self.count
-        m_b = batch_var * batch_count
-        m_2 = m_a + m_b + np.square(delta) * self.count * batch_count / (self.count + batch_count)
-        new_var = m_2 / (self.count + batch_count)
-
-        new_count = batch_count + self.count
-
-        self.mean = new_mean
-        self.var = new_var
-        self.count = new_count
+        new_mean = self.mean + delta * (batch_count / tot_count)
+        # Sum of the squared deviations of both sets, merged in place
+        m_2 = np.square(delta)
+        m_2 *= self.count * batch_count / tot_count
+        m_2 += self.var * self.count
+        m_2 += batch_var * batch_count
+        m_2 /= tot_count
+
+        # New arrays are assigned, so that statistics can be compared or cached by reference
+        self.mean = new_mean.astype(self.mean.dtype, copy=False)
+        self.var = m_2.astype(self.var.dtype, copy=False)
+        self.count = tot_count
@@ -3,17 +3,23 @@ Save util taken from stable_baselines
 used to serialize data (class parameters) of model classes
 """
 import base64
+import copy
 import functools
 import io
 import json
+import lzma
 import os
 import pathlib
 import pickle
 import warnings
 import zipfile
-from typing import Any, Dict, Optional, Tuple, Union
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import cloudpickle
+import numpy as np
 import torch as th
 
 import stable_baselines3
@@ -296,7 +302,8 @@ def save_to_zip_file(
 
     :param save_path: Where to store the model.
         if save_path is a str or pathlib.Path ensures that the path actually exists.
-    :param data: Class parameters being stored (non-PyTorch variables)
+    :param data: Class parameters being stored (non-PyTorch variables),
+        or their serialization by ``data_to_json()``
     :param params: Model parameters being stored expected to contain an entry for every
                    state_dict with its name and the state_dict.
     :param pytorch_variables: Other PyTorch variables expected to contain name and value of the variable.
@@ -306,7 +313,7 @@ def save_to_zip_file(
     # data/params can be None, so do not
     # try to serialize them blindly
     if data is not None:
-        serialized_data = data_to_json(data)
+        serialized_data = data if isinstance(data, str) else data_to_json(data)
 
     # Create a zip-archive and write our objects there.
     with zipfile.ZipFile(save_path, mode="w") as archive:
@@ -362,6 +369,7 @@ def load_from_zip_file(
     custom_objects: Optional[Dict[str, Any]] = None,
     device: Union[th.device, str] = "auto",
     verbose: int = 0,
+    params_to_load: Optional[Iterable[str]] = None,
 ) -> (Tuple[Optional[Dict[str, Any]], Optional[TensorDict], Optional[TensorDict]]):
     """
     Load model data from a .zip archive
@@ -376,6 +384,8 @@ def load_from_zip_file(
         ``keras.models.load_model``. Useful when you have an object in
         file that can not be deserialized.
     :param device: Device on which the code should run.
+    :param params_to_load: Names of the state_dicts to load (e.g. ``["policy"]`` for inference),
+        the other state_dicts and the pytorch variables are skipped. Load everything by default.
     :return: Class parameters, model state_dicts (aka "params", dict of state_dict)
         and dict of pytorch variables
     """
@@ -405,6 +415,9 @@ def load_from_zip_file(
             # "pytorch_variables.pth" stores PyTorch variables, and any other .pth
             # files store state_dicts of variables with custom names (e.g. policy, policy.optimizer)
             pth_files = [file_name for file_name in namelist if os.path.splitext(file_name)[1] == ".pth"]
+            if params_to_load is not None:
+                params_to_load = set(params_to_load)
+                pth_files = [file_name for file_name in pth_files if os.path.splitext(file_name)[0] in params_to_load]
             for file_path in pth_files:
                 with archive.open(file_path, mode="r") as param_file:
                     # File has to be seekable, but param_file is not, so load in BytesIO first
@@ -428,3 +441,502 @@ def load_from_zip_file(
         # load_path wasn't a zip file
         raise ValueError(f"Error: the file {load_path} wasn't a zip-file")
     return data, params, pytorch_variables
+
+
+# Stream checkpoints start with this header, followed by the size of their JSON index (8 bytes, little-endian)
+STREAM_MAGIC = b"\x93SB3CKPT"
+STREAM_SUFFIX = "sb3"
+# The tensors are aligned on cache lines, so they can be memory-mapped and viewed with any dtype
+STREAM_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // STREAM_ALIGNMENT) * STREAM_ALIGNMENT
+
+
+def _tensors_to_json(obj: Any, tensors: List[th.Tensor]) -> Any:
+    """
+    Turn a nested structure of tensors (state_dict, optimizer state, ...) into a JSON serializable one.
+    The tensors are appended to ``tensors`` and replaced by their index. Dicts with non-string keys
+    and tuples are tagged to be restored as is, the other objects are pickled with cloudpickle.
+
+    :param obj: The structure to serialize
+    :param tensors: The tensors found so far
+    :return: JSON serializable structure
+    """
+    if isinstance(obj, th.Tensor):
+        tensors.append(obj)
+        return {":tensor:": len(tensors) - 1}
+    if isinstance(obj, dict):
+        if all(isinstance(key, str) and not key.startswith(":") for key in obj):
+            encoded = {key: _tensors_to_json(value, tensors) for key, value in obj.items()}
+        else:
+            items = [[_tensors_to_json(key, tensors), _tensors_to_json(value, tensors)] for key, value in obj.items()]
+            encoded = {":items:": items}
+        # Versions of the modules, used by ``load_state_dict()``
+        metadata = getattr(obj, "_metadata", None)
+        if metadata is not None:
+            encoded = {":state_dict:": encoded, ":metadata:": _tensors_to_json(dict(metadata), tensors)}
+        return encoded
+    if isinstance(obj, list):
+        return [_tensors_to_json(item, tensors) for item in obj]
+    if isinstance(obj, tuple):
+        return {":tuple:": [_tensors_to_json(item, tensors) for item in obj]}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    return {":serialized:": base64.b64encode(cloudpickle.dumps(obj)).decode()}
+
+
+def _tensor_references(obj: Any) -> Iterator[int]:
+    """
+    :param obj: Structure returned by ``_tensors_to_json()``
+    :return: Indices of the tensors it contains
+    """
+    if isinstance(obj, dict):
+        if ":tensor:" in obj:
+            yield obj[":tensor:"]
+            return
+        for value in obj.values():
+            yield from _tensor_references(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _tensor_references(item)
+
+
+def _tensors_from_json(obj: Any, tensors: Dict[int, th.Tensor]) -> Any:
+    """
+    Inverse of ``_tensors_to_json()``.
+
+    :param obj: Structure returned by ``_tensors_to_json()``
+    :param tensors: Loaded tensors, by index
+    :return: The original structure
+    """
+    if isinstance(obj, list):
+        return [_tensors_from_json(item, tensors) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if ":tensor:" in obj:
+        return tensors[obj[":tensor:"]]
+    if ":state_dict:" in obj:
+        state_dict = OrderedDict(_tensors_from_json(obj[":state_dict:"], tensors))
+        state_dict._metadata = _tensors_from_json(obj[":metadata:"], tensors)
+        return state_dict
+    if ":items:" in obj:
+        return {_tensors_from_json(key, tensors): _tensors_from_json(value, tensors) for key, value in obj[":items:"]}
+    if ":tuple:" in obj:
+        return tuple(_tensors_from_json(item, tensors) for item in obj[":tuple:"])
+    if ":serialized:" in obj:
+        return cloudpickle.loads(base64.b64decode(obj[":serialized:"].encode()))
+    return {key: _tensors_from_json(value, tensors) for key, value in obj.items()}
+
+
+def _tensor_to_bytes(tensor: th.Tensor) -> np.ndarray:
+    # Bytes view of the tensor, numpy does not support all the dtypes of PyTorch (e.g. bfloat16)
+    return tensor.detach().cpu().contiguous().reshape(-1).view(th.uint8).numpy()
+
+
+def _bytes_to_tensor(raw: th.Tensor, entry: Dict[str, Any]) -> th.Tensor:
+    return raw.view(getattr(th, entry["dtype"])).reshape(entry["shape"])
+
+
+def save_to_stream_file(
+    save_path: Union[str, pathlib.Path, io.BufferedIOBase],
+    data: Dict[str, Any] = None,
+    params: Dict[str, Any] = None,
+    pytorch_variables: Dict[str, Any] = None,
+    verbose: int = 0,
+) -> None:
+    """
+    Save model data to a stream checkpoint: a JSON index followed by the raw bytes of the tensors,
+    uncompressed and aligned, so they can be memory-mapped, read in parallel or only partially
+    (see ``load_from_stream_file``). The tensors are written one after the other,
+    without serializing the whole checkpoint in memory first.
+
+    :param save_path: Where to store the model.
+        if save_path is a str or pathlib.Path ensures that the path actually exists.
+    :param data: Class parameters being stored (non-PyTorch variables),
+        or their serialization by ``data_to_json()``
+    :param params: Model parameters being stored expected to contain an entry for every
+                   state_dict with its name and the state_dict.
+    :param pytorch_variables: Other PyTorch variables expected to contain name and value of the variable.
+    :param verbose: Verbosity level, 0 means only warnings, 2 means debug information
+    """
+    if data is not None and not isinstance(data, str):
+        data = data_to_json(data)
+    tensors = []
+    index = {
+        "version": stable_baselines3.__version__,
+        "data": data,
+        "pytorch_variables": None if pytorch_variables is None else _tensors_to_json(pytorch_variables, tensors),
+        "params": {} if params is None else {name: _tensors_to_json(dict_, tensors) for name, dict_ in params.items()},
+    }
+    # Offsets are relative to the start of the tensors, after the index
+    entries = []
+    offset = 0
+    for tensor in tensors:
+        nbytes = tensor.numel() * tensor.element_size()
+        entries.append(dict(dtype=str(tensor.dtype)[len("torch.") :], shape=list(tensor.shape), offset=offset, nbytes=nbytes))
+        offset = _align(offset + nbytes)
+    index["tensors"] = entries
+    index_bytes = json.dumps(index).encode()
+
+    opened = not isinstance(save_path, io.BufferedIOBase)
+    save_path = open_path(save_path, "w", verbose=0, suffix=STREAM_SUFFIX)
+    try:
+        save_path.write(STREAM_MAGIC)
+        save_path.write(len(index_bytes).to_bytes(8, "little"))
+        save_path.write(index_bytes)
+        position = len(STREAM_MAGIC) + 8 + len(index_bytes)
+        tensors_start = _align(position)
+        for tensor, entry in zip(tensors, entries):
+            start = tensors_start + entry["offset"]
+            save_path.write(bytes(start - position))
+            save_path.write(_tensor_to_bytes(tensor))
+            position = start + entry["nbytes"]
+    finally:
+        if opened:
+            save_path.close()
+
+
+def is_stream_file(path: Union[str, pathlib.Path, io.BufferedIOBase]) -> bool:
+    """
+    :param path: Path to the file (or a file-like), paths that do not exist are checked with the stream suffix
+    :return: Whether the file is a stream checkpoint (see ``save_to_stream_file``)
+    """
+    if isinstance(path, io.BufferedIOBase):
+        position = path.tell()
+        magic = path.read(len(STREAM_MAGIC))
+        path.seek(position)
+        return magic == STREAM_MAGIC
+    if not os.path.isfile(path):
+        path = f"{path}.{STREAM_SUFFIX}"
+        if not os.path.isfile(path):
+            return False
+    with open(path, "rb") as file_handler:
+        return file_handler.read(len(STREAM_MAGIC)) == STREAM_MAGIC
+
+
+def _read_tensors(
+    file_handler: io.BufferedIOBase,
+    tensors_start: int,
+    entries: List[Dict[str, Any]],
+    mmap: bool,
+    n_threads: int,
+) -> List[th.Tensor]:
+    """
+    Read tensors of a stream checkpoint.
+
+    :param file_handler: The opened checkpoint
+    :param tensors_start: Position of the first tensor in the file
+    :param entries: Index entries of the tensors to read
+    :param mmap: Whether to memory-map the file instead of reading it
+    :param n_threads: Number of threads reading the tensors
+    :return: The tensors, on cpu
+    """
+    if mmap or n_threads > 1:
+        assert isinstance(getattr(file_handler, "name", None), str), "Only files on disk can be mapped or read in parallel"
+
+    if mmap:
+        if all(entry["nbytes"] == 0 for entry in entries):
+            return [th.empty(entry["shape"], dtype=getattr(th, entry["dtype"])) for entry in entries]
+        # Copy-on-write mapping: the tensors are writable but the file is never modified
+        mapping = th.from_numpy(np.memmap(file_handler.name, dtype=np.uint8, mode="c", offset=tensors_start))
+        return [_bytes_to_tensor(mapping[entry["offset"] : entry["offset"] + entry["nbytes"]], entry) for entry in entries]
+
+    def read_tensor(entry: Dict[str, Any], file_handler: io.BufferedIOBase) -> th.Tensor:
+        raw = th.empty(entry["nbytes"], dtype=th.uint8)
+        file_handler.seek(tensors_start + entry["offset"])
+        n_read = file_handler.readinto(raw.numpy())
+        if n_read != entry["nbytes"]:
+            raise ValueError(f"Error: the file {file_handler} is truncated")
+        return _bytes_to_tensor(raw, entry)
+
+    if n_threads == 1:
+        return [read_tensor(entry, file_handler) for entry in entries]
+
+    def read_tensor_from_path(entry: Dict[str, Any]) -> th.Tensor:
+        # Each read has its own file handler, reading releases the GIL
+        with open(file_handler.name, "rb") as thread_file_handler:
+            return read_tensor(entry, thread_file_handler)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        return list(executor.map(read_tensor_from_path, entries))
+
+
+def load_from_stream_file(
+    load_path: Union[str, pathlib.Path, io.BufferedIOBase],
+    load_data: bool = True,
+    custom_objects: Optional[Dict[str, Any]] = None,
+    device: Union[th.device, str] = "auto",
+    verbose: int = 0,
+    params_to_load: Optional[Iterable[str]] = None,
+    mmap: bool = False,
+    n_threads: int = 1,
+) -> (Tuple[Optional[Dict[str, Any]], Optional[TensorDict], Optional[TensorDict]]):
+    """
+    Load model data from a stream checkpoint (see ``save_to_stream_file``).
+    Only the index and the tensors of the selected state_dicts are read.
+
+    :param load_path: Where to load the model from
+    :param load_data: Whether we should load and return data (class parameters)
+    :param custom_objects: Dictionary of objects to replace upon loading (see ``load_from_zip_file``)
+    :param device: Device on which the code should run.
+    :param verbose: Verbosity level, 0 means only warnings, 2 means debug information
+    :param params_to_load: Names of the state_dicts to load (e.g. ``["policy"]`` for inference),
+        the other state_dicts and the pytorch variables are skipped. Load everything by default.
+    :param mmap: Whether to memory-map the file: on cpu, the tensors are only read when they are accessed
+        (e.g. copied by ``load_state_dict()``). Tensors that are used as is (e.g. some optimizer states)
+        keep a copy-on-write mapping of the file.
+    :param n_threads: Number of threads reading the tensors, when they are not memory-mapped
+    :return: Class parameters, model state_dicts (aka "params", dict of state_dict)
+        and dict of pytorch variables
+    """
+    opened = not isinstance(load_path, io.BufferedIOBase)
+    load_path = open_path(load_path, "r", verbose=verbose, suffix=STREAM_SUFFIX)
+    device = get_device(device=device)
+    try:
+        if load_path.read(len(STREAM_MAGIC)) != STREAM_MAGIC:
+            raise ValueError(f"Error: the file {load_path} is not a stream checkpoint")
+        index_size = int.from_bytes(load_path.read(8), "little")
+        index = json.loads(load_path.read(index_size).decode())
+        tensors_start = _align(len(STREAM_MAGIC) + 8 + index_size)
+
+        if params_to_load is None:
+            params_index = index["params"]
+            pytorch_variables_index = index["pytorch_variables"]
+        else:
+            params_to_load = set(params_to_load)
+            params_index = {name: value for name, value in index["params"].items() if name in params_to_load}
+            pytorch_variables_index = None
+
+        tensor_indices = sorted(set(_tensor_references([params_index, pytorch_variables_index])))
+        entries = [index["tensors"][tensor_idx] for tensor_idx in tensor_indices]
+        tensors = _read_tensors(load_path, tensors_start, entries, mmap, n_threads)
+        tensors = {tensor_idx: tensor.to(device) for tensor_idx, tensor in zip(tensor_indices, tensors)}
+    finally:
+        if opened:
+            load_path.close()
+
+    data = None
+    if load_data and index["data"] is not None:
+        data = json_to_data(index["data"], custom_objects=custom_objects)
+    params = {name: _tensors_from_json(value, tensors) for name, value in params_index.items()}
+    pytorch_variables = None
+    if pytorch_variables_index is not None:
+        # Copy the variables, they are used as is by the model
+        variables = {tensor_idx: tensors[tensor_idx].clone() for tensor_idx in _tensor_references(pytorch_variables_index)}
+        pytorch_variables = _tensors_from_json(pytorch_variables_index, variables)
+    return data, params, pytorch_variables
+
+
+def load_from_file(
+    load_path: Union[str, pathlib.Path, io.BufferedIOBase],
+    load_data: bool = True,
+    custom_objects: Optional[Dict[str, Any]] = None,
+    device: Union[th.device, str] = "auto",
+    verbose: int = 0,
+    params_to_load: Optional[Iterable[str]] = None,
+    mmap: bool = False,
+    n_threads: int = 1,
+) -> (Tuple[Optional[Dict[str, Any]], Optional[TensorDict], Optional[TensorDict]]):
+    """
+    Load model data from a zip archive or a stream checkpoint, the format is detected from the file.
+    See ``load_from_zip_file`` and ``load_from_stream_file`` for the parameters,
+    ``mmap`` and ``n_threads`` are only used by stream checkpoints.
+    """
+    if is_stream_file(load_path):
+        return load_from_stream_file(load_path, load_data, custom_objects, device, verbose, params_to_load, mmap, n_threads)
+    return load_from_zip_file(load_path, load_data, custom_objects, device, verbose, params_to_load)
+
+
+# Replay buffers saved by chunks: a folder with the buffer without its storage arrays (and their index),
+# and a file per chunk of rows of each storage array
+BUFFER_STATE_FILE = "buffer.pkl"
+# Compression of the chunks (compress and decompress functions), the fastest levels are used
+BUFFER_COMPRESSIONS = {
+    "zlib": (functools.partial(zlib.compress, level=1), zlib.decompress),
+    "lzma": (functools.partial(lzma.compress, preset=0), lzma.decompress),
+}
+
+
+def _chunk_file_name(field: str, chunk_idx: int, compression: Optional[str] = None) -> str:
+    return f"{field.replace('/', '.')}.{chunk_idx}.{compression or 'bin'}"
+
+
+def _write_file(path: str, content: Any) -> None:
+    # Write to a temporary file first, so that an interrupted save does not leave a truncated file
+    with open(path + ".tmp", "wb") as file_handler:
+        file_handler.write(content)
+    os.replace(path + ".tmp", path)
+
+
+def replay_buffer_to_chunks(
+    buffer: Any,
+    chunk_size: int = 10000,
+    chunk_indices: Optional[Iterable[int]] = None,
+    copy_chunks: bool = False,
+) -> Tuple[Dict[str, Any], Dict[Tuple[str, int], np.ndarray]]:
+    """
+    Split a replay buffer into its index (the buffer without its storage arrays, pickled,
+    and the description of these arrays) and chunks of ``chunk_size`` rows of the storage arrays.
+    Only the filled rows are kept.
+
+    :param buffer: The replay buffer
+    :param chunk_size: Number of rows (transitions, or episodes for the buffers storing whole episodes) per chunk
+    :param chunk_indices: Indices of the chunks to keep (e.g. the ones modified since the last save),
+        defaults to all the chunks of filled rows
+    :param copy_chunks: Whether to copy the chunks, so that the buffer can be modified while they are written
+    :return: The index and the chunks, by storage array and chunk index
+    """
+    arrays = buffer._storage_arrays()
+    n_rows = buffer._storage_size()
+    # The row being written is kept too, it holds the current episode of the episodic buffers
+    n_filled_rows = n_rows if buffer.full else min(buffer._storage_pos() + 1, n_rows)
+    n_chunks = -(-n_filled_rows // chunk_size)
+    chunk_indices = range(n_chunks) if chunk_indices is None else sorted(set(chunk_indices) & set(range(n_chunks)))
+
+    # Shallow copy of the buffer without its storage arrays
+    stripped_buffer = copy.copy(buffer)
+    for field in arrays:
+        name, _, key = field.partition("/")
+        if key:
+            if getattr(stripped_buffer, name) is getattr(buffer, name):
+                setattr(stripped_buffer, name, dict(getattr(buffer, name)))
+            getattr(stripped_buffer, name)[key] = None
+        else:
+            setattr(stripped_buffer, name, None)
+
+    index = dict(
+        state=pickle.dumps(stripped_buffer, protocol=pickle.HIGHEST_PROTOCOL),
+        chunk_size=chunk_size,
+        n_filled_rows=n_filled_rows,
+        arrays={
+            # The rows that are not saved keep their initial value, read from the last row
+            field: dict(
+                dtype=array.dtype,
+                shape=array.shape,
+                fill_value=array[-1].flat[0] if n_filled_rows < n_rows and array[-1].size > 0 else 0,
+            )
+            for field, array in arrays.items()
+        },
+    )
+    chunks = {}
+    for field, array in arrays.items():
+        for chunk_idx in chunk_indices:
+            chunk = array[chunk_idx * chunk_size : min((chunk_idx + 1) * chunk_size, n_filled_rows)]
+            chunks[(field, chunk_idx)] = chunk.copy() if copy_chunks else chunk
+    return index, chunks
+
+
+def write_replay_buffer_chunks(
+    path: Union[str, pathlib.Path],
+    index: Dict[str, Any],
+    chunks: Dict[Tuple[str, int], np.ndarray],
+    compression: Optional[str] = None,
+    n_threads: int = 1,
+) -> None:
+    """
+    Write a replay buffer split by ``replay_buffer_to_chunks()`` in a folder.
+    The chunks already in the folder that are not given are kept, so a buffer can be saved incrementally
+    (with the same compression).
+
+    :param path: Path to the folder, it is created if necessary
+    :param index: Index of the buffer
+    :param chunks: Chunks of the storage arrays
+    :param compression: Compression of the chunks, None, "zlib" or "lzma"
+    :param n_threads: Number of threads compressing and writing the chunks
+    """
+    assert compression is None or compression in BUFFER_COMPRESSIONS, f"Unknown compression {compression}"
+    os.makedirs(path, exist_ok=True)
+
+    def write_chunk(field_chunk: Tuple[Tuple[str, int], np.ndarray]) -> None:
+        (field, chunk_idx), chunk = field_chunk
+        content = np.ascontiguousarray(chunk)
+        if compression is not None:
+            content = BUFFER_COMPRESSIONS[compression][0](content)
+        _write_file(os.path.join(path, _chunk_file_name(field, chunk_idx, compression)), content)
+
+    if n_threads == 1:
+        for field_chunk in chunks.items():
+            write_chunk(field_chunk)
+    else:
+        # The compression and the writing release the GIL
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(write_chunk, chunks.items()))
+    # The index is written last, it describes the chunks written before
+    index = dict(index, compression=compression)
+    _write_file(os.path.join(path, BUFFER_STATE_FILE), pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def save_replay_buffer_chunks(
+    path: Union[str, pathlib.Path],
+    buffer: Any,
+    chunk_size: int = 10000,
+    compression: Optional[str] = None,
+    n_threads: int = 1,
+) -> None:
+    """
+    Save a replay buffer in a folder, its storage arrays being written by chunks of rows.
+    Only the filled rows are saved, and the storage arrays are not copied.
+
+    :param path: Path to the folder, it is created if necessary
+    :param buffer: The replay buffer
+    :param chunk_size: Number of rows per chunk (see ``replay_buffer_to_chunks()``)
+    :param compression: Compression of the chunks, None, "zlib" or "lzma"
+    :param n_threads: Number of threads compressing and writing the chunks
+    """
+    write_replay_buffer_chunks(path, *replay_buffer_to_chunks(buffer, chunk_size), compression, n_threads)
+
+
+def is_replay_buffer_chunks(path: Union[str, pathlib.Path, io.BufferedIOBase]) -> bool:
+    """
+    :param path: Path to a replay buffer
+    :return: Whether the replay buffer was saved by chunks (see ``save_replay_buffer_chunks()``)
+    """
+    return not isinstance(path, io.BufferedIOBase) and os.path.isfile(os.path.join(path, BUFFER_STATE_FILE))
+
+
+def load_replay_buffer_chunks(path: Union[str, pathlib.Path], n_threads: int = 1) -> Any:
+    """
+    Load a replay buffer saved by ``save_replay_buffer_chunks()`` or ``write_replay_buffer_chunks()``.
+    The storage arrays are allocated first and the chunks are read (and decompressed) directly into them.
+
+    :param path: Path to the folder
+    :param n_threads: Number of threads reading and decompressing the chunks
+    :return: The replay buffer
+    """
+    with open(os.path.join(path, BUFFER_STATE_FILE), "rb") as file_handler:
+        index = pickle.load(file_handler)
+    buffer = pickle.loads(index["state"])
+    chunk_size = index["chunk_size"]
+    compression = index.get("compression")
+    n_chunks = -(-index["n_filled_rows"] // chunk_size)
+
+    arrays = {}
+    for field, array_info in index["arrays"].items():
+        arrays[field] = np.full(array_info["shape"], array_info["fill_value"], dtype=array_info["dtype"])
+        name, _, key = field.partition("/")
+        if key:
+            getattr(buffer, name)[key] = arrays[field]
+        else:
+            setattr(buffer, name, arrays[field])
+
+    def read_chunk(field_chunk: Tuple[str, int]) -> None:
+        field, chunk_idx = field_chunk
+        # Chunks saved before the last rows were filled are shorter
+        rows = arrays[field][chunk_idx * chunk_size : (chunk_idx + 1) * chunk_size]
+        with open(os.path.join(path, _chunk_file_name(field, chunk_idx, compression)), "rb") as file_handler:
+            if compression is None:
+                file_handler.readinto(rows)
+            else:
+                content = BUFFER_COMPRESSIONS[compression][1](file_handler.read())
+                rows.reshape(-1).view(np.uint8)[: len(content)] = np.frombuffer(content, dtype=np.uint8)
+
+    field_chunks = [(field, chunk_idx) for field in arrays for chunk_idx in range(n_chunks)]
+    if n_threads == 1:
+        for field_chunk in field_chunks:
+            read_chunk(field_chunk)
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(read_chunk, field_chunks))
+    return buffer
@@ -1,3 +1,4 @@
+import math
 from itertools import zip_longest
 from typing import Dict, List, Tuple, Type, Union
 
@@ -133,6 +134,83 @@ def create_mlp(
     return modules
 
 
+class EnsembleLinear(nn.Module):
+    """
+    Linear layers of an ensemble of networks, whose weights are stacked along a leading ensemble axis.
+    All the members are evaluated with a single batched matrix multiplication (``th.baddbmm``).
+
+    The weight of a member is stored transposed compared to ``nn.Linear``,
+    with a shape ``(in_features, out_features)``, and initialized the same way.
+
+    :param n_members: Number of members of the ensemble
+    :param in_features: Size of the input of each member
+    :param out_features: Size of the output of each member
+    """
+
+    def __init__(self, n_members: int, in_features: int, out_features: int):
+        super(EnsembleLinear, self).__init__()
+        self.n_members = n_members
+        self.in_features = in_features
+        self.out_features = out_features
+        self.weight = nn.Parameter(th.empty(n_members, in_features, out_features))
+        self.bias = nn.Parameter(th.empty(n_members, 1, out_features))
+        self.reset_parameters()
+
+    def reset_parameters(self) -> None:
+        # Same distribution as the default initialization of nn.Linear
+        bound = 1 / math.sqrt(self.in_features) if self.in_features > 0 else 0
+        nn.init.uniform_(self.weight, -bound, bound)
+        nn.init.uniform_(self.bias, -bound, bound)
+
+    def forward(self, x: th.Tensor) -> th.Tensor:
+        """
+        :param x: Input shared by all the members ``(batch_size, in_features)``
+            or input of each member ``(n_members, batch_size, in_features)``
+        :return: Output of each member ``(n_members, batch_size, out_features)``
+        """
+        if x.dim() == 2:
+            x = x.unsqueeze(0).expand(self.n_members, -1, -1)
+        return th.baddbmm(self.bias, x, self.weight)
+
+    def extra_repr(self) -> str:
+        return f"n_members={self.n_members}, in_features={self.in_features}, out_features={self.out_features}"
+
+
+def create_ensemble_mlp(
+    n_members: int,
+    input_dim: int,
+    output_dim: int,
+    net_arch: List[int],
+    activation_fn: Type[nn.Module] = nn.ReLU,
+    squash_output: bool = False,
+) -> List[nn.Module]:
+    """
+    Create an ensemble of multi layer perceptrons (MLP) evaluated in parallel,
+    it mirrors ``create_mlp()`` with ``EnsembleLinear`` layers.
+
+    :param n_members: Number of members of the ensemble
+    :param input_dim: Dimension of the input vector
+    :param output_dim:
+    :param net_arch: Architecture of each neural net
+    :param activation_fn: The activation function
+        to use after each layer.
+    :param squash_output: Whether to squash the output using a Tanh
+        activation function
+    :return:
+    """
+    layer_dims = [input_dim] + list(net_arch)
+    modules = []
+    for in_dim, out_dim in zip(layer_dims[:-1], layer_dims[1:]):
+        modules.append(EnsembleLinear(n_members, in_dim, out_dim))
+        modules.append(activation_fn())
+
+    if output_dim > 0:
+        modules.append(EnsembleLinear(n_members, layer_dims[-1], output_dim))
+    if squash_output:
+        modules.append(nn.Tanh())
+    return modules
+
+
 class MlpExtractor(nn.Module):
     """
     Constructs an MLP that receives observations as an input and outputs a latent representation for the policy and
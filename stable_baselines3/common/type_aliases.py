@@ -54,6 +54,7 @@ class ReplayBufferSamplesZ(NamedTuple):
     rewards: th.Tensor
     zs : th.Tensor
     ep_index: th.Tensor
+    ep_lengths: th.Tensor
 
 class ReplayBufferSamplesZExternalDisc(NamedTuple):
     observations: th.Tensor
@@ -64,6 +65,7 @@ class ReplayBufferSamplesZExternalDisc(NamedTuple):
     zs : th.Tensor
     disc_obs: th.Tensor
     ep_index: th.Tensor
+    ep_lengths: th.Tensor
 
 class ReplayBufferSamplesZExternalDiscTraj(NamedTuple):
     observations: th.Tensor
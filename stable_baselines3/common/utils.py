@@ -1,9 +1,10 @@
 import glob
 import os
 import random
+import warnings
 from collections import deque
 from itertools import zip_longest
-from typing import Dict, Iterable, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Optional, Union
 
 import gym
 import numpy as np
@@ -408,15 +409,28 @@ def polyak_update(
     params (in place).
     See https://github.com/DLR-RM/stable-baselines3/issues/93
 
+    All the parameters are updated at once with the multi-tensor (``_foreach``) operations of PyTorch,
+    instead of launching two operations per parameter, when they are available (PyTorch >= 1.7).
+
     :param params: parameters to use to update the target params
     :param target_params: parameters to update
     :param tau: the soft update coefficient ("Polyak update", between 0 and 1)
     """
     with th.no_grad():
         # zip does not raise an exception if length of parameters does not match.
-        for param, target_param in zip_strict(params, target_params):
-            target_param.data.mul_(1 - tau)
-            th.add(target_param.data, param.data, alpha=tau, out=target_param.data)
+        pairs = [(param.data, target_param.data) for param, target_param in zip_strict(params, target_params)]
+        if len(pairs) == 0:
+            return
+        params_data, target_params_data = zip(*pairs)
+        if hasattr(th, "_foreach_lerp_"):
+            th._foreach_lerp_(list(target_params_data), list(params_data), tau)
+        elif hasattr(th, "_foreach_mul_"):
+            th._foreach_mul_(list(target_params_data), 1 - tau)
+            th._foreach_add_(list(target_params_data), list(params_data), alpha=tau)
+        else:
+            for param_data, target_param_data in pairs:
+                target_param_data.mul_(1 - tau)
+                th.add(target_param_data, param_data, alpha=tau, out=target_param_data)
 
 
 def obs_as_tensor(
@@ -463,3 +477,80 @@ def should_collect_more_steps(
             "The unit of the `train_freq` must be either TrainFrequencyUnit.STEP "
             f"or TrainFrequencyUnit.EPISODE not '{train_freq.unit}'!"
         )
+
+
+class CompiledFunction(object):
+    """
+    Function compiled with ``torch.compile()``, that falls back to the original function (eager mode)
+    when the compilation or the compiled function fails.
+    The compilation is done lazily on the first call, and again after unpickling.
+
+    :param function: The function to compile, usually a method of a ``nn.Module``
+    :param compile_kwargs: Keyword arguments passed to ``torch.compile()`` (e.g. ``mode``, ``backend``)
+    """
+
+    def __init__(self, function: Callable, **compile_kwargs):
+        self.function = function
+        self.compile_kwargs = compile_kwargs
+        self.name = getattr(function, "__qualname__", repr(function))
+        # Fall back to eager mode when torch.compile() is not available (PyTorch < 2.0)
+        self.failed = not hasattr(th, "compile")
+        self._compiled_function = None
+
+    def __call__(self, *args, **kwargs) -> Any:
+        if not self.failed and self._compiled_function is None:
+            try:
+                self._compiled_function = th.compile(self.function, **self.compile_kwargs)
+            except Exception as error:
+                # Invalid backend or options, or platform not supported by torch.compile()
+                self._fall_back(error)
+        if not self.failed:
+            try:
+                return self._compiled_function(*args, **kwargs)
+            except th._dynamo.exc.TorchDynamoException as error:
+                # Only the errors of the compiler, the other ones (raised by the function itself) are not caught
+                self._fall_back(error)
+        return self.function(*args, **kwargs)
+
+    def _fall_back(self, error: Exception) -> None:
+        warnings.warn(f"The compilation of {self.name} failed, falling back to eager mode: {error}")
+        self.failed = True
+        self._compiled_function = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # The compiled function cannot be pickled, it is compiled again when called
+        state["_compiled_function"] = None
+        return state
+
+
+class AutocastFunction(object):
+    """
+    Function run under ``torch.autocast()`` (mixed precision), whose floating point outputs
+    are converted back to float32, so that the losses and the code using them are computed in full precision.
+    The parameters of the networks are not modified: they remain the float32 master weights.
+
+    :param function: The function to wrap, usually a method of a ``nn.Module``
+    :param device_type: Type of the device of the inputs ("cpu" or "cuda")
+    :param dtype: Data type of the operations run in lower precision
+    """
+
+    def __init__(self, function: Callable, device_type: str, dtype: th.dtype = th.bfloat16):
+        self.function = function
+        self.device_type = device_type
+        self.dtype = dtype
+
+    def __call__(self, *args, **kwargs) -> Any:
+        with th.autocast(device_type=self.device_type, dtype=self.dtype):
+            outputs = self.function(*args, **kwargs)
+        return _to_float32(outputs)
+
+
+def _to_float32(outputs: Any) -> Any:
+    if isinstance(outputs, th.Tensor):
+        return outputs.float() if outputs.is_floating_point() else outputs
+    if isinstance(outputs, (tuple, list)):
+        return type(outputs)(_to_float32(output) for output in outputs)
+    if isinstance(outputs, dict):
+        return {key: _to_float32(value) for key, value in outputs.items()}
+    return outputs
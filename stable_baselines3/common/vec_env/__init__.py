@@ -3,6 +3,7 @@ import typing
 from copy import deepcopy
 from typing import Optional, Type, Union
 
+from stable_baselines3.common.vec_env.async_subproc_vec_env import AsyncSubprocVecEnv
 from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv, VecEnvWrapper
 from stable_baselines3.common.vec_env.dummy_vec_env import DummyVecEnv
 from stable_baselines3.common.vec_env.stacked_observations import StackedDictObservations, StackedObservations
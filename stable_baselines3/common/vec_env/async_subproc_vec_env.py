@@ -0,0 +1,150 @@
+import multiprocessing as mp
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import gym
+import numpy as np
+
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices, VecEnvObs, VecEnvStepReturn
+from stable_baselines3.common.vec_env.subproc_vec_env import SubprocVecEnv, _flatten_obs
+from stable_baselines3.common.vec_env.util import dict_to_obs
+
+
+class AsyncSubprocVecEnv(SubprocVecEnv):
+    """
+    Multiprocess vectorized environment that can return the transitions of the environments
+    that are done stepping, without waiting for the slower ones (e.g. during a long reset).
+
+    Actions are sent to a subset of the environments with ``step_async_indices()``,
+    ``step_wait_any()`` then returns the transitions of the first environments ready, along with their indices.
+    The synchronous ``step()`` is still available when no step is pending.
+    Other commands (``get_attr()``, ``env_method()``, ...) must not be sent while steps are pending.
+
+    When several environments are hosted by the same worker (see ``n_envs_per_worker``),
+    they are stepped and returned together.
+
+    :param env_fns: Environments to run in subprocesses
+    :param start_method: method used to start the subprocesses (see ``SubprocVecEnv``)
+    :param shared_memory: Whether the observations, rewards and dones are sent through shared memory
+    :param n_envs_per_worker: Number of environments hosted by each subprocess
+    :param static_attributes: Attributes memoized by ``get_attr()`` (see ``SubprocVecEnv``)
+    :param parent_methods: Pure functions run in the main process by ``env_method()`` (see ``SubprocVecEnv``)
+    :param n_ready: Default minimal number of environments returned by ``step_wait_any()``
+    """
+
+    def __init__(
+        self,
+        env_fns: List[Callable[[], gym.Env]],
+        start_method: Optional[str] = None,
+        shared_memory: bool = False,
+        n_envs_per_worker: int = 1,
+        static_attributes: Iterable[str] = (),
+        parent_methods: Optional[Dict[str, Callable]] = None,
+        n_ready: int = 1,
+    ):
+        super(AsyncSubprocVecEnv, self).__init__(
+            env_fns,
+            start_method=start_method,
+            shared_memory=shared_memory,
+            n_envs_per_worker=n_envs_per_worker,
+            static_attributes=static_attributes,
+            parent_methods=parent_methods,
+        )
+        assert 0 < n_ready <= self.num_envs, "`n_ready` must be between 1 and the number of environments"
+        self.n_ready = n_ready
+        # Index of the workers with a step in progress
+        self.pending_workers = set()
+
+    def step_async_indices(self, actions: np.ndarray, indices: VecEnvIndices = None) -> None:
+        """
+        Send actions to a subset of the environments.
+
+        :param actions: Actions of the environments, in the order of ``indices``
+        :param indices: Indices of the environments to step. They must cover all the environments
+            of the workers they belong to, and these workers must not be stepping already.
+        """
+        indices = [env_idx % self.num_envs for env_idx in self._get_indices(indices)]
+        env_actions = dict(zip(indices, actions))
+        worker_indices = sorted(set(env_idx // self.n_envs_per_worker for env_idx in indices))
+        for worker_idx in worker_indices:
+            assert worker_idx not in self.pending_workers, f"A step is already in progress for the worker {worker_idx}"
+            worker_env_indices = range(self.num_envs)[self.worker_slices[worker_idx]]
+            assert all(
+                env_idx in env_actions for env_idx in worker_env_indices
+            ), f"All the environments of the worker {worker_idx} must be stepped together: {list(worker_env_indices)}"
+            self.remotes[worker_idx].send(("step", [env_actions[env_idx] for env_idx in worker_env_indices]))
+            self.pending_workers.add(worker_idx)
+        self.waiting = True
+
+    def step_wait_any(
+        self, n_ready: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Tuple[np.ndarray, VecEnvObs, np.ndarray, np.ndarray, List[dict]]:
+        """
+        Wait for at least ``n_ready`` environments to be done stepping
+        and return their transitions.
+
+        :param n_ready: Minimal number of environments to wait for, defaults to the value passed to the constructor.
+            It is capped by the number of environments being stepped.
+        :param timeout: Maximal waiting time in seconds, fewer environments are returned once it is reached.
+        :return: Indices of the environments, followed by their observations, rewards, dones and infos
+        """
+        n_ready = self.n_ready if n_ready is None else n_ready
+        remote_to_worker = {self.remotes[worker_idx]: worker_idx for worker_idx in self.pending_workers}
+        ready_workers = []
+        n_ready_envs = 0
+        # The timeout bounds the whole call, not each wait
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while remote_to_worker and n_ready_envs < n_ready:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready_remotes = mp.connection.wait(list(remote_to_worker.keys()), timeout=remaining)
+            if not ready_remotes:
+                # Timeout reached
+                break
+            for remote in ready_remotes:
+                worker_idx = remote_to_worker.pop(remote)
+                ready_workers.append(worker_idx)
+                n_ready_envs += len(range(self.num_envs)[self.worker_slices[worker_idx]])
+
+        ready_workers.sort()
+        results = self._recv_all([self.remotes[worker_idx] for worker_idx in ready_workers])
+        self.pending_workers.difference_update(ready_workers)
+        self.waiting = len(self.pending_workers) > 0
+        env_indices = np.array(
+            [env_idx for worker_idx in ready_workers for env_idx in range(self.num_envs)[self.worker_slices[worker_idx]]],
+            dtype=np.int64,
+        )
+        if len(env_indices) == 0:
+            return env_indices, None, np.zeros(0, dtype=np.float32), np.zeros(0, dtype=bool), []
+
+        if self.shared_buffers is not None:
+            obs = OrderedDict([(key, values[env_indices]) for key, values in self.shared_buffers.obs.items()])
+            return (
+                env_indices,
+                dict_to_obs(self.observation_space, obs),
+                self.shared_buffers.rewards[env_indices],
+                self.shared_buffers.dones[env_indices],
+                results,
+            )
+        obs, rews, dones, infos = zip(*results)
+        return env_indices, _flatten_obs(obs, self.observation_space), np.stack(rews), np.stack(dones), list(infos)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        assert not self.pending_workers, "Some environments are still stepping, call `step_wait_any()` first"
+        self.step_async_indices(actions)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        # After a partial step, the other workers would never answer
+        assert len(self.pending_workers) == len(self.remotes), "Only some environments are stepping, call `step_wait_any()`"
+        self.pending_workers.clear()
+        return super(AsyncSubprocVecEnv, self).step_wait()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        # Only the workers that are stepping will answer
+        for worker_idx in self.pending_workers:
+            self.remotes[worker_idx].recv()
+        self.pending_workers.clear()
+        self.waiting = False
+        super(AsyncSubprocVecEnv, self).close()
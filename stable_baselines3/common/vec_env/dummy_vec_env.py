@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import Any, Callable, List, Optional, Sequence, Type, Union
 
@@ -17,11 +18,19 @@ class DummyVecEnv(VecEnv):
     This can also be used for RL methods that
     require a vectorized environment, but that you want a single environments to train with.
 
+    When the simulator releases the GIL (e.g. physics engines with native code),
+    the environments can be stepped in parallel by a pool of threads (see ``n_threads``).
+
     :param env_fns: a list of functions
         that return environments to vectorize
+    :param n_threads: Number of threads used to step and reset the environments.
+        With 0 (default), the environments are stepped sequentially in the calling thread.
+    :param copy_infos: Whether to deep-copy the infos returned at each step.
+        This can be turned off when the values of the infos are not modified by the environments afterwards,
+        each info dict is then only copied shallowly (the dicts of the environments are never modified).
     """
 
-    def __init__(self, env_fns: List[Callable[[], gym.Env]]):
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], n_threads: int = 0, copy_infos: bool = True):
         self.envs = [fn() for fn in env_fns]
         env = self.envs[0]
         VecEnv.__init__(self, len(env_fns), env.observation_space, env.action_space)
@@ -34,21 +43,43 @@ class DummyVecEnv(VecEnv):
         self.buf_infos = [{} for _ in range(self.num_envs)]
         self.actions = None
         self.metadata = env.metadata
+        self.copy_infos = copy_infos
+        self.thread_pool = ThreadPoolExecutor(max_workers=n_threads) if n_threads > 0 else None
 
     def step_async(self, actions: np.ndarray) -> None:
         self.actions = actions
 
     def step_wait(self) -> VecEnvStepReturn:
-        for env_idx in range(self.num_envs):
-            obs, self.buf_rews[env_idx], self.buf_dones[env_idx], self.buf_infos[env_idx] = self.envs[env_idx].step(
-                self.actions[env_idx]
-            )
-            if self.buf_dones[env_idx]:
-                # save final observation where user can get it, then reset
-                self.buf_infos[env_idx]["terminal_observation"] = obs
-                obs = self.envs[env_idx].reset()
-            self._save_obs(env_idx, obs)
-        return (self._obs_from_buf(), np.copy(self.buf_rews), np.copy(self.buf_dones), deepcopy(self.buf_infos))
+        self._map_envs(self._step_env)
+        infos = deepcopy(self.buf_infos) if self.copy_infos else list(self.buf_infos)
+        return (self._obs_from_buf(), np.copy(self.buf_rews), np.copy(self.buf_dones), infos)
+
+    def _step_env(self, env_idx: int) -> None:
+        obs, self.buf_rews[env_idx], self.buf_dones[env_idx], info = self.envs[env_idx].step(self.actions[env_idx])
+        # Fresh dict at every step, the terminal observation is not written in the dict of the environment
+        self.buf_infos[env_idx] = dict(info)
+        if self.buf_dones[env_idx]:
+            # save final observation where user can get it, then reset
+            self.buf_infos[env_idx]["terminal_observation"] = obs
+            obs = self.envs[env_idx].reset()
+        self._save_obs(env_idx, obs)
+
+    def _reset_env(self, env_idx: int) -> None:
+        self._save_obs(env_idx, self.envs[env_idx].reset())
+
+    def _map_envs(self, function: Callable[[int], None]) -> None:
+        """
+        Call a function on the index of each environment,
+        in the thread pool if there is one.
+
+        :param function: Function taking the index of an environment
+        """
+        if self.thread_pool is None:
+            for env_idx in range(self.num_envs):
+                function(env_idx)
+        else:
+            # Consume the iterator to wait for the threads and raise their exceptions
+            list(self.thread_pool.map(function, range(self.num_envs)))
 
     def seed(self, seed: Optional[int] = None) -> List[Union[None, int]]:
         seeds = list()
@@ -57,12 +88,12 @@ class DummyVecEnv(VecEnv):
         return seeds
 
     def reset(self) -> VecEnvObs:
-        for env_idx in range(self.num_envs):
-            obs = self.envs[env_idx].reset()
-            self._save_obs(env_idx, obs)
+        self._map_envs(self._reset_env)
         return self._obs_from_buf()
 
     def close(self) -> None:
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown()
         for env in self.envs:
             env.close()
 
@@ -7,6 +7,72 @@ from gym import spaces
 from stable_baselines3.common.preprocessing import is_image_space, is_image_space_channels_first
 
 
+class _FrameRing(object):
+    """
+    Ring buffer holding the last ``n_stack`` frames of each environment, stacked along ``stack_dimension``.
+
+    Each frame is written twice, ``n_stack`` slots apart, so the frames ordered from the oldest
+    to the newest are always a contiguous slice of the buffer: only the new frame is written at each step.
+
+    :param stackedobs: Array with the shape of the stacked observations
+    :param n_stack: Number of frames to stack
+    :param stack_dimension: Dimension to stack over (including the vec-env dimension)
+    """
+
+    def __init__(self, stackedobs: np.ndarray, n_stack: int, stack_dimension: int):
+        self.n_stack = n_stack
+        self.axis = stack_dimension % stackedobs.ndim
+        self.frame_size = stackedobs.shape[self.axis] // n_stack
+        shape = list(stackedobs.shape)
+        shape[self.axis] *= 2
+        self.buffer = np.zeros(shape, dtype=stackedobs.dtype)
+        # Slot of the oldest frame of the stack
+        self.pos = 0
+
+    def _slots(self, start: int, stop: int) -> Tuple[slice, ...]:
+        index = [slice(None)] * self.buffer.ndim
+        index[self.axis] = slice(start * self.frame_size, stop * self.frame_size)
+        return tuple(index)
+
+    def view(self) -> np.ndarray:
+        """
+        :return: The stacked frames, ordered from the oldest to the newest (view on the buffer)
+        """
+        return self.buffer[self._slots(self.pos, self.pos + self.n_stack)]
+
+    def terminal_observation(self, env_idx: int, terminal_frame: np.ndarray, axis: int) -> np.ndarray:
+        """
+        :param env_idx: Index of the environment
+        :param terminal_frame: Last frame of the episode
+        :param axis: Axis of the observation of a single environment along which the terminal frame is concatenated
+        :return: The stacked terminal observation, before the new frame is pushed
+        """
+        previous_frames = self.buffer[env_idx][self._slots(self.pos + 1, self.pos + self.n_stack)[1:]]
+        return np.concatenate((previous_frames, terminal_frame), axis=axis)
+
+    def push(self, frames: np.ndarray, dones: Optional[np.ndarray] = None) -> None:
+        """
+        Add a new frame to the stack of each environment.
+
+        :param frames: New frames
+        :param dones: The stacks of the environments done are emptied before adding the new frames
+        """
+        if dones is not None:
+            self.buffer[np.asarray(dones, dtype=bool)] = 0
+        self.pos = (self.pos + 1) % self.n_stack
+        self._write_newest(frames)
+
+    def reset(self, frames: np.ndarray) -> None:
+        self.buffer[...] = 0
+        self.pos = 0
+        self._write_newest(frames)
+
+    def _write_newest(self, frames: np.ndarray) -> None:
+        slot = (self.pos - 1) % self.n_stack
+        self.buffer[self._slots(slot, slot + 1)] = frames
+        self.buffer[self._slots(slot + self.n_stack, slot + self.n_stack + 1)] = frames
+
+
 class StackedObservations(object):
     """
     Frame stacking wrapper for data.
@@ -16,10 +82,14 @@ class StackedObservations(object):
     ``common.preprocessing.is_image_space_channels_first`` if
     observation is an image space.
 
+    The frames are kept in a ring buffer, so only the new frame is written at each step.
+
     :param num_envs: number of environments
     :param n_stack: Number of frames to stack
     :param channels_order: If "first", stack on first image dimension. If "last", stack on last dimension.
         If None, automatically detect channel to stack over in case of image observation or default to "last" (default).
+    :param copy_obs: Whether to return a copy of the stacked observations. Otherwise, a read-only view
+        on the ring buffer is returned, which is only valid until the next call to ``update()`` or ``reset()``.
     """
 
     def __init__(
@@ -28,17 +98,27 @@ class StackedObservations(object):
         n_stack: int,
         observation_space: spaces.Space,
         channels_order: Optional[str] = None,
+        copy_obs: bool = True,
     ):
 
         self.n_stack = n_stack
+        self.copy_obs = copy_obs
         (
             self.channels_first,
             self.stack_dimension,
-            self.stackedobs,
+            stackedobs,
             self.repeat_axis,
         ) = self.compute_stacking(num_envs, n_stack, observation_space, channels_order)
+        self.frames = _FrameRing(stackedobs, n_stack, self.stack_dimension)
         super().__init__()
 
+    @property
+    def stackedobs(self) -> np.ndarray:
+        """
+        :return: The current stacked observations (read-only view)
+        """
+        return _read_only(self.frames.view())
+
     @staticmethod
     def compute_stacking(
         num_envs: int,
@@ -95,12 +175,8 @@ class StackedObservations(object):
         :param observation: Reset observation
         :return: The stacked reset observation
         """
-        self.stackedobs[...] = 0
-        if self.channels_first:
-            self.stackedobs[:, -observation.shape[self.stack_dimension] :, ...] = observation
-        else:
-            self.stackedobs[..., -observation.shape[self.stack_dimension] :] = observation
-        return self.stackedobs
+        self.frames.reset(observation)
+        return self._output(self.frames)
 
     def update(
         self,
@@ -116,31 +192,20 @@ class StackedObservations(object):
         :param infos: numpy array of info dicts
         :return: tuple of the stacked observations and the updated infos
         """
-        stack_ax_size = observations.shape[self.stack_dimension]
-        self.stackedobs = np.roll(self.stackedobs, shift=-stack_ax_size, axis=self.stack_dimension)
-        for i, done in enumerate(dones):
-            if done:
-                if "terminal_observation" in infos[i]:
-                    old_terminal = infos[i]["terminal_observation"]
-                    if self.channels_first:
-                        new_terminal = np.concatenate(
-                            (self.stackedobs[i, :-stack_ax_size, ...], old_terminal),
-                            axis=self.stack_dimension,
-                        )
-                    else:
-                        new_terminal = np.concatenate(
-                            (self.stackedobs[i, ..., :-stack_ax_size], old_terminal),
-                            axis=self.stack_dimension,
-                        )
-                    infos[i]["terminal_observation"] = new_terminal
-                else:
-                    warnings.warn("VecFrameStack wrapping a VecEnv without terminal_observation info")
-                self.stackedobs[i] = 0
-        if self.channels_first:
-            self.stackedobs[:, -observations.shape[self.stack_dimension] :, ...] = observations
-        else:
-            self.stackedobs[..., -observations.shape[self.stack_dimension] :] = observations
-        return self.stackedobs, infos
+        for i in np.flatnonzero(dones):
+            if "terminal_observation" in infos[i]:
+                infos[i]["terminal_observation"] = self.frames.terminal_observation(
+                    i, infos[i]["terminal_observation"], axis=self.stack_dimension
+                )
+            else:
+                warnings.warn("VecFrameStack wrapping a VecEnv without terminal_observation info")
+        self.frames.push(observations, dones)
+        return self._output(self.frames), infos
+
+    def _output(self, frames: _FrameRing) -> np.ndarray:
+        if self.copy_obs:
+            return frames.view().copy()
+        return _read_only(frames.view())
 
 
 class StackedDictObservations(StackedObservations):
@@ -156,6 +221,8 @@ class StackedDictObservations(StackedObservations):
     :param n_stack: Number of frames to stack
     :param channels_order: If "first", stack on first image dimension. If "last", stack on last dimension.
         If None, automatically detect channel to stack over in case of image observation or default to "last" (default).
+    :param copy_obs: Whether to return copies of the stacked observations or read-only views
+        (see ``StackedObservations``).
     """
 
     def __init__(
@@ -164,11 +231,13 @@ class StackedDictObservations(StackedObservations):
         n_stack: int,
         observation_space: spaces.Dict,
         channels_order: Optional[Union[str, Dict[str, str]]] = None,
+        copy_obs: bool = True,
     ):
         self.n_stack = n_stack
+        self.copy_obs = copy_obs
         self.channels_first = {}
         self.stack_dimension = {}
-        self.stackedobs = {}
+        self.frames = {}
         self.repeat_axis = {}
 
         for key, subspace in observation_space.spaces.items():
@@ -180,9 +249,17 @@ class StackedDictObservations(StackedObservations):
             (
                 self.channels_first[key],
                 self.stack_dimension[key],
-                self.stackedobs[key],
+                stackedobs,
                 self.repeat_axis[key],
             ) = self.compute_stacking(num_envs, n_stack, subspace, subspace_channel_order)
+            self.frames[key] = _FrameRing(stackedobs, n_stack, self.stack_dimension[key])
+
+    @property
+    def stackedobs(self) -> Dict[str, np.ndarray]:
+        """
+        :return: The current stacked observations (read-only views)
+        """
+        return {key: _read_only(frames.view()) for key, frames in self.frames.items()}
 
     def stack_observation_space(self, observation_space: spaces.Dict) -> spaces.Dict:
         """
@@ -206,12 +283,8 @@ class StackedDictObservations(StackedObservations):
         :return: Stacked reset observations
         """
         for key, obs in observation.items():
-            self.stackedobs[key][...] = 0
-            if self.channels_first[key]:
-                self.stackedobs[key][:, -obs.shape[self.stack_dimension[key]] :, ...] = obs
-            else:
-                self.stackedobs[key][..., -obs.shape[self.stack_dimension[key]] :] = obs
-        return self.stackedobs
+            self.frames[key].reset(obs)
+        return {key: self._output(frames) for key, frames in self.frames.items()}
 
     def update(
         self,
@@ -227,39 +300,19 @@ class StackedDictObservations(StackedObservations):
         :param infos: dict of infos
         :return: tuple of the stacked observations and the updated infos
         """
-        for key in self.stackedobs.keys():
-            stack_ax_size = observations[key].shape[self.stack_dimension[key]]
-            self.stackedobs[key] = np.roll(
-                self.stackedobs[key],
-                shift=-stack_ax_size,
-                axis=self.stack_dimension[key],
-            )
-
-            for i, done in enumerate(dones):
-                if done:
-                    if "terminal_observation" in infos[i]:
-                        old_terminal = infos[i]["terminal_observation"][key]
-                        if self.channels_first[key]:
-                            new_terminal = np.vstack(
-                                (
-                                    self.stackedobs[key][i, :-stack_ax_size, ...],
-                                    old_terminal,
-                                )
-                            )
-                        else:
-                            new_terminal = np.concatenate(
-                                (
-                                    self.stackedobs[key][i, ..., :-stack_ax_size],
-                                    old_terminal,
-                                ),
-                                axis=self.stack_dimension[key],
-                            )
-                        infos[i]["terminal_observation"][key] = new_terminal
-                    else:
-                        warnings.warn("VecFrameStack wrapping a VecEnv without terminal_observation info")
-                    self.stackedobs[key][i] = 0
-            if self.channels_first[key]:
-                self.stackedobs[key][:, -stack_ax_size:, ...] = observations[key]
-            else:
-                self.stackedobs[key][..., -stack_ax_size:] = observations[key]
-        return self.stackedobs, infos
+        for key, frames in self.frames.items():
+            for i in np.flatnonzero(dones):
+                if "terminal_observation" in infos[i]:
+                    old_terminal = infos[i]["terminal_observation"][key]
+                    infos[i]["terminal_observation"][key] = frames.terminal_observation(
+                        i, old_terminal, axis=self.repeat_axis[key]
+                    )
+                else:
+                    warnings.warn("VecFrameStack wrapping a VecEnv without terminal_observation info")
+            frames.push(observations[key], dones)
+        return {key: self._output(frames) for key, frames in self.frames.items()}, infos
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
@@ -1,6 +1,7 @@
+import copy
 import multiprocessing as mp
 from collections import OrderedDict
-from typing import Any, Callable, List, Optional, Sequence, Tuple, Type, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
 
 import gym
 import numpy as np
@@ -12,48 +13,199 @@ from stable_baselines3.common.vec_env.base_vec_env import (
     VecEnvObs,
     VecEnvStepReturn,
 )
+from stable_baselines3.common.vec_env.util import copy_obs_dict, dict_to_obs, obs_space_info
 
 
-def _worker(
-    remote: mp.connection.Connection, parent_remote: mp.connection.Connection, env_fn_wrapper: CloudpickleWrapper
-) -> None:
+def _import_shared_memory() -> Any:
+    """
+    Import ``multiprocessing.shared_memory``, which is only available on Python 3.8+.
+
+    :return: The ``multiprocessing.shared_memory`` module
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError as error:
+        raise ImportError("`shared_memory=True` requires Python 3.8+ (`multiprocessing.shared_memory`)") from error
+    return shared_memory
+
+
+def _attach_shared_memory(name: str) -> Any:
+    """
+    Attach to an existing shared memory block without registering it with the resource tracker.
+
+    The workers share the resource tracker of the parent process, which created the block and unlinks it:
+    a registration by the worker would be reported as a leak, or unregistered twice.
+
+    :param name: Name of the block
+    :return: The attached ``SharedMemory`` block
+    """
+    shared_memory = _import_shared_memory()
+    try:
+        # Python 3.13+
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class _SharedMemoryBuffers(object):
+    """
+    Observations, rewards and dones of all the environments, stored in shared memory blocks.
+
+    The parent process creates and unlinks the blocks, the workers attach to them by name.
+
+    :param observation_space: Observation space of the environments
+    :param n_envs: Number of environments
+    :param names: Names of the blocks to attach to, new blocks are created when None
+    """
+
+    def __init__(self, observation_space: gym.spaces.Space, n_envs: int, names: Optional[List[str]] = None):
+        self.keys, shapes, dtypes = obs_space_info(observation_space)
+        specs = [((n_envs,) + tuple(shapes[key]), dtypes[key]) for key in self.keys]
+        specs += [((n_envs,), np.float32), ((n_envs,), bool)]
+
+        shared_memory = _import_shared_memory()
+        self.blocks = []
+        arrays = []
+        for i, (shape, dtype) in enumerate(specs):
+            if names is None:
+                size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = _attach_shared_memory(names[i])
+            self.blocks.append(block)
+            arrays.append(np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+        self.obs = OrderedDict(zip(self.keys, arrays[: len(self.keys)]))
+        self.rewards, self.dones = arrays[len(self.keys) :]
+
+    @property
+    def names(self) -> List[str]:
+        return [block.name for block in self.blocks]
+
+    def save_obs(self, env_idx: int, obs: VecEnvObs) -> None:
+        for key in self.keys:
+            if key is None:
+                self.obs[key][env_idx] = obs
+            else:
+                self.obs[key][env_idx] = obs[key]
+
+    def get_obs(self, observation_space: gym.spaces.Space) -> VecEnvObs:
+        return dict_to_obs(observation_space, copy_obs_dict(self.obs))
+
+    def close(self, unlink: bool = False) -> None:
+        # Release the numpy views before closing the blocks
+        self.obs, self.rewards, self.dones = None, None, None
+        for block in self.blocks:
+            block.close()
+            if unlink:
+                block.unlink()
+
+
+def _step_envs(
+    envs: List[gym.Env],
+    actions: np.ndarray,
+    shared_buffers: Optional[_SharedMemoryBuffers],
+    first_env_idx: Optional[int],
+) -> List[Any]:
+    """
+    Step the environments of a worker, resetting the ones that are done.
+
+    :return: The transition of each environment, only its infos when the others are written in shared memory
+    """
+    results = []
+    for local_idx, (env, action) in enumerate(zip(envs, actions)):
+        observation, reward, done, info = env.step(action)
+        if done:
+            # save final observation where user can get it, then reset
+            info["terminal_observation"] = observation
+            observation = env.reset()
+        if shared_buffers is None:
+            results.append((observation, reward, done, info))
+        else:
+            env_idx = first_env_idx + local_idx
+            shared_buffers.save_obs(env_idx, observation)
+            shared_buffers.rewards[env_idx] = reward
+            shared_buffers.dones[env_idx] = done
+            results.append(info)
+    return results
+
+
+def _reset_envs(
+    envs: List[gym.Env], shared_buffers: Optional[_SharedMemoryBuffers], first_env_idx: Optional[int]
+) -> Optional[List[VecEnvObs]]:
+    """
+    Reset the environments of a worker.
+
+    :return: The observations, None when they are written in shared memory
+    """
+    observations = [env.reset() for env in envs]
+    if shared_buffers is None:
+        return observations
+    for local_idx, observation in enumerate(observations):
+        shared_buffers.save_obs(first_env_idx + local_idx, observation)
+    return None
+
+
+def _is_wrapped(env: gym.Env, wrapper_class: Type[gym.Wrapper]) -> bool:
     # Import here to avoid a circular import
     from stable_baselines3.common.env_util import is_wrapped
 
+    return is_wrapped(env, wrapper_class)
+
+
+# Commands that target a subset of the environments of a worker,
+# called with each environment and the arguments of the command
+_ENV_COMMANDS = {
+    "env_method": lambda env, args: getattr(env, args[0])(*args[1], **args[2]),
+    "get_attr": lambda env, attr_name: getattr(env, attr_name),
+    "set_attr": lambda env, args: setattr(env, args[0], args[1]),
+    "is_wrapped": _is_wrapped,
+}
+
+
+def _worker(
+    remote: mp.connection.Connection, parent_remote: mp.connection.Connection, env_fn_wrapper: CloudpickleWrapper
+) -> None:
     parent_remote.close()
-    env = env_fn_wrapper.var()
+    # The worker hosts a contiguous slice of the environments
+    envs = [env_fn() for env_fn in env_fn_wrapper.var]
+    # Set when the observations, rewards and dones are sent through shared memory
+    shared_buffers, first_env_idx = None, None
     while True:
         try:
             cmd, data = remote.recv()
             if cmd == "step":
-                observation, reward, done, info = env.step(data)
-                if done:
-                    # save final observation where user can get it, then reset
-                    info["terminal_observation"] = observation
-                    observation = env.reset()
-                remote.send((observation, reward, done, info))
+                remote.send(_step_envs(envs, data, shared_buffers, first_env_idx))
             elif cmd == "seed":
-                remote.send(env.seed(data))
+                remote.send([env.seed(data + local_idx) for local_idx, env in enumerate(envs)])
             elif cmd == "reset":
-                observation = env.reset()
-                remote.send(observation)
+                remote.send(_reset_envs(envs, shared_buffers, first_env_idx))
             elif cmd == "render":
-                remote.send(env.render(data))
+                remote.send([env.render(data) for env in envs])
             elif cmd == "close":
-                env.close()
+                for env in envs:
+                    env.close()
+                if shared_buffers is not None:
+                    shared_buffers.close()
                 remote.close()
                 break
+            elif cmd == "attach_shared_memory":
+                names, n_envs, first_env_idx = data
+                shared_buffers = _SharedMemoryBuffers(envs[0].observation_space, n_envs, names)
+                remote.send(None)
             elif cmd == "get_spaces":
-                remote.send((env.observation_space, env.action_space))
-            elif cmd == "env_method":
-                method = getattr(env, data[0])
-                remote.send(method(*data[1], **data[2]))
-            elif cmd == "get_attr":
-                remote.send(getattr(env, data))
-            elif cmd == "set_attr":
-                remote.send(setattr(env, data[0], data[1]))
-            elif cmd == "is_wrapped":
-                remote.send(is_wrapped(env, data))
+                remote.send((envs[0].observation_space, envs[0].action_space))
+            elif cmd in _ENV_COMMANDS:
+                local_indices, args = data
+                remote.send([_ENV_COMMANDS[cmd](envs[i], args) for i in local_indices])
             else:
                 raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
         except EOFError:
@@ -67,6 +219,8 @@ class SubprocVecEnv(VecEnv):
 
     For performance reasons, if your environment is not IO bound, the number of environments should not exceed the
     number of logical cores on your CPU.
+    For cheap environments, several of them can be stepped in sequence by the same process
+    (see ``n_envs_per_worker``), so that the number of processes matches the number of cores.
 
     .. warning::
 
@@ -82,11 +236,45 @@ class SubprocVecEnv(VecEnv):
     :param start_method: method used to start the subprocesses.
            Must be one of the methods returned by multiprocessing.get_all_start_methods().
            Defaults to 'forkserver' on available platforms, and 'spawn' otherwise.
+    :param shared_memory: Whether the workers write the observations, rewards and dones
+        in shared memory instead of sending them through the pipes (only the infos are pickled).
+        This avoids several copies per step for large observations or many environments.
+        Requires Python 3.8+.
+    :param n_envs_per_worker: Number of environments hosted by each subprocess.
+        Each worker steps a contiguous slice of the environments and answers with a single message.
+        The last worker hosts the remaining environments.
+    :param static_attributes: Attributes that do not change during the life of the environments
+        (e.g. ``("spec", "metadata", "reward_range")``), none by default.
+        ``get_attr()`` fetches them once per environment and then returns copies of the memoized values.
+        ``set_attr()`` and ``env_method()`` invalidate the memoized values of the environments they target.
+    :param parent_methods: Pure functions to run in the main process instead of the workers,
+        indexed by the name of the environment method they replace in ``env_method()``
+        (see ``register_parent_method()``).
     """
 
-    def __init__(self, env_fns: List[Callable[[], gym.Env]], start_method: Optional[str] = None):
+    def __init__(
+        self,
+        env_fns: List[Callable[[], gym.Env]],
+        start_method: Optional[str] = None,
+        shared_memory: bool = False,
+        n_envs_per_worker: int = 1,
+        static_attributes: Iterable[str] = (),
+        parent_methods: Optional[Dict[str, Callable]] = None,
+    ):
+        assert n_envs_per_worker > 0, "`n_envs_per_worker` must be positive"
+        if shared_memory:
+            # Fail before starting the workers
+            _import_shared_memory()
         self.waiting = False
         self.closed = False
+        self.shared_buffers = None
+        self.n_envs_per_worker = n_envs_per_worker
+        self.static_attributes = set(static_attributes)
+        self.parent_methods = {}
+        for method_name, function in (parent_methods or {}).items():
+            self.register_parent_method(method_name, function)
+        # Memoized values of the static attributes, indexed by (attribute name, env index)
+        self._attr_cache = {}
         n_envs = len(env_fns)
 
         if start_method is None:
@@ -97,10 +285,13 @@ class SubprocVecEnv(VecEnv):
             start_method = "forkserver" if forkserver_available else "spawn"
         ctx = mp.get_context(start_method)
 
-        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        # Index of the first environment of each worker
+        self.worker_starts = list(range(0, n_envs, n_envs_per_worker))
+        self.worker_slices = [slice(start, start + n_envs_per_worker) for start in self.worker_starts]
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in self.worker_slices])
         self.processes = []
-        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
-            args = (work_remote, remote, CloudpickleWrapper(env_fn))
+        for work_remote, remote, worker_slice in zip(self.work_remotes, self.remotes, self.worker_slices):
+            args = (work_remote, remote, CloudpickleWrapper(env_fns[worker_slice]))
             # daemon=True: if the main process crashes, we should not cause things to hang
             process = ctx.Process(target=_worker, args=args, daemon=True)  # pytype:disable=attribute-error
             process.start()
@@ -111,26 +302,44 @@ class SubprocVecEnv(VecEnv):
         observation_space, action_space = self.remotes[0].recv()
         VecEnv.__init__(self, len(env_fns), observation_space, action_space)
 
+        if shared_memory:
+            self.shared_buffers = _SharedMemoryBuffers(observation_space, n_envs)
+            for first_env_idx, remote in zip(self.worker_starts, self.remotes):
+                remote.send(("attach_shared_memory", (self.shared_buffers.names, n_envs, first_env_idx)))
+            for remote in self.remotes:
+                remote.recv()
+
     def step_async(self, actions: np.ndarray) -> None:
-        for remote, action in zip(self.remotes, actions):
-            remote.send(("step", action))
+        for remote, worker_slice in zip(self.remotes, self.worker_slices):
+            remote.send(("step", actions[worker_slice]))
         self.waiting = True
 
     def step_wait(self) -> VecEnvStepReturn:
-        results = [remote.recv() for remote in self.remotes]
+        results = self._recv_all(self.remotes)
         self.waiting = False
+        if self.shared_buffers is not None:
+            return (
+                self.shared_buffers.get_obs(self.observation_space),
+                np.copy(self.shared_buffers.rewards),
+                np.copy(self.shared_buffers.dones),
+                tuple(results),
+            )
         obs, rews, dones, infos = zip(*results)
         return _flatten_obs(obs, self.observation_space), np.stack(rews), np.stack(dones), infos
 
     def seed(self, seed: Optional[int] = None) -> List[Union[None, int]]:
-        for idx, remote in enumerate(self.remotes):
-            remote.send(("seed", seed + idx))
-        return [remote.recv() for remote in self.remotes]
+        for first_env_idx, remote in zip(self.worker_starts, self.remotes):
+            remote.send(("seed", seed + first_env_idx))
+        return self._recv_all(self.remotes)
 
     def reset(self) -> VecEnvObs:
         for remote in self.remotes:
             remote.send(("reset", None))
-        obs = [remote.recv() for remote in self.remotes]
+        if self.shared_buffers is not None:
+            for remote in self.remotes:
+                remote.recv()
+            return self.shared_buffers.get_obs(self.observation_space)
+        obs = self._recv_all(self.remotes)
         return _flatten_obs(obs, self.observation_space)
 
     def close(self) -> None:
@@ -143,6 +352,8 @@ class SubprocVecEnv(VecEnv):
             remote.send(("close", None))
         for process in self.processes:
             process.join()
+        if self.shared_buffers is not None:
+            self.shared_buffers.close(unlink=True)
         self.closed = True
 
     def get_images(self) -> Sequence[np.ndarray]:
@@ -150,48 +361,113 @@ class SubprocVecEnv(VecEnv):
             # gather images from subprocesses
             # `mode` will be taken into account later
             pipe.send(("render", "rgb_array"))
-        imgs = [pipe.recv() for pipe in self.remotes]
+        imgs = self._recv_all(self.remotes)
         return imgs
 
+    def register_parent_method(self, method_name: str, function: Callable) -> None:
+        """
+        Run a pure function in the main process when ``env_method(method_name, ...)`` is called,
+        skipping the communication with the workers (e.g. ``compute_reward`` for HER).
+
+        The function receives the arguments passed to ``env_method()``, it is called once
+        and its result is returned for each of the targeted environments.
+
+        :param method_name: Name of the environment method
+        :param function: Function computing the same result as the environment method
+        """
+        assert callable(function), f"The function registered for `{method_name}` must be callable"
+        self.parent_methods[method_name] = function
+
     def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
         """Return attribute from vectorized environment (see base class)."""
-        target_remotes = self._get_target_remotes(indices)
-        for remote in target_remotes:
-            remote.send(("get_attr", attr_name))
-        return [remote.recv() for remote in target_remotes]
+        if attr_name not in self.static_attributes:
+            return self._get_attr(attr_name, indices)
+
+        env_indices = [env_idx % self.num_envs for env_idx in self._get_indices(indices)]
+        missing_indices = [env_idx for env_idx in env_indices if (attr_name, env_idx) not in self._attr_cache]
+        if missing_indices:
+            for env_idx, value in zip(missing_indices, self._get_attr(attr_name, missing_indices)):
+                self._attr_cache[(attr_name, env_idx)] = value
+        # Copies, so that the callers cannot modify the memoized values
+        return [copy.deepcopy(self._attr_cache[(attr_name, env_idx)]) for env_idx in env_indices]
+
+    def _get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        target_workers = self._get_target_workers(indices)
+        for remote, local_indices in target_workers:
+            remote.send(("get_attr", (local_indices, attr_name)))
+        return self._recv_all([remote for remote, _ in target_workers])
 
     def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
         """Set attribute inside vectorized environments (see base class)."""
-        target_remotes = self._get_target_remotes(indices)
-        for remote in target_remotes:
-            remote.send(("set_attr", (attr_name, value)))
-        for remote in target_remotes:
+        self._invalidate_attr_cache(indices, attr_name)
+        target_workers = self._get_target_workers(indices)
+        for remote, local_indices in target_workers:
+            remote.send(("set_attr", (local_indices, (attr_name, value))))
+        for remote, _ in target_workers:
             remote.recv()
 
     def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
         """Call instance methods of vectorized environments."""
-        target_remotes = self._get_target_remotes(indices)
-        for remote in target_remotes:
-            remote.send(("env_method", (method_name, method_args, method_kwargs)))
-        return [remote.recv() for remote in target_remotes]
+        if method_name in self.parent_methods:
+            result = self.parent_methods[method_name](*method_args, **method_kwargs)
+            return [result for _ in self._get_indices(indices)]
+        # The method may modify the static attributes
+        self._invalidate_attr_cache(indices)
+        target_workers = self._get_target_workers(indices)
+        for remote, local_indices in target_workers:
+            remote.send(("env_method", (local_indices, (method_name, method_args, method_kwargs))))
+        return self._recv_all([remote for remote, _ in target_workers])
+
+    def _invalidate_attr_cache(self, indices: VecEnvIndices, attr_name: Optional[str] = None) -> None:
+        """
+        Forget the memoized static attributes of some environments.
+
+        :param indices: refers to indices of envs.
+        :param attr_name: Name of the attribute to forget, all the attributes if None
+        """
+        if not self._attr_cache:
+            return
+        env_indices = set(env_idx % self.num_envs for env_idx in self._get_indices(indices))
+        for key in list(self._attr_cache.keys()):
+            if key[1] in env_indices and (attr_name is None or key[0] == attr_name):
+                del self._attr_cache[key]
 
     def env_is_wrapped(self, wrapper_class: Type[gym.Wrapper], indices: VecEnvIndices = None) -> List[bool]:
         """Check if worker environments are wrapped with a given wrapper"""
-        target_remotes = self._get_target_remotes(indices)
-        for remote in target_remotes:
-            remote.send(("is_wrapped", wrapper_class))
-        return [remote.recv() for remote in target_remotes]
+        target_workers = self._get_target_workers(indices)
+        for remote, local_indices in target_workers:
+            remote.send(("is_wrapped", (local_indices, wrapper_class)))
+        return self._recv_all([remote for remote, _ in target_workers])
 
-    def _get_target_remotes(self, indices: VecEnvIndices) -> List[Any]:
+    def _get_target_workers(self, indices: VecEnvIndices) -> List[Tuple[mp.connection.Connection, List[int]]]:
         """
-        Get the connection object needed to communicate with the wanted
-        envs that are in subprocesses.
+        Get the connection objects needed to communicate with the wanted
+        envs that are in subprocesses, along with the index of these envs inside each worker.
 
         :param indices: refers to indices of envs.
-        :return: Connection object to communicate between processes.
+        :return: Connection object and local env indices, for each worker to communicate with.
+        """
+        target_workers = []
+        last_worker_idx = None
+        for env_idx in self._get_indices(indices):
+            env_idx %= self.num_envs
+            worker_idx = env_idx // self.n_envs_per_worker
+            # Consecutive envs of the same worker are grouped in one message, the order of the results is kept
+            if worker_idx != last_worker_idx:
+                target_workers.append((self.remotes[worker_idx], []))
+                last_worker_idx = worker_idx
+            target_workers[-1][1].append(env_idx - self.worker_starts[worker_idx])
+        return target_workers
+
+    @staticmethod
+    def _recv_all(remotes: Sequence[mp.connection.Connection]) -> List[Any]:
+        """
+        Receive the answer of each worker and concatenate them (one element per environment).
+
+        :param remotes: Connection objects to receive from
+        :return: The concatenated answers
         """
-        indices = self._get_indices(indices)
-        return [self.remotes[i] for i in indices]
+        return [result for remote in remotes for result in remote.recv()]
 
 
 def _flatten_obs(obs: Union[List[VecEnvObs], Tuple[VecEnvObs]], space: gym.spaces.Space) -> VecEnvObs:
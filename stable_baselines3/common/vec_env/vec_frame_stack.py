@@ -18,9 +18,17 @@ class VecFrameStack(VecEnvWrapper):
     :param channels_order: If "first", stack on first image dimension. If "last", stack on last dimension.
         If None, automatically detect channel to stack over in case of image observation or default to "last" (default).
         Alternatively channels_order can be a dictionary which can be used with environments with Dict observation spaces
+    :param copy_obs: Whether to return a copy of the stacked observations. Otherwise, read-only views
+        on the internal ring buffer are returned, which avoids a copy per step but are only valid until the next step.
     """
 
-    def __init__(self, venv: VecEnv, n_stack: int, channels_order: Optional[Union[str, Dict[str, str]]] = None):
+    def __init__(
+        self,
+        venv: VecEnv,
+        n_stack: int,
+        channels_order: Optional[Union[str, Dict[str, str]]] = None,
+        copy_obs: bool = True,
+    ):
         self.venv = venv
         self.n_stack = n_stack
 
@@ -30,10 +38,10 @@ class VecFrameStack(VecEnvWrapper):
             assert not isinstance(
                 channels_order, dict
             ), f"Expected None or string for channels_order but received {channels_order}"
-            self.stackedobs = StackedObservations(venv.num_envs, n_stack, wrapped_obs_space, channels_order)
+            self.stackedobs = StackedObservations(venv.num_envs, n_stack, wrapped_obs_space, channels_order, copy_obs)
 
         elif isinstance(wrapped_obs_space, spaces.Dict):
-            self.stackedobs = StackedDictObservations(venv.num_envs, n_stack, wrapped_obs_space, channels_order)
+            self.stackedobs = StackedDictObservations(venv.num_envs, n_stack, wrapped_obs_space, channels_order, copy_obs)
 
         else:
             raise Exception("VecFrameStack only works with gym.spaces.Box and gym.spaces.Dict observation spaces")
@@ -1,11 +1,53 @@
 import time
 import warnings
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 
 from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvObs, VecEnvStepReturn, VecEnvWrapper
 
+# Return, length, end time (relative to the creation of the monitor) and index of the environment of an episode
+EPISODE_RECORD_DTYPE = np.dtype([("r", np.float32), ("l", np.int32), ("t", np.float64), ("env_idx", np.int64)])
+
+
+class EpisodeRecordBuffer(object):
+    """
+    Fixed size FIFO of episode records (see ``VecMonitor.episode_records``),
+    the records of a step are added with a single vectorized copy.
+
+    :param maxlen: Maximal number of records kept, the oldest ones are dropped first
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self.maxlen = maxlen
+        self._records = np.zeros(maxlen, dtype=EPISODE_RECORD_DTYPE)
+        self.pos = 0
+        self.full = False
+
+    def extend(self, records: np.ndarray) -> None:
+        """
+        :param records: Episode records with the ``EPISODE_RECORD_DTYPE`` dtype
+        """
+        records = records[-self.maxlen :]
+        if len(records) == 0:
+            return
+        indices = (self.pos + np.arange(len(records))) % self.maxlen
+        self._records[indices] = records
+        self.full = self.full or self.pos + len(records) >= self.maxlen
+        self.pos = (self.pos + len(records)) % self.maxlen
+
+    @property
+    def records(self) -> np.ndarray:
+        """
+        :return: The records, from the oldest to the newest
+        """
+        if not self.full:
+            return self._records[: self.pos]
+        return np.concatenate((self._records[self.pos :], self._records[: self.pos]))
+
+    def __len__(self) -> int:
+        return self.maxlen if self.full else self.pos
+
 
 class VecMonitor(VecEnvWrapper):
     """
@@ -18,9 +60,14 @@ class VecMonitor(VecEnvWrapper):
     wrapper. So this class simply does the job of the ``Monitor`` wrapper on
     a vectorized level.
 
+    The statistics of the running episodes are kept in arrays, and the episodes completed
+    at the last step are also available as a structured array (``episode_records``).
+
     :param venv: The vectorized environment
     :param filename: the location to save a log file, can be None for no log
     :param info_keywords: extra information to log, from the information return of env.step()
+    :param results_writer_kwargs: Keyword arguments to pass to the ``ResultsWriter``
+        (e.g. to buffer the episodes or to use the binary format)
     """
 
     def __init__(
@@ -28,6 +75,7 @@ class VecMonitor(VecEnvWrapper):
         venv: VecEnv,
         filename: Optional[str] = None,
         info_keywords: Tuple[str, ...] = (),
+        results_writer_kwargs: Optional[Dict[str, Any]] = None,
     ):
         # Avoid circular import
         from stable_baselines3.common.monitor import Monitor, ResultsWriter
@@ -51,6 +99,8 @@ class VecMonitor(VecEnvWrapper):
         VecEnvWrapper.__init__(self, venv)
         self.episode_returns = None
         self.episode_lengths = None
+        # Episodes completed at the last step
+        self.episode_records = np.zeros(0, dtype=EPISODE_RECORD_DTYPE)
         self.episode_count = 0
         self.t_start = time.time()
 
@@ -60,7 +110,10 @@ class VecMonitor(VecEnvWrapper):
 
         if filename:
             self.results_writer = ResultsWriter(
-                filename, header={"t_start": self.t_start, "env_id": env_id}, extra_keys=info_keywords
+                filename,
+                header={"t_start": self.t_start, "env_id": env_id},
+                extra_keys=info_keywords,
+                **(results_writer_kwargs or {}),
             )
         else:
             self.results_writer = None
@@ -77,19 +130,29 @@ class VecMonitor(VecEnvWrapper):
         self.episode_returns += rewards
         self.episode_lengths += 1
         new_infos = list(infos[:])
-        for i in range(len(dones)):
-            if dones[i]:
-                info = infos[i].copy()
-                episode_return = self.episode_returns[i]
-                episode_length = self.episode_lengths[i]
-                episode_info = {"r": episode_return, "l": episode_length, "t": round(time.time() - self.t_start, 6)}
-                info["episode"] = episode_info
-                self.episode_count += 1
-                self.episode_returns[i] = 0
-                self.episode_lengths[i] = 0
-                if self.results_writer:
-                    self.results_writer.write_row(episode_info)
-                new_infos[i] = info
+        done_indices = np.flatnonzero(dones)
+        records = np.zeros(len(done_indices), dtype=EPISODE_RECORD_DTYPE)
+        self.episode_records = records
+        if len(done_indices) == 0:
+            return obs, rewards, dones, new_infos
+
+        records["r"] = self.episode_returns[done_indices]
+        records["l"] = self.episode_lengths[done_indices]
+        records["t"] = round(time.time() - self.t_start, 6)
+        records["env_idx"] = done_indices
+        self.episode_returns[done_indices] = 0
+        self.episode_lengths[done_indices] = 0
+        self.episode_count += len(done_indices)
+
+        episode_infos = []
+        for record in records:
+            episode_info = {"r": record["r"], "l": record["l"], "t": float(record["t"])}
+            info = infos[record["env_idx"]].copy()
+            info["episode"] = episode_info
+            new_infos[record["env_idx"]] = info
+            episode_infos.append(episode_info)
+        if self.results_writer:
+            self.results_writer.write_rows(episode_infos)
         return obs, rewards, dones, new_infos
 
     def close(self) -> None:
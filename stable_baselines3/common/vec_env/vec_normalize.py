@@ -1,9 +1,12 @@
 import pickle
-from copy import deepcopy
-from typing import Any, Dict, Union
+import threading
+import weakref
+from copy import copy, deepcopy
+from typing import Any, Dict, Optional, Tuple, Type, Union
 
 import gym
 import numpy as np
+import torch as th
 
 from stable_baselines3.common import utils
 from stable_baselines3.common.running_mean_std import RunningMeanStd
@@ -23,6 +26,8 @@ class VecNormalize(VecEnvWrapper):
     :param clip_reward: Max value absolute for discounted reward
     :param gamma: discount factor
     :param epsilon: To avoid division by zero
+    :param stats_dtype: Type of the running statistics and of the intermediate results of the normalization.
+        With float32, the observations are normalized in place in the returned float32 arrays.
     """
 
     def __init__(
@@ -35,6 +40,7 @@ class VecNormalize(VecEnvWrapper):
         clip_reward: float = 10.0,
         gamma: float = 0.99,
         epsilon: float = 1e-8,
+        stats_dtype: Union[Type, np.dtype] = np.float64,
     ):
         VecEnvWrapper.__init__(self, venv)
 
@@ -45,12 +51,14 @@ class VecNormalize(VecEnvWrapper):
         if isinstance(self.observation_space, gym.spaces.Dict):
             self.obs_keys = set(self.observation_space.spaces.keys())
             self.obs_spaces = self.observation_space.spaces
-            self.obs_rms = {key: RunningMeanStd(shape=space.shape) for key, space in self.obs_spaces.items()}
+            self.obs_rms = {
+                key: RunningMeanStd(shape=space.shape, dtype=stats_dtype) for key, space in self.obs_spaces.items()
+            }
         else:
             self.obs_keys, self.obs_spaces = None, None
-            self.obs_rms = RunningMeanStd(shape=self.observation_space.shape)
+            self.obs_rms = RunningMeanStd(shape=self.observation_space.shape, dtype=stats_dtype)
 
-        self.ret_rms = RunningMeanStd(shape=())
+        self.ret_rms = RunningMeanStd(shape=(), dtype=stats_dtype)
         self.clip_obs = clip_obs
         self.clip_reward = clip_reward
         # Returns: discounted rewards
@@ -62,6 +70,15 @@ class VecNormalize(VecEnvWrapper):
         self.norm_reward = norm_reward
         self.old_obs = np.array([])
         self.old_reward = np.array([])
+        self._init_caches()
+
+    def _init_caches(self) -> None:
+        # Mean and standard deviation of each observation statistics, as numpy arrays and as tensors,
+        # they are recomputed when the statistics are updated (new arrays are then assigned)
+        self._obs_scales = weakref.WeakKeyDictionary()
+        # Intermediate results of the normalization, per thread as the replay buffer may be sampled
+        # in a background thread (see ``PrefetchBuffer``)
+        self._scratch = threading.local()
 
     def __getstate__(self) -> Dict[str, Any]:
         """
@@ -74,6 +91,8 @@ class VecNormalize(VecEnvWrapper):
         del state["class_attributes"]
         # these attributes depend on the above and so we would prefer not to pickle
         del state["ret"]
+        del state["_obs_scales"]
+        del state["_scratch"]
         return state
 
     def __setstate__(self, state: Dict[str, Any]) -> None:
@@ -86,6 +105,7 @@ class VecNormalize(VecEnvWrapper):
         self.__dict__.update(state)
         assert "venv" not in state
         self.venv = None
+        self._init_caches()
 
     def set_venv(self, venv: VecEnv) -> None:
         """
@@ -139,17 +159,70 @@ class VecNormalize(VecEnvWrapper):
 
     def _update_reward(self, reward: np.ndarray) -> None:
         """Update reward normalization statistics."""
-        self.ret = self.ret * self.gamma + reward
+        self.ret *= self.gamma
+        self.ret += reward
         self.ret_rms.update(self.ret)
 
-    def _normalize_obs(self, obs: np.ndarray, obs_rms: RunningMeanStd) -> np.ndarray:
+    def _obs_scale(
+        self, obs_rms: RunningMeanStd, device: Optional[th.device] = None
+    ) -> Tuple[Union[np.ndarray, th.Tensor], Union[np.ndarray, th.Tensor]]:
+        """
+        Helper to get the mean and the standard deviation used to normalize observations.
+        They are cached until new statistics are assigned to ``obs_rms``.
+
+        :param obs_rms: associated statistics
+        :param device: If given, float32 tensors on this device are returned instead of numpy arrays
+        :return: mean and standard deviation
+        """
+        scales = self._obs_scales.setdefault(obs_rms, {})
+        cached = scales.get(device)
+        if cached is None or cached[0] is not obs_rms.mean or cached[1] is not obs_rms.var:
+            mean, std = obs_rms.mean, np.sqrt(obs_rms.var + self.epsilon)
+            if device is not None:
+                mean = th.as_tensor(mean, dtype=th.float32, device=device)
+                std = th.as_tensor(std, dtype=th.float32, device=device)
+            cached = (obs_rms.mean, obs_rms.var, mean, std)
+            scales[device] = cached
+        return cached[2], cached[3]
+
+    def _get_scratch(self, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        buffers = self._scratch.__dict__
+        if buffers.get((shape, dtype)) is None:
+            buffers[(shape, dtype)] = np.empty(shape, dtype)
+        return buffers[(shape, dtype)]
+
+    def _normalize_obs(self, obs: np.ndarray, obs_rms: RunningMeanStd, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Helper to normalize observation.
         :param obs:
         :param obs_rms: associated statistics
+        :param out: Array where the result is written, a new array of the type of the statistics is returned otherwise.
+            When the types differ, the computation is done in a reusable buffer of the type of the statistics.
         :return: normalized observation
         """
-        return np.clip((obs - obs_rms.mean) / np.sqrt(obs_rms.var + self.epsilon), -self.clip_obs, self.clip_obs)
+        mean, std = self._obs_scale(obs_rms)
+        work = out
+        if out is not None and out.dtype != mean.dtype:
+            work = self._get_scratch(np.shape(obs), mean.dtype)
+        work = np.subtract(obs, mean, out=work)
+        np.divide(work, std, out=work)
+        np.clip(work, -self.clip_obs, self.clip_obs, out=work)
+        if out is None or work is out:
+            return work
+        out[...] = work
+        return out
+
+    def _normalize_obs_th(self, obs: Union[np.ndarray, th.Tensor], obs_rms: RunningMeanStd, device: th.device) -> th.Tensor:
+        """
+        Helper to normalize observation on a PyTorch device, in float32.
+        :param obs:
+        :param obs_rms: associated statistics
+        :param device:
+        :return: normalized observation
+        """
+        mean, std = self._obs_scale(obs_rms, device)
+        obs = th.as_tensor(obs, device=device).to(th.float32)
+        return th.clamp((obs - mean) / std, -self.clip_obs, self.clip_obs)
 
     def _unnormalize_obs(self, obs: np.ndarray, obs_rms: RunningMeanStd) -> np.ndarray:
         """
@@ -165,15 +238,43 @@ class VecNormalize(VecEnvWrapper):
         Normalize observations using this VecNormalize's observations statistics.
         Calling this method does not update statistics.
         """
-        # Avoid modifying by reference the original object
-        obs_ = deepcopy(obs)
-        if self.norm_obs:
-            if isinstance(obs, dict) and isinstance(self.obs_rms, dict):
-                for key in self.obs_rms.keys():
-                    obs_[key] = self._normalize_obs(obs[key], self.obs_rms[key]).astype(np.float32)
-            else:
-                obs_ = self._normalize_obs(obs, self.obs_rms).astype(np.float32)
-        return obs_
+        if not self.norm_obs:
+            # Avoid modifying by reference the original object
+            return deepcopy(obs)
+        if isinstance(obs, dict) and isinstance(self.obs_rms, dict):
+            # The normalized observations are new arrays, only the other entries need to be copied
+            obs_ = copy(obs)
+            for key, value in obs.items():
+                if key in self.obs_rms:
+                    out = np.empty(np.shape(value), dtype=np.float32)
+                    obs_[key] = self._normalize_obs(value, self.obs_rms[key], out=out)
+                else:
+                    obs_[key] = deepcopy(value)
+            return obs_
+        return self._normalize_obs(obs, self.obs_rms, out=np.empty(np.shape(obs), dtype=np.float32))
+
+    def normalize_obs_th(
+        self,
+        obs: Union[np.ndarray, th.Tensor, Dict[str, Union[np.ndarray, th.Tensor]]],
+        device: Union[th.device, str] = "cpu",
+    ) -> Union[th.Tensor, Dict[str, Union[th.Tensor, np.ndarray]]]:
+        """
+        Normalize observations on a PyTorch device, using this VecNormalize's observations statistics.
+        The statistics are moved to the device once per update.
+        Calling this method does not update statistics.
+
+        :param obs: Observations, as numpy arrays or tensors
+        :param device: Device where the normalization is done
+        :return: The normalized observations, as float32 tensors on ``device``.
+            The entries of dict observations that have no statistics are returned as is.
+        """
+        device = th.device(device)
+        if isinstance(obs, dict) and isinstance(self.obs_rms, dict):
+            obs_ = copy(obs)
+            for key in self.obs_rms.keys() & obs.keys():
+                obs_[key] = self._normalize_obs_th(obs[key], self.obs_rms[key], device)
+            return obs_
+        return self._normalize_obs_th(obs, self.obs_rms, device)
 
     def normalize_reward(self, reward: np.ndarray) -> np.ndarray:
         """
@@ -181,7 +282,8 @@ class VecNormalize(VecEnvWrapper):
         Calling this method does not update statistics.
         """
         if self.norm_reward:
-            reward = np.clip(reward / np.sqrt(self.ret_rms.var + self.epsilon), -self.clip_reward, self.clip_reward)
+            reward = np.divide(reward, np.sqrt(self.ret_rms.var + self.epsilon))
+            return np.clip(reward, -self.clip_reward, self.clip_reward, out=reward if isinstance(reward, np.ndarray) else None)
         return reward
 
     def unnormalize_obs(self, obs: Union[np.ndarray, Dict[str, np.ndarray]]) -> Union[np.ndarray, Dict[str, np.ndarray]]:
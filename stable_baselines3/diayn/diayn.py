@@ -5,7 +5,7 @@ import time
 from collections import deque
 from logging import log
 from types import FunctionType as function
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Dict, Generator, List, Optional, Tuple, Type, Union
 
 import gym
 import numpy as np
@@ -14,7 +14,6 @@ from numpy.core.fromnumeric import mean
 from numpy.lib.index_tricks import diag_indices
 from scipy.special import expit as sigm
 from torch.distributions import beta
-from torch.nn import functional as F
 
 from stable_baselines3 import SAC
 from stable_baselines3.common.base_class import BaseAlgorithm
@@ -28,7 +27,7 @@ from stable_baselines3.common.exp_utils import DiscriminatorFunction
 from stable_baselines3.common.noise import ActionNoise
 from stable_baselines3.common.off_policy_algorithm import OffPolicyAlgorithm
 from stable_baselines3.common.save_util import (
-    load_from_zip_file,
+    load_from_file,
     recursive_getattr,
     recursive_setattr,
     save_to_zip_file,
@@ -36,6 +35,7 @@ from stable_baselines3.common.save_util import (
 from stable_baselines3.common.type_aliases import (
     GymEnv,
     MaybeCallback,
+    ReplayBufferSamplesZ,
     RolloutReturnZ,
     Schedule,
     TrainFreq,
@@ -49,6 +49,7 @@ from stable_baselines3.common.utils import (
     should_collect_more_steps,
 )
 from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.vec_monitor import EpisodeRecordBuffer
 from stable_baselines3.diayn import disc
 from stable_baselines3.diayn.disc import Discriminator
 from stable_baselines3.diayn.policies import DIAYNPolicy
@@ -77,9 +78,16 @@ class DIAYN(SAC):
         during the rollout.
     :param action_noise: the action noise type (None by default), this can help
         for hard exploration problem. Cf common.noise for the different action noise type.
+    :param replay_buffer_kwargs: Keyword arguments to pass to the replay buffer on creation
+        (e.g. ``obs_dtype`` to change the storage dtype of the observations).
     :param optimize_memory_usage: Enable a memory efficient variant of the replay buffer
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
+    :param prefetch_batches: Number of minibatches to sample in advance on a background thread
+        (see ``PrefetchBuffer``). Set to ``0`` (default) to sample synchronously.
+    :param batched_gradient_steps: Number of minibatches sampled at once from the replay buffer
+        (as a single ``batched_gradient_steps * batch_size`` batch that is split on the device).
+        It reduces the overhead of each gradient step when ``gradient_steps`` is large.
     :param ent_coef: Entropy regularization coefficient. (Equivalent to
         inverse of reward scale in the original SAC paper.)  Controlling exploration/exploitation trade-off.
         Set it to 'auto' to learn it automatically (and 'auto_0.1' for using 0.1 as initial value)
@@ -99,9 +107,20 @@ class DIAYN(SAC):
     :param seed: Seed for the pseudo random generators
     :param device: Device (cpu, cuda, ...) on which the code should be run.
         Setting it to auto, the code will be run on the GPU if possible.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
+    :param mixed_precision: Whether to run the forward passes of the networks under bfloat16 autocast,
+        the weights and the losses remain in float32
     :param _init_setup_model: Whether or not to build the network at the creation of the instance
     :param disc_on: A list of index, or a DiscriminatorFunction or 'all'. It designates which component or
         transformation of the state space you want to pass to the discriminator.
+    :param cache_disc_obs: Whether to compute the output of ``disc_on`` once, when the transition is stored,
+        and keep it in the replay buffer instead of recomputing it for every minibatch. The device of a
+        DiscriminatorFunction sets where it is computed. Not available with ``external_disc_shape``,
+        a recurrent discriminator or a ``VecNormalize`` env: the cached output is computed from
+        the unnormalized observations, while it is otherwise computed from the observations
+        normalized with the current statistics.
     :param combined_rewards: whether or not you want to learn the task AND learn skills, by default this is
         False in DIAYN (unsupervised method).
     :param beta: balance parameter between the true and the diayn reward, beta = 0 means only the true reward
@@ -128,7 +147,10 @@ class DIAYN(SAC):
         train_freq: Union[int, Tuple[int, str]] = 1,
         gradient_steps: int = 1,
         action_noise: Optional[ActionNoise] = None,
+        replay_buffer_kwargs: Optional[Dict[str, Any]] = None,
         optimize_memory_usage: bool = False,
+        prefetch_batches: int = 0,
+        batched_gradient_steps: int = 1,
         ent_coef: Union[str, float] = "auto",
         target_update_interval: int = 1,
         target_entropy: Union[str, float] = "auto",
@@ -141,10 +163,14 @@ class DIAYN(SAC):
         verbose: int = 1,
         seed: Optional[int] = None,
         device: Union[th.device, str] = "auto",
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
+        mixed_precision: bool = False,
         _init_setup_model: bool = True,
         disc_on: Union[list, str, DiscriminatorFunction] = "all",
         discriminator_kwargs: dict = {},
         external_disc_shape: np.ndarray = None,
+        cache_disc_obs: bool = False,
         combined_rewards: bool = False,
         beta: float = None,
         smerl: int = None,
@@ -175,6 +201,7 @@ class DIAYN(SAC):
             train_freq,
             gradient_steps,
             action_noise,
+            replay_buffer_kwargs=replay_buffer_kwargs,
             policy_kwargs=policy_kwargs,
             tensorboard_log=tensorboard_log,
             verbose=verbose,
@@ -185,8 +212,14 @@ class DIAYN(SAC):
             sde_sample_freq=sde_sample_freq,
             use_sde_at_warmup=use_sde_at_warmup,
             optimize_memory_usage=optimize_memory_usage,
+            prefetch_batches=prefetch_batches,
             supported_action_spaces=(gym.spaces.Box),
+            compile=compile,
+            compile_kwargs=compile_kwargs,
+            mixed_precision=mixed_precision,
         )
+        assert batched_gradient_steps > 0, "`batched_gradient_steps` must be positive"
+        self.batched_gradient_steps = batched_gradient_steps
         self.v1 = v1
         self.episode_buffer_size = episode_buffer_size
         self.target_entropy = target_entropy
@@ -204,6 +237,11 @@ class DIAYN(SAC):
         if self.discriminator_kwargs.get("arch_type") is None:
             self.discriminator_kwargs["arch_type"] = "Mlp"
         self.external_disc_shape = external_disc_shape
+        self.cache_disc_obs = cache_disc_obs
+        assert not (
+            cache_disc_obs
+            and (external_disc_shape or self.discriminator_kwargs["arch_type"] == "Rnn")
+        ), "`cache_disc_obs` is not compatible with an external or recurrent discriminator"
         assert (
             disc_on == "all"
             or isinstance(disc_on, list)
@@ -284,21 +322,29 @@ class DIAYN(SAC):
                 self.external_disc_shape,
                 self.device,
                 optimize_memory_usage=self.optimize_memory_usage,
+                **self.replay_buffer_kwargs,
             )
 
         else:
             print(self.observation_space)
             print(self.action_space)
-            if self.external_disc_shape:
+            if self.external_disc_shape or self.cache_disc_obs:
+                if self.external_disc_shape:
+                    disc_buffer_shape = self.external_disc_shape
+                elif isinstance(self.disc_obs_shape, tuple):
+                    disc_buffer_shape = self.disc_obs_shape
+                else:
+                    disc_buffer_shape = (self.disc_obs_shape,)
 
                 self.replay_buffer = ReplayBufferZExternalDisc(
                     self.buffer_size,
                     self.observation_space,
                     self.action_space,
                     self.prior,
-                    self.external_disc_shape,
+                    disc_buffer_shape,
                     self.device,
                     optimize_memory_usage=self.optimize_memory_usage,
+                    **self.replay_buffer_kwargs,
                 )
 
             else:
@@ -309,8 +355,11 @@ class DIAYN(SAC):
                     self.prior,
                     self.device,
                     optimize_memory_usage=self.optimize_memory_usage,
+                    **self.replay_buffer_kwargs,
                 )
 
+        self._wrap_replay_buffer()
+
         # print(self.policy_class)
         self.policy = self.policy_class(  # pytype:disable=not-instantiable
             self.observation_space,
@@ -375,61 +424,20 @@ class DIAYN(SAC):
             deque(maxlen=100),
         )
 
+        # In v1 we compute the diversity reward here
+        # starting by beta, which only depends on the episodes
+        # collected so far (it is the same for every gradient step)
+        if self.v1:
+            betas = th.as_tensor(self._compute_betas(), dtype=th.float32).to(
+                self.device
+            )
+
+        replay_minibatches = self._sample_minibatches(gradient_steps, batch_size)
+
         for gradient_step in range(gradient_steps):
             # Sample replay buffer
 
-            # In v1 we compute the diversity reward here
-            # starting by beta
             if self.v1:
-                betas = np.zeros(self.prior.event_shape[0])
-                for z_idx in range(self.prior.event_shape[0]):
-                    if self.combined_rewards:
-                        mean_true_rewards = [
-                            ep_info.get(f"r_true_{z_idx}")
-                            for ep_info in self.ep_info_buffer
-                        ]
-
-                        mean_true_reward = safe_mean(
-                            mean_true_rewards, where=~np.isnan(mean_true_rewards)
-                        )
-
-                        if np.isnan(mean_true_reward):
-                            mean_true_reward = 0.0
-
-                        mean_diayn_reward = [
-                            ep_info.get(f"r_diayn_{z_idx}")
-                            for ep_info in self.ep_info_buffer
-                        ]
-
-                        mean_diayn_reward = safe_mean(
-                            mean_diayn_reward, where=~np.isnan(mean_diayn_reward)
-                        )
-
-                        if np.isnan(mean_diayn_reward):
-                            mean_diayn_reward = 0.0
-
-                        if self.adaptive_beta:
-                            beta = self.adaptive_beta / (np.abs(mean_diayn_reward) + 1)
-                        else:
-                            beta = self.beta
-
-                        if self.smerl:
-                            if self.beta_smooth:
-                                a = self.smerl - np.abs(self.eps * self.smerl)
-                                beta_on = beta * sigm((mean_true_reward - a) / a * 4)
-                            else:
-                                beta_on = float(
-                                    (
-                                        mean_true_reward
-                                        >= self.smerl - np.abs(self.eps * self.smerl)
-                                    )
-                                    * beta
-                                )
-
-                        else:
-                            beta_on = beta
-                        betas[z_idx] = beta_on
-
                 if self.discriminator_kwargs["arch_type"] == "Rnn":
                     (
                         obs_trajs,
@@ -465,8 +473,7 @@ class DIAYN(SAC):
 
                     if self.combined_rewards:
                         true_reward = reward_trajs[reward_trajs > -np.inf].view((-1, 1))
-                        betas = th.Tensor(betas) * zs
-                        diayn_reward = diayn_reward * betas
+                        diayn_reward = diayn_reward * (betas * zs)
                     else:
                         true_reward = 0
 
@@ -477,9 +484,7 @@ class DIAYN(SAC):
                     )
 
                 else:
-                    replay_data = self.replay_buffer.sample(
-                        batch_size, env=self._vec_normalize_env
-                    )
+                    replay_data = next(replay_minibatches)
                     obs = replay_data.observations
                     zs = replay_data.zs
                     next_obs = replay_data.next_observations
@@ -487,11 +492,11 @@ class DIAYN(SAC):
                     dones = replay_data.dones
                     actions = replay_data.actions
 
-                    ep_index = replay_data.ep_index.flatten()
-                    len_episodes = th.Tensor(self.len_episodes)[ep_index]
                     # Get or compute vector to pass to the discriminator
 
-                    if isinstance(self.disc_on, DiscriminatorFunction):
+                    if self.cache_disc_obs:
+                        disc_obs = replay_data.disc_obs
+                    elif isinstance(self.disc_on, DiscriminatorFunction):
                         if self.external_disc_shape:
                             disc_obs = self.disc_on(replay_data.disc_obs)
                         else:
@@ -508,13 +513,12 @@ class DIAYN(SAC):
                     diayn_reward = log_q_phi.clone().detach() - self.log_p_z[0]
 
                     if self.combined_rewards:
-                        betas = th.Tensor(betas) * zs
-                        diayn_reward = diayn_reward * betas
+                        diayn_reward = diayn_reward * (betas * zs)
                         if self.mean_reward:
                             rewards = (
                                 true_reward
                                 + diayn_reward.sum(dim=1, keepdim=True)
-                                / len_episodes[:, None]
+                                / replay_data.ep_lengths
                             )
                         else:
                             rewards = true_reward + diayn_reward.sum(
@@ -527,9 +531,7 @@ class DIAYN(SAC):
 
             else:
 
-                replay_data = self.replay_buffer.sample(
-                    batch_size, env=self._vec_normalize_env
-                )
+                replay_data = next(replay_minibatches)
                 obs = replay_data.observations
                 zs = replay_data.zs
                 next_obs = replay_data.next_observations
@@ -558,11 +560,11 @@ class DIAYN(SAC):
                 ent_coef_loss = -(
                     self.log_ent_coef * (log_prob + self.target_entropy).detach()
                 ).mean()
-                ent_coef_losses.append(ent_coef_loss.item())
+                ent_coef_losses.append(ent_coef_loss.detach())
             else:
                 ent_coef = self.ent_coef_tensor
 
-            ent_coefs.append(ent_coef.item())
+            ent_coefs.append(ent_coef.detach())
 
             # Optimize entropy coefficient, also called
             # entropy temperature or alpha in the paper
@@ -590,13 +592,8 @@ class DIAYN(SAC):
 
             current_q_values = self.critic(obs, actions)
             # Compute critic loss
-            critic_loss = 0.5 * sum(
-                [
-                    F.mse_loss(current_q, target_q_values)
-                    for current_q in current_q_values
-                ]
-            )
-            critic_losses.append(critic_loss.item())
+            critic_loss = self._critic_loss(current_q_values, target_q_values)
+            critic_losses.append(critic_loss.detach())
 
             # Optimize the critic
             self.critic.optimizer.zero_grad()
@@ -609,7 +606,7 @@ class DIAYN(SAC):
             q_values_pi = th.cat(self.critic.forward(obs, actions_pi), dim=1)
             min_qf_pi, _ = th.min(q_values_pi, dim=1, keepdim=True)
             actor_loss = (ent_coef * log_prob - min_qf_pi).mean()
-            actor_losses.append(actor_loss.item())
+            actor_losses.append(actor_loss.detach())
 
             # Optimize the actor
             self.actor.optimizer.zero_grad()
@@ -635,7 +632,7 @@ class DIAYN(SAC):
                     )
 
                 else:
-                    if self.external_disc_shape:
+                    if self.external_disc_shape or self.cache_disc_obs:
                         disc_obs = replay_data.disc_obs
 
                     else:
@@ -651,21 +648,141 @@ class DIAYN(SAC):
                     z = zs.to(self.device)
                     discriminator_loss = self.discriminator.loss(log_q_phi, z)
 
-            disc_losses.append(discriminator_loss.item())
+            disc_losses.append(discriminator_loss.detach())
             self.discriminator.optimizer.zero_grad()
             discriminator_loss.backward()
             self.discriminator.optimizer.step()
 
         self._n_updates += gradient_steps
 
+        # Single device-to-host transfer for all the logged values
+        # instead of one synchronization per gradient step
+        logged_values = [ent_coefs, actor_losses, critic_losses, disc_losses]
+        if len(ent_coef_losses) > 0:
+            logged_values.append(ent_coef_losses)
+        logged_values = (
+            th.stack([th.stack(list(values)).float().mean() for values in logged_values])
+            .cpu()
+            .numpy()
+        )
+
         self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
-        self.logger.record("train/ent_coef", np.mean(ent_coefs))
-        self.logger.record("train/actor_loss", np.mean(actor_losses))
-        self.logger.record("train/critic_loss", np.mean(critic_losses))
-        self.logger.record("train/discriminator_loss", np.mean(disc_losses))
+        if self.compile:
+            self.logger.record(
+                "train/compile_mode", self.compile_mode, exclude="tensorboard"
+            )
+        self.logger.record("train/ent_coef", logged_values[0])
+        self.logger.record("train/actor_loss", logged_values[1])
+        self.logger.record("train/critic_loss", logged_values[2])
+        self.logger.record("train/discriminator_loss", logged_values[3])
 
         if len(ent_coef_losses) > 0:
-            self.logger.record("train/ent_coef_loss", np.mean(ent_coef_losses))
+            self.logger.record("train/ent_coef_loss", logged_values[4])
+
+    def _compute_betas(self) -> np.ndarray:
+        """
+        Compute the weight of the diversity reward for each skill
+        when combining it with the true reward (see ``beta``, ``smerl`` and ``adaptive_beta``).
+
+        :return: The beta of each skill (zeros when ``combined_rewards=False``)
+        """
+        betas = np.zeros(self.prior.event_shape[0])
+        if not self.combined_rewards:
+            return betas
+        for z_idx in range(self.prior.event_shape[0]):
+            mean_true_rewards = [
+                ep_info.get(f"r_true_{z_idx}") for ep_info in self.ep_info_buffer
+            ]
+
+            mean_true_reward = safe_mean(
+                mean_true_rewards, where=~np.isnan(mean_true_rewards)
+            )
+
+            if np.isnan(mean_true_reward):
+                mean_true_reward = 0.0
+
+            mean_diayn_reward = [
+                ep_info.get(f"r_diayn_{z_idx}") for ep_info in self.ep_info_buffer
+            ]
+
+            mean_diayn_reward = safe_mean(
+                mean_diayn_reward, where=~np.isnan(mean_diayn_reward)
+            )
+
+            if np.isnan(mean_diayn_reward):
+                mean_diayn_reward = 0.0
+
+            if self.adaptive_beta:
+                beta = self.adaptive_beta / (np.abs(mean_diayn_reward) + 1)
+            else:
+                beta = self.beta
+
+            if self.smerl:
+                if self.beta_smooth:
+                    a = self.smerl - np.abs(self.eps * self.smerl)
+                    beta_on = beta * sigm((mean_true_reward - a) / a * 4)
+                else:
+                    beta_on = float(
+                        (mean_true_reward >= self.smerl - np.abs(self.eps * self.smerl))
+                        * beta
+                    )
+
+            else:
+                beta_on = beta
+            betas[z_idx] = beta_on
+        return betas
+
+    def _sample_minibatches(
+        self, gradient_steps: int, batch_size: int
+    ) -> Generator[ReplayBufferSamplesZ, None, None]:
+        """
+        Yield one minibatch per gradient step.
+        ``batched_gradient_steps`` minibatches are sampled at once from the replay buffer
+        and split on the device, to reduce the per gradient step overhead.
+
+        :param gradient_steps: Number of minibatches to yield
+        :param batch_size: Size of each minibatch
+        """
+        for start in range(0, gradient_steps, self.batched_gradient_steps):
+            n_batches = min(self.batched_gradient_steps, gradient_steps - start)
+            replay_data = self.replay_buffer.sample(
+                n_batches * batch_size, env=self._vec_normalize_env
+            )
+            for i in range(n_batches):
+                yield replay_data.__class__(
+                    *(
+                        data[i * batch_size : (i + 1) * batch_size]
+                        for data in replay_data
+                    )
+                )
+
+    def _setup_learn(
+        self,
+        total_timesteps: int,
+        eval_env: Optional[GymEnv],
+        callback: MaybeCallback = None,
+        eval_freq: int = 10000,
+        n_eval_episodes: int = 5,
+        log_path: Optional[str] = None,
+        reset_num_timesteps: bool = True,
+        tb_log_name: str = "run",
+    ) -> Tuple[int, BaseCallback]:
+        """
+        cf `BaseAlgorithm`.
+        """
+        assert not (
+            self.cache_disc_obs and self._vec_normalize_env is not None
+        ), "`cache_disc_obs` is not compatible with a `VecNormalize` env"
+        return super()._setup_learn(
+            total_timesteps,
+            eval_env,
+            callback,
+            eval_freq,
+            n_eval_episodes,
+            log_path,
+            reset_num_timesteps,
+            tb_log_name,
+        )
 
     def learn(
         self,
@@ -680,8 +797,6 @@ class DIAYN(SAC):
         reset_num_timesteps: bool = True,
     ) -> "OffPolicyAlgorithm":
 
-        self.len_episodes = np.zeros(total_timesteps)
-
         total_timesteps, callback = self._setup_learn(
             total_timesteps,
             eval_env,
@@ -693,6 +808,7 @@ class DIAYN(SAC):
             tb_log_name,
         )
         self.ep_info_buffer = deque(maxlen=self.episode_buffer_size)
+        self.ep_record_buffer = EpisodeRecordBuffer(maxlen=self.episode_buffer_size)
         self.ep_success_buffer = deque(maxlen=self.episode_buffer_size)
 
         callback.on_training_start(locals(), globals())
@@ -724,6 +840,7 @@ class DIAYN(SAC):
 
                 self.train(batch_size=self.batch_size, gradient_steps=gradient_steps)
 
+        self._stop_prefetching()
         callback.on_training_end()
         return self
 
@@ -984,7 +1101,6 @@ class DIAYN(SAC):
                     break
 
             if done:
-                self.len_episodes[self._episode_num] = num_collected_steps
                 num_collected_episodes += 1
                 self._episode_num += 1
                 diayn_episode_rewards.append(diayn_episode_reward)
@@ -1034,6 +1150,7 @@ class DIAYN(SAC):
         :param infos: List of additional information about the transition.
             It contains the terminal observations.
         :param z: The active skill
+        :param disc_obs: Observation of the discriminator, when it is stored in the replay buffer
         """
         # Store only the unnormalized version
         if isinstance(self._last_obs, dict):
@@ -1057,6 +1174,12 @@ class DIAYN(SAC):
                 next_obs = self._vec_normalize_env.unnormalize_obs(next_obs)
         else:
             next_obs = new_obs_
+        if self.cache_disc_obs:
+            # Computed once here instead of for every minibatch it appears in
+            if isinstance(self.disc_on, DiscriminatorFunction):
+                disc_obs = self.disc_on(self._last_original_obs)
+            else:
+                disc_obs = self._last_original_obs[:, self.disc_on]
         if disc_obs is not None:
             replay_buffer.add(
                 self._last_original_obs,
@@ -1146,10 +1269,13 @@ class DIAYN(SAC):
         device: Union[th.device, str] = "auto",
         custom_objects: Optional[Dict[str, Any]] = None,
         exact_match=True,
+        params_to_load: Optional[List[str]] = None,
+        mmap: bool = False,
+        n_threads: int = 1,
         **kwargs,
     ) -> "BaseAlgorithm":
         """
-        Load the model from a zip-file
+        Load the model from a zip-file or a stream checkpoint (see ``save``)
 
         :param path: path to the file (or a file-like) where to
             load the agent from
@@ -1162,10 +1288,19 @@ class DIAYN(SAC):
             will be used instead. Similar to custom_objects in
             ``keras.models.load_model``. Useful when you have an object in
             file that can not be deserialized.
+        :param params_to_load: Names of the state_dicts to load, e.g. ``["policy"]`` to only load
+            what is needed for inference (skips the discriminator and the optimizers)
+        :param mmap: Whether to memory-map the tensors of a stream checkpoint
+        :param n_threads: Number of threads reading the tensors of a stream checkpoint
         :param kwargs: extra arguments to change the model when loading
         """
-        data, params, pytorch_variables = load_from_zip_file(
-            path, device=device, custom_objects=custom_objects
+        data, params, pytorch_variables = load_from_file(
+            path,
+            device=device,
+            custom_objects=custom_objects,
+            params_to_load=params_to_load,
+            mmap=mmap,
+            n_threads=n_threads,
         )
         # Remove stored device information and replace with ours
         if "policy_kwargs" in data:
@@ -1215,7 +1350,9 @@ class DIAYN(SAC):
         model._setup_model()
 
         # put state_dicts back in place
-        model.set_parameters(params, exact_match=exact_match, device=device)
+        model.set_parameters(
+            params, exact_match=exact_match and params_to_load is None, device=device
+        )
 
         # put other pytorch variables back in place
         if pytorch_variables is not None:
@@ -1310,6 +1447,12 @@ class DIAYN(SAC):
         # Pass the number of timesteps for tensorboard
         self.logger.dump(step=self.num_timesteps)
 
+    def _get_mixed_precision_functions(self) -> List[Tuple[Any, str]]:
+        # The log probabilities of the discriminator are computed in float32
+        return super()._get_mixed_precision_functions() + [
+            (self.discriminator.network, "forward")
+        ]
+
     def _excluded_save_params(self) -> List[str]:
         return super(SAC, self)._excluded_save_params() + [
             "actor",
@@ -23,6 +23,7 @@ from stable_baselines3.common.distributions import (
 from stable_baselines3.common.policies import (
     BasePolicy,
     ContinuousCritic,
+    VectorizedContinuousCritic,
     create_sde_features_extractor,
     register_policy,
 )
@@ -74,6 +75,8 @@ class DIAYNPolicy(BasePolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -96,6 +99,7 @@ class DIAYNPolicy(BasePolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(DIAYNPolicy, self).__init__(
             observation_space,
@@ -147,6 +151,7 @@ class DIAYNPolicy(BasePolicy):
         self.actor, self.actor_target = None, None
         self.critic, self.critic_target = None, None
         self.share_features_extractor = share_features_extractor
+        self.vectorized_critic = vectorized_critic
 
         self._build(lr_schedule)
 
@@ -194,6 +199,7 @@ class DIAYNPolicy(BasePolicy):
                 use_expln=self.actor_kwargs["use_expln"],
                 clip_mean=self.actor_kwargs["clip_mean"],
                 n_critics=self.critic_kwargs["n_critics"],
+                vectorized_critic=self.vectorized_critic,
                 lr_schedule=self._dummy_schedule,  # dummy lr schedule, not needed for loading policy alone
                 optimizer_class=self.optimizer_class,
                 optimizer_kwargs=self.optimizer_kwargs,
@@ -222,12 +228,15 @@ class DIAYNPolicy(BasePolicy):
 
     def make_critic(
         self, features_extractor: Optional[BaseFeaturesExtractor] = None
-    ) -> ContinuousCritic:
+    ) -> Union[ContinuousCritic, VectorizedContinuousCritic]:
         critic_kwargs = self._update_features_extractor(
             self.critic_kwargs, features_extractor
         )
         critic_kwargs["features_dim"] += self.n_skills
-        return ContinuousCritic(**critic_kwargs).to(self.device)
+        critic_class = (
+            VectorizedContinuousCritic if self.vectorized_critic else ContinuousCritic
+        )
+        return critic_class(**critic_kwargs).to(self.device)
 
     def forward(self, obs: th.Tensor, deterministic: bool = False) -> th.Tensor:
         return self._predict(obs, deterministic=deterministic)
@@ -354,6 +363,8 @@ class CnnPolicy(DIAYNPolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -375,6 +386,7 @@ class CnnPolicy(DIAYNPolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(CnnPolicy, self).__init__(
             observation_space,
@@ -394,6 +406,7 @@ class CnnPolicy(DIAYNPolicy):
             optimizer_kwargs,
             n_critics,
             share_features_extractor,
+            vectorized_critic,
         )
 
 
@@ -425,6 +438,8 @@ class MultiInputPolicy(DIAYNPolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -446,6 +461,7 @@ class MultiInputPolicy(DIAYNPolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(MultiInputPolicy, self).__init__(
             observation_space,
@@ -465,6 +481,7 @@ class MultiInputPolicy(DIAYNPolicy):
             optimizer_kwargs,
             n_critics,
             share_features_extractor,
+            vectorized_critic,
         )
 
 
@@ -7,7 +7,6 @@ import numpy as np
 from numpy.core.fromnumeric import mean
 import torch as th
 from collections import deque
-from torch.nn import functional as F
 import pathlib
 import io
 from scipy.special import expit as sigm
@@ -276,12 +275,7 @@ class SEQDIAYN(DIAYN):
             current_q_values = self.critic(obs, replay_data.actions)
 
             # Compute critic loss
-            critic_loss = 0.5 * sum(
-                [
-                    F.mse_loss(current_q, target_q_values)
-                    for current_q in current_q_values
-                ]
-            )
+            critic_loss = self._critic_loss(current_q_values, target_q_values)
             critic_losses.append(critic_loss.item())
 
             # Optimize the critic
@@ -342,6 +336,10 @@ class SEQDIAYN(DIAYN):
         self._n_updates += gradient_steps
 
         self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        if self.compile:
+            self.logger.record(
+                "train/compile_mode", self.compile_mode, exclude="tensorboard"
+            )
         self.logger.record("train/ent_coef", np.mean(ent_coefs))
         self.logger.record("train/actor_loss", np.mean(actor_losses))
         self.logger.record("train/critic_loss", np.mean(critic_losses))
@@ -436,6 +434,7 @@ class SEQDIAYN(DIAYN):
 
 
 
+        self._stop_prefetching()
         callback.on_training_end()
         return self
 
@@ -41,6 +41,8 @@ class DQN(OffPolicyAlgorithm):
     :param optimize_memory_usage: Enable a memory efficient variant of the replay buffer
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
+    :param prefetch_batches: Number of minibatches to sample in advance on a background thread
+        (see ``PrefetchBuffer``). Set to ``0`` (default) to sample synchronously.
     :param target_update_interval: update the target network every ``target_update_interval``
         environment steps.
     :param exploration_fraction: fraction of entire training period over which the exploration rate is reduced
@@ -73,6 +75,7 @@ class DQN(OffPolicyAlgorithm):
         replay_buffer_class: Optional[ReplayBuffer] = None,
         replay_buffer_kwargs: Optional[Dict[str, Any]] = None,
         optimize_memory_usage: bool = False,
+        prefetch_batches: int = 0,
         target_update_interval: int = 10000,
         exploration_fraction: float = 0.1,
         exploration_initial_eps: float = 1.0,
@@ -110,6 +113,7 @@ class DQN(OffPolicyAlgorithm):
             seed=seed,
             sde_support=False,
             optimize_memory_usage=optimize_memory_usage,
+            prefetch_batches=prefetch_batches,
             supported_action_spaces=(gym.spaces.Discrete,),
         )
 
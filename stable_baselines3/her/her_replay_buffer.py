@@ -67,6 +67,8 @@ class HerReplayBuffer(DictReplayBuffer):
     :param handle_timeout_termination: Handle timeout termination (due to timelimit)
         separately and treat the task as infinite horizon task.
         https://github.com/DLR-RM/stable-baselines3/issues/284
+    :param normalize_on_device: Whether to normalize the sampled observations on the device
+        (see ``BaseBuffer``)
     """
 
     def __init__(
@@ -80,9 +82,17 @@ class HerReplayBuffer(DictReplayBuffer):
         goal_selection_strategy: Union[GoalSelectionStrategy, str] = "future",
         online_sampling: bool = True,
         handle_timeout_termination: bool = True,
+        normalize_on_device: bool = False,
     ):
 
-        super(HerReplayBuffer, self).__init__(buffer_size, env.observation_space, env.action_space, device, env.num_envs)
+        super(HerReplayBuffer, self).__init__(
+            buffer_size,
+            env.observation_space,
+            env.action_space,
+            device,
+            env.num_envs,
+            normalize_on_device=normalize_on_device,
+        )
 
         # convert goal_selection_strategy into GoalSelectionStrategy if string
         if isinstance(goal_selection_strategy, str):
@@ -175,6 +185,10 @@ class HerReplayBuffer(DictReplayBuffer):
         assert "env" not in state
         self.env = None
 
+    def _storage_size(self) -> int:
+        # The rows are episodes
+        return self.max_episode_stored
+
     def set_env(self, env: VecEnv) -> None:
         """
         Sets the environment.
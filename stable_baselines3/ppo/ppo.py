@@ -61,6 +61,9 @@ class PPO(OnPolicyAlgorithm):
     :param seed: Seed for the pseudo random generators
     :param device: Device (cpu, cuda, ...) on which the code should be run.
         Setting it to auto, the code will be run on the GPU if possible.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
     :param _init_setup_model: Whether or not to build the network at the creation of the instance
     """
 
@@ -88,6 +91,8 @@ class PPO(OnPolicyAlgorithm):
         verbose: int = 0,
         seed: Optional[int] = None,
         device: Union[th.device, str] = "auto",
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
         _init_setup_model: bool = True,
     ):
 
@@ -116,6 +121,8 @@ class PPO(OnPolicyAlgorithm):
                 spaces.MultiDiscrete,
                 spaces.MultiBinary,
             ),
+            compile=compile,
+            compile_kwargs=compile_kwargs,
         )
 
         # Sanity check, otherwise it will lead to noisy gradient and NaN
@@ -279,6 +286,8 @@ class PPO(OnPolicyAlgorithm):
             self.logger.record("train/std", th.exp(self.policy.log_std).mean().item())
 
         self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        if self.compile:
+            self.logger.record("train/compile_mode", self.compile_mode, exclude="tensorboard")
         self.logger.record("train/clip_range", clip_range)
         if self.clip_range_vf is not None:
             self.logger.record("train/clip_range_vf", clip_range_vf)
@@ -11,6 +11,7 @@ from stable_baselines3.common.distributions import (
 from stable_baselines3.common.policies import (
     BasePolicy,
     ContinuousCritic,
+    VectorizedContinuousCritic,
     create_sde_features_extractor,
     register_policy,
 )
@@ -209,6 +210,9 @@ class Actor(BasePolicy):
 
     def action_log_prob(self, obs: th.Tensor) -> Tuple[th.Tensor, th.Tensor]:
         mean_actions, log_std, kwargs = self.get_action_dist_params(obs)
+        if isinstance(self.action_dist, SquashedDiagGaussianDistribution):
+            # The distribution is not used afterwards, skip its creation
+            return self.action_dist.stateless_log_prob_from_params(mean_actions, log_std)
         # return action and associated log prob
         return self.action_dist.log_prob_from_params(mean_actions, log_std, **kwargs)
 
@@ -248,6 +252,8 @@ class SACPolicy(BasePolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -269,6 +275,7 @@ class SACPolicy(BasePolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(SACPolicy, self).__init__(
             observation_space,
@@ -318,6 +325,7 @@ class SACPolicy(BasePolicy):
         self.actor, self.actor_target = None, None
         self.critic, self.critic_target = None, None
         self.share_features_extractor = share_features_extractor
+        self.vectorized_critic = vectorized_critic
 
         self._build(lr_schedule)
 
@@ -365,6 +373,7 @@ class SACPolicy(BasePolicy):
                 use_expln=self.actor_kwargs["use_expln"],
                 clip_mean=self.actor_kwargs["clip_mean"],
                 n_critics=self.critic_kwargs["n_critics"],
+                vectorized_critic=self.vectorized_critic,
                 lr_schedule=self._dummy_schedule,  # dummy lr schedule, not needed for loading policy alone
                 optimizer_class=self.optimizer_class,
                 optimizer_kwargs=self.optimizer_kwargs,
@@ -392,11 +401,14 @@ class SACPolicy(BasePolicy):
 
     def make_critic(
         self, features_extractor: Optional[BaseFeaturesExtractor] = None
-    ) -> ContinuousCritic:
+    ) -> Union[ContinuousCritic, VectorizedContinuousCritic]:
         critic_kwargs = self._update_features_extractor(
             self.critic_kwargs, features_extractor
         )
-        return ContinuousCritic(**critic_kwargs).to(self.device)
+        critic_class = (
+            VectorizedContinuousCritic if self.vectorized_critic else ContinuousCritic
+        )
+        return critic_class(**critic_kwargs).to(self.device)
 
     def forward(self, obs: th.Tensor, deterministic: bool = False) -> th.Tensor:
         return self._predict(obs, deterministic=deterministic)
@@ -438,6 +450,8 @@ class CnnPolicy(SACPolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -459,6 +473,7 @@ class CnnPolicy(SACPolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(CnnPolicy, self).__init__(
             observation_space,
@@ -478,6 +493,7 @@ class CnnPolicy(SACPolicy):
             optimizer_kwargs,
             n_critics,
             share_features_extractor,
+            vectorized_critic,
         )
 
 
@@ -509,6 +525,8 @@ class MultiInputPolicy(SACPolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -530,6 +548,7 @@ class MultiInputPolicy(SACPolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(MultiInputPolicy, self).__init__(
             observation_space,
@@ -549,6 +568,7 @@ class MultiInputPolicy(SACPolicy):
             optimizer_kwargs,
             n_critics,
             share_features_extractor,
+            vectorized_critic,
         )
 
 
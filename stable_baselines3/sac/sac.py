@@ -50,6 +50,8 @@ class SAC(OffPolicyAlgorithm):
     :param optimize_memory_usage: Enable a memory efficient variant of the replay buffer
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
+    :param prefetch_batches: Number of minibatches to sample in advance on a background thread
+        (see ``PrefetchBuffer``). Set to ``0`` (default) to sample synchronously.
     :param ent_coef: Entropy regularization coefficient. (Equivalent to
         inverse of reward scale in the original SAC paper.)  Controlling exploration/exploitation trade-off.
         Set it to 'auto' to learn it automatically (and 'auto_0.1' for using 0.1 as initial value)
@@ -69,6 +71,11 @@ class SAC(OffPolicyAlgorithm):
     :param seed: Seed for the pseudo random generators
     :param device: Device (cpu, cuda, ...) on which the code should be run.
         Setting it to auto, the code will be run on the GPU if possible.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
+    :param mixed_precision: Whether to run the forward passes of the networks under bfloat16 autocast,
+        the weights and the losses remain in float32
     :param _init_setup_model: Whether or not to build the network at the creation of the instance
     """
 
@@ -88,6 +95,7 @@ class SAC(OffPolicyAlgorithm):
         replay_buffer_class: Optional[ReplayBuffer] = None,
         replay_buffer_kwargs: Optional[Dict[str, Any]] = None,
         optimize_memory_usage: bool = False,
+        prefetch_batches: int = 0,
         ent_coef: Union[str, float] = "auto",
         target_update_interval: int = 1,
         target_entropy: Union[str, float] = "auto",
@@ -100,6 +108,9 @@ class SAC(OffPolicyAlgorithm):
         verbose: int = 0,
         seed: Optional[int] = None,
         device: Union[th.device, str] = "auto",
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
+        mixed_precision: bool = False,
         _init_setup_model: bool = True,
     ):
 
@@ -128,7 +139,11 @@ class SAC(OffPolicyAlgorithm):
             sde_sample_freq=sde_sample_freq,
             use_sde_at_warmup=use_sde_at_warmup,
             optimize_memory_usage=optimize_memory_usage,
+            prefetch_batches=prefetch_batches,
             supported_action_spaces=(gym.spaces.Box),
+            compile=compile,
+            compile_kwargs=compile_kwargs,
+            mixed_precision=mixed_precision,
         )
 
         self.target_entropy = target_entropy
@@ -180,6 +195,33 @@ class SAC(OffPolicyAlgorithm):
         self.critic = self.policy.critic
         self.critic_target = self.policy.critic_target
 
+    def _critic_loss(self, current_q_values: Tuple[th.Tensor, ...], target_q_values: th.Tensor) -> th.Tensor:
+        """
+        Mean squared TD error, summed over the critics.
+
+        :param current_q_values: Q-values estimates of each critic
+        :param target_q_values: Targets of the Q-values
+        :return: The critic loss
+        """
+        return 0.5 * sum(F.mse_loss(current_q, target_q_values) for current_q in current_q_values)
+
+    def _get_compiled_functions(self) -> List[Tuple[Any, str]]:
+        return [
+            (self.actor, "forward"),
+            (self.actor, "action_log_prob"),
+            (self.critic, "forward"),
+            (self.critic_target, "forward"),
+            (self, "_critic_loss"),
+        ]
+
+    def _get_mixed_precision_functions(self) -> List[Tuple[Any, str]]:
+        # The distribution (log probability) is computed in float32
+        return [
+            (self.actor, "get_action_dist_params"),
+            (self.critic, "forward"),
+            (self.critic_target, "forward"),
+        ]
+
     def train(self, gradient_steps: int, batch_size: int = 64) -> None:
         # Update optimizers learning rate
         optimizers = [self.actor.optimizer, self.critic.optimizer]
@@ -240,7 +282,7 @@ class SAC(OffPolicyAlgorithm):
             current_q_values = self.critic(replay_data.observations, replay_data.actions)
 
             # Compute critic loss
-            critic_loss = 0.5 * sum([F.mse_loss(current_q, target_q_values) for current_q in current_q_values])
+            critic_loss = self._critic_loss(current_q_values, target_q_values)
             critic_losses.append(critic_loss.item())
 
             # Optimize the critic
@@ -268,6 +310,8 @@ class SAC(OffPolicyAlgorithm):
         self._n_updates += gradient_steps
 
         self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        if self.compile:
+            self.logger.record("train/compile_mode", self.compile_mode, exclude="tensorboard")
         self.logger.record("train/ent_coef", np.mean(ent_coefs))
         self.logger.record("train/actor_loss", np.mean(actor_losses))
         self.logger.record("train/critic_loss", np.mean(critic_losses))
@@ -4,7 +4,12 @@ import gym
 import torch as th
 from torch import nn
 
-from stable_baselines3.common.policies import BasePolicy, ContinuousCritic, register_policy
+from stable_baselines3.common.policies import (
+    BasePolicy,
+    ContinuousCritic,
+    VectorizedContinuousCritic,
+    register_policy,
+)
 from stable_baselines3.common.preprocessing import get_action_dim
 from stable_baselines3.common.torch_layers import (
     BaseFeaturesExtractor,
@@ -104,6 +109,8 @@ class TD3Policy(BasePolicy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -120,6 +127,7 @@ class TD3Policy(BasePolicy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(TD3Policy, self).__init__(
             observation_space,
@@ -162,6 +170,7 @@ class TD3Policy(BasePolicy):
         self.actor, self.actor_target = None, None
         self.critic, self.critic_target = None, None
         self.share_features_extractor = share_features_extractor
+        self.vectorized_critic = vectorized_critic
 
         self._build(lr_schedule)
 
@@ -199,6 +208,7 @@ class TD3Policy(BasePolicy):
                 net_arch=self.net_arch,
                 activation_fn=self.net_args["activation_fn"],
                 n_critics=self.critic_kwargs["n_critics"],
+                vectorized_critic=self.vectorized_critic,
                 lr_schedule=self._dummy_schedule,  # dummy lr schedule, not needed for loading policy alone
                 optimizer_class=self.optimizer_class,
                 optimizer_kwargs=self.optimizer_kwargs,
@@ -213,9 +223,12 @@ class TD3Policy(BasePolicy):
         actor_kwargs = self._update_features_extractor(self.actor_kwargs, features_extractor)
         return Actor(**actor_kwargs).to(self.device)
 
-    def make_critic(self, features_extractor: Optional[BaseFeaturesExtractor] = None) -> ContinuousCritic:
+    def make_critic(
+        self, features_extractor: Optional[BaseFeaturesExtractor] = None
+    ) -> Union[ContinuousCritic, VectorizedContinuousCritic]:
         critic_kwargs = self._update_features_extractor(self.critic_kwargs, features_extractor)
-        return ContinuousCritic(**critic_kwargs).to(self.device)
+        critic_class = VectorizedContinuousCritic if self.vectorized_critic else ContinuousCritic
+        return critic_class(**critic_kwargs).to(self.device)
 
     def forward(self, observation: th.Tensor, deterministic: bool = False) -> th.Tensor:
         return self._predict(observation, deterministic=deterministic)
@@ -250,6 +263,8 @@ class CnnPolicy(TD3Policy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -266,6 +281,7 @@ class CnnPolicy(TD3Policy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(CnnPolicy, self).__init__(
             observation_space,
@@ -280,6 +296,7 @@ class CnnPolicy(TD3Policy):
             optimizer_kwargs,
             n_critics,
             share_features_extractor,
+            vectorized_critic,
         )
 
 
@@ -304,6 +321,8 @@ class MultiInputPolicy(TD3Policy):
     :param n_critics: Number of critic networks to create.
     :param share_features_extractor: Whether to share or not the features extractor
         between the actor and the critic (this saves computation time)
+    :param vectorized_critic: Whether to stack the weights of the critics along an ensemble axis
+        and evaluate them in parallel (see ``VectorizedContinuousCritic``), useful with many critics
     """
 
     def __init__(
@@ -320,6 +339,7 @@ class MultiInputPolicy(TD3Policy):
         optimizer_kwargs: Optional[Dict[str, Any]] = None,
         n_critics: int = 2,
         share_features_extractor: bool = True,
+        vectorized_critic: bool = False,
     ):
         super(MultiInputPolicy, self).__init__(
             observation_space,
@@ -334,6 +354,7 @@ class MultiInputPolicy(TD3Policy):
             optimizer_kwargs,
             n_critics,
             share_features_extractor,
+            vectorized_critic,
         )
 
 
@@ -45,6 +45,8 @@ class TD3(OffPolicyAlgorithm):
     :param optimize_memory_usage: Enable a memory efficient variant of the replay buffer
         at a cost of more complexity.
         See https://github.com/DLR-RM/stable-baselines3/issues/37#issuecomment-637501195
+    :param prefetch_batches: Number of minibatches to sample in advance on a background thread
+        (see ``PrefetchBuffer``). Set to ``0`` (default) to sample synchronously.
     :param policy_delay: Policy and target networks will only be updated once every policy_delay steps
         per training steps. The Q values will be updated policy_delay more often (update every training step).
     :param target_policy_noise: Standard deviation of Gaussian noise added to target policy
@@ -57,6 +59,11 @@ class TD3(OffPolicyAlgorithm):
     :param seed: Seed for the pseudo random generators
     :param device: Device (cpu, cuda, ...) on which the code should be run.
         Setting it to auto, the code will be run on the GPU if possible.
+    :param compile: Whether to compile the hot paths of the policy and of the training step
+        with ``torch.compile()``, falling back to eager mode when the compilation fails
+    :param compile_kwargs: Additional keyword arguments passed to ``torch.compile()``
+    :param mixed_precision: Whether to run the forward passes of the networks under bfloat16 autocast,
+        the weights and the losses remain in float32
     :param _init_setup_model: Whether or not to build the network at the creation of the instance
     """
 
@@ -76,6 +83,7 @@ class TD3(OffPolicyAlgorithm):
         replay_buffer_class: Optional[ReplayBuffer] = None,
         replay_buffer_kwargs: Optional[Dict[str, Any]] = None,
         optimize_memory_usage: bool = False,
+        prefetch_batches: int = 0,
         policy_delay: int = 2,
         target_policy_noise: float = 0.2,
         target_noise_clip: float = 0.5,
@@ -85,6 +93,9 @@ class TD3(OffPolicyAlgorithm):
         verbose: int = 0,
         seed: Optional[int] = None,
         device: Union[th.device, str] = "auto",
+        compile: bool = False,
+        compile_kwargs: Optional[Dict[str, Any]] = None,
+        mixed_precision: bool = False,
         _init_setup_model: bool = True,
     ):
 
@@ -111,7 +122,11 @@ class TD3(OffPolicyAlgorithm):
             seed=seed,
             sde_support=False,
             optimize_memory_usage=optimize_memory_usage,
+            prefetch_batches=prefetch_batches,
             supported_action_spaces=(gym.spaces.Box),
+            compile=compile,
+            compile_kwargs=compile_kwargs,
+            mixed_precision=mixed_precision,
         )
 
         self.policy_delay = policy_delay
@@ -131,6 +146,18 @@ class TD3(OffPolicyAlgorithm):
         self.critic = self.policy.critic
         self.critic_target = self.policy.critic_target
 
+    def _get_compiled_functions(self) -> List[Tuple[Any, str]]:
+        return [
+            (self.actor, "forward"),
+            (self.actor_target, "forward"),
+            (self.critic, "forward"),
+            (self.critic, "q1_forward"),
+            (self.critic_target, "forward"),
+        ]
+
+    def _get_mixed_precision_functions(self) -> List[Tuple[Any, str]]:
+        return self._get_compiled_functions()
+
     def train(self, gradient_steps: int, batch_size: int = 100) -> None:
 
         # Update learning rate according to lr schedule
@@ -182,6 +209,8 @@ class TD3(OffPolicyAlgorithm):
                 polyak_update(self.actor.parameters(), self.actor_target.parameters(), self.tau)
 
         self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        if self.compile:
+            self.logger.record("train/compile_mode", self.compile_mode, exclude="tensorboard")
         if len(actor_losses) > 0:
             self.logger.record("train/actor_loss", np.mean(actor_losses))
         self.logger.record("train/critic_loss", np.mean(critic_losses))
@@ -0,0 +1,61 @@
+import pickle
+
+import numpy as np
+import pytest
+import torch as th
+
+from stable_baselines3.common.behaviour_functions import behaviour_registry, discretize_xy
+
+OBS_DIM = 158
+
+
+def legacy_descriptor(name, obs):
+    # Column by column implementations the vectorized descriptors must match
+    obs = np.array(obs, dtype=np.float64)
+    if name == "crawler_y_legs":
+        return np.stack([obs[:, 8 + i * 14] for i in range(4)], axis=1)
+    if name == "crawler_forelegs_contact":
+        return np.stack([obs[:, -4 * (4 - i) + 2] for i in range(4)], axis=1)
+    if name == "crawler_is_flying":
+        legs = np.concatenate([obs[:, 3 + 6 * i : 6 + 6 * i] - obs[:, :3] for i in range(4)], axis=1)
+        return (legs == 0).all(axis=1)[:, None].astype(np.float64)
+    if name == "crawler_sensor_outputs":
+        return obs[:, :128]
+    if name == "discretize_xy":
+        out = obs[:, :2].copy()
+        for i in range(2):
+            pos = np.linspace(-1.0, 1.0, 5)
+            out[:, i] = pos[np.abs(pos[None] - out[:, i, None]).argmin(axis=1)]
+        return out
+
+
+@pytest.mark.parametrize("name", list(behaviour_registry.keys()))
+@pytest.mark.parametrize("use_torch", [False, True])
+def test_behaviour_descriptors(name, use_torch):
+    function, output_size = behaviour_registry[name]
+    kwargs = dict(dims=[5, 5], min_values=[-1, -1], max_values=[1, 1]) if name == "discretize_xy" else {}
+    obs = np.random.uniform(-1.5, 1.5, size=(32, OBS_DIM)).astype(np.float32)
+    # Make some of the crawlers fly
+    obs[::2, 3:27] = np.tile(obs[::2, :3], 8)
+    original_obs = obs.copy()
+
+    disc_obs = function(th.as_tensor(obs) if use_torch else obs, **kwargs)
+    assert isinstance(disc_obs, th.Tensor if use_torch else np.ndarray)
+    assert disc_obs.shape == (32, output_size)
+    assert np.allclose(np.asarray(disc_obs), legacy_descriptor(name, original_obs), atol=1e-6)
+    # The observation is not modified
+    assert np.all(obs == original_obs)
+
+
+def test_gather_descriptor_pickle():
+    function, _ = behaviour_registry["crawler_y_legs"]
+    obs = th.ones(2, OBS_DIM)
+    function(obs)
+    loaded_function = pickle.loads(pickle.dumps(function))
+    assert th.allclose(loaded_function(obs), function(obs))
+
+
+def test_discretize_xy_single_bin():
+    obs = np.array([[0.3, 2.0], [-0.7, -2.0]], dtype=np.float32)
+    disc_obs = discretize_xy(obs, dims=[1, 3], min_values=[0, -1], max_values=[1, 1])
+    assert np.allclose(disc_obs, [[0.0, 1.0], [0.0, -1.0]])
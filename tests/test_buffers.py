@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+import torch as th
+
+from stable_baselines3 import DQN, SAC, TD3
+from stable_baselines3.common.buffers import PrefetchBuffer, ReplayBuffer, ReplayBufferZ
+from stable_baselines3.common.envs import IdentityEnv, IdentityEnvBox
+
+
+def fill_buffer(buffer, n_transitions):
+    for i in range(n_transitions):
+        obs = np.full((1,) + buffer.obs_shape, i, dtype=np.float32)
+        buffer.add(obs, obs + 1, np.zeros((1, buffer.action_dim)), np.array([i]), np.array([False]), [{}])
+
+
+@pytest.mark.parametrize("optimize_memory_usage", [False, True])
+def test_prefetch_buffer(optimize_memory_usage):
+    env = IdentityEnvBox(10)
+    buffer = ReplayBuffer(50, env.observation_space, env.action_space, optimize_memory_usage=optimize_memory_usage)
+    fill_buffer(buffer, 20)
+
+    prefetch_buffer = PrefetchBuffer(buffer, n_batches=3, seed=0)
+    # Attributes are forwarded to the wrapped buffer
+    assert prefetch_buffer.size() == 20
+    for _ in range(10):
+        replay_data = prefetch_buffer.sample(8)
+        assert replay_data.observations.shape == (8, 1)
+        assert th.allclose(replay_data.next_observations, replay_data.observations + 1)
+        assert th.allclose(replay_data.rewards.flatten(), replay_data.observations.flatten())
+        assert replay_data.observations.max() < 20
+
+    # Adding transitions while the thread is running
+    fill_buffer(prefetch_buffer, 10)
+    assert prefetch_buffer.size() == 30
+    # Each batch size has its own sampling thread, alternating does not restart them
+    thread = prefetch_buffer._samplers[8][2]
+    for _ in range(3):
+        assert prefetch_buffer.sample(4).observations.shape == (4, 1)
+        assert prefetch_buffer.sample(8).observations.shape == (8, 1)
+    assert prefetch_buffer._samplers[8][2] is thread
+    assert len(prefetch_buffer._samplers) == 2
+    prefetch_buffer.close()
+    assert not thread.is_alive()
+
+    # Seeded sampling is reproducible, even when the threads are stopped in between
+    samples = []
+    for close_every in [1, 2, 5]:
+        prefetch_buffer = PrefetchBuffer(buffer, n_batches=2, seed=1)
+        batches = []
+        for i in range(10):
+            batches.append(prefetch_buffer.sample(16).observations)
+            batches.append(prefetch_buffer.sample(3).observations)
+            if (i + 1) % close_every == 0:
+                prefetch_buffer.close()
+        samples.append(th.cat(batches))
+    assert th.allclose(samples[0], samples[1])
+    assert th.allclose(samples[0], samples[2])
+
+
+def test_prefetch_buffer_custom_sample():
+    class CustomSampleBuffer(ReplayBuffer):
+        def sample(self, batch_size, env=None):
+            return super().sample(batch_size, env)
+
+    env = IdentityEnvBox(10)
+    buffer = CustomSampleBuffer(50, env.observation_space, env.action_space)
+    fill_buffer(buffer, 20)
+    # Buffers sampling with the global RNG are sampled in the main thread
+    with pytest.warns(UserWarning):
+        prefetch_buffer = PrefetchBuffer(buffer, n_batches=2, seed=0)
+    samples = []
+    for _ in range(2):
+        np.random.seed(0)
+        samples.append(prefetch_buffer.sample(8).observations)
+    assert th.allclose(samples[0], samples[1])
+    assert len(prefetch_buffer._samplers) == 0
+
+
+@pytest.mark.parametrize("model_class", [SAC, TD3, DQN])
+def test_prefetch_training(tmp_path, model_class):
+    env = IdentityEnv(10) if model_class == DQN else IdentityEnvBox(10)
+    model = model_class("MlpPolicy", env, learning_starts=50, prefetch_batches=2, policy_kwargs=dict(net_arch=[16]))
+    assert isinstance(model.replay_buffer, PrefetchBuffer)
+    model.learn(200)
+    # The sampling threads are stopped at the end of training
+    assert len(model.replay_buffer._samplers) == 0
+
+    # The unwrapped buffer is saved
+    model.save_replay_buffer(tmp_path / "replay_buffer.pkl")
+    model.load_replay_buffer(tmp_path / "replay_buffer.pkl")
+    assert isinstance(model.replay_buffer, PrefetchBuffer)
+    assert isinstance(model.replay_buffer.buffer, ReplayBuffer)
+    model.learn(100, reset_num_timesteps=False)
+
+
+def test_replay_buffer_z_episode_lengths():
+    env = IdentityEnvBox(10)
+    prior = th.distributions.OneHotCategorical(th.ones(2) / 2)
+    buffer = ReplayBufferZ(10, env.observation_space, env.action_space, prior)
+    obs = np.zeros((1, 1), dtype=np.float32)
+    # Episodes of length 3, 5 and 4 (the first one is partially overwritten)
+    for ep_index, ep_length in enumerate([3, 5, 4]):
+        for _ in range(ep_length):
+            buffer.add(obs, obs, np.zeros((1, 1)), np.zeros(1), np.zeros(1), np.array([1.0, 0.0]), ep_index)
+
+    replay_data = buffer._get_samples(np.arange(10))
+    expected_lengths = {0: 3, 1: 5, 2: 4}
+    for ep_index, ep_length in zip(replay_data.ep_index.flatten(), replay_data.ep_lengths.flatten()):
+        assert ep_length == expected_lengths[int(ep_index)]
+
+
+@pytest.mark.parametrize("obs_dtype", [None, np.float16])
+def test_replay_buffer_obs_dtype(obs_dtype):
+    env = IdentityEnvBox(10)
+    buffer = ReplayBuffer(10, env.observation_space, env.action_space, obs_dtype=obs_dtype)
+    assert buffer.observations.dtype == (np.float32 if obs_dtype is None else obs_dtype)
+    obs = np.full((1, 1), 0.3, dtype=np.float32)
+    for _ in range(5):
+        buffer.add(obs, obs, np.zeros((1, 1)), np.zeros(1), np.zeros(1), [{}])
+    # The stored observations are converted back to float32 when sampling
+    replay_data = buffer.sample(4)
+    assert replay_data.observations.dtype == th.float32
+    assert th.allclose(replay_data.observations, th.tensor(0.3), atol=1e-3)
+
+    # Discrete observations are stored as is
+    env = IdentityEnv(10)
+    buffer = ReplayBuffer(10, env.observation_space, env.action_space, obs_dtype=obs_dtype)
+    assert buffer.observations.dtype == env.observation_space.dtype
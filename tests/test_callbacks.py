@@ -4,8 +4,9 @@ import shutil
 import gym
 import numpy as np
 import pytest
+import torch as th
 
-from stable_baselines3 import A2C, DDPG, DQN, PPO, SAC, TD3, HerReplayBuffer
+from stable_baselines3 import A2C, DDPG, DIAYN, DQN, PPO, SAC, TD3, HerReplayBuffer
 from stable_baselines3.common.callbacks import (
     CallbackList,
     CheckpointCallback,
@@ -16,7 +17,9 @@ from stable_baselines3.common.callbacks import (
 )
 from stable_baselines3.common.env_util import make_vec_env
 from stable_baselines3.common.envs import BitFlippingEnv, IdentityEnv
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.evaluation import evaluate_policy
+from stable_baselines3.common.save_util import load_replay_buffer_chunks
+from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
 
 
 @pytest.mark.parametrize("model_class", [A2C, PPO, SAC, TD3, DQN, DDPG])
@@ -118,6 +121,157 @@ def test_eval_callback_vec_env():
     assert eval_callback.last_mean_reward == 100.0
 
 
+@pytest.mark.parametrize("normalize", [False, True])
+def test_async_eval_callback(tmp_path, normalize):
+    env = make_vec_env("Pendulum-v0", n_envs=1, seed=0)
+    eval_env = make_vec_env("Pendulum-v0", n_envs=2, seed=1)
+    if normalize:
+        env, eval_env = VecNormalize(env), VecNormalize(eval_env, training=False)
+    model = PPO("MlpPolicy", env, n_steps=64, batch_size=32, policy_kwargs=dict(net_arch=[16]), seed=0)
+    eval_callback = EvalCallback(
+        eval_env,
+        n_eval_episodes=2,
+        eval_freq=64,
+        log_path=str(tmp_path),
+        best_model_save_path=str(tmp_path),
+        warn=False,
+        async_eval=True,
+    )
+    model.learn(256, callback=eval_callback)
+    # The evaluation process is stopped at the end of the training
+    assert eval_callback.eval_process is None
+    n_evaluations = len(eval_callback.evaluations_timesteps)
+    # and started again by the next one
+    model.learn(128, callback=eval_callback, reset_num_timesteps=False)
+    assert eval_callback.eval_process is None and len(eval_callback.evaluations_timesteps) > n_evaluations
+    eval_callback.close()
+
+    # All the evaluations are recorded (the last one at the end of the training), with the timesteps of their snapshot
+    assert 2 <= len(eval_callback.evaluations_timesteps) <= 6
+    assert all(timesteps % 64 == 0 for timesteps in eval_callback.evaluations_timesteps)
+    assert all(len(results) == 2 for results in eval_callback.evaluations_results)
+    assert eval_callback.best_mean_reward == max(np.mean(results) for results in eval_callback.evaluations_results)
+    assert os.path.exists(os.path.join(str(tmp_path), "best_model.zip"))
+    assert eval_callback.eval_process is None
+
+
+def test_async_eval_best_model(tmp_path):
+    model = PPO("MlpPolicy", "Pendulum-v0", n_steps=64, batch_size=32, policy_kwargs=dict(net_arch=[16]), seed=0)
+    eval_callback = EvalCallback(
+        make_vec_env("Pendulum-v0", n_envs=1, seed=1),
+        n_eval_episodes=1,
+        best_model_save_path=str(tmp_path),
+        warn=False,
+        async_eval=True,
+    )
+    eval_callback.init_callback(model)
+    model.learn(64)
+    evaluated_weights = {key: value.detach().cpu().clone() for key, value in model.policy.state_dict().items()}
+    eval_callback.pending_eval = (64, evaluated_weights)
+    # Change the live policy after the snapshot
+    with th.no_grad():
+        for param in model.policy.parameters():
+            param.add_(1.0)
+    current_weights = {key: value.clone() for key, value in model.policy.state_dict().items()}
+
+    eval_callback._save_best_model()
+
+    # The live policy is not modified
+    for key, value in model.policy.state_dict().items():
+        assert th.equal(value, current_weights[key])
+    # The saved model holds the evaluated weights
+    best_model = PPO.load(os.path.join(str(tmp_path), "best_model"))
+    assert best_model.num_timesteps == 64
+    for key, value in best_model.policy.state_dict().items():
+        assert th.allclose(value.cpu(), evaluated_weights[key])
+
+
+@pytest.mark.parametrize("async_save", [False, True])
+def test_checkpoint_replay_buffer(tmp_path, async_save):
+    model = SAC("MlpPolicy", "Pendulum-v0", buffer_size=200, learning_starts=50, policy_kwargs=dict(net_arch=[16]), seed=0)
+    checkpoint_callback = CheckpointCallback(
+        save_freq=90,
+        save_path=str(tmp_path),
+        save_replay_buffer=True,
+        async_save=async_save,
+        file_format="stream",
+        buffer_chunk_size=16,
+    )
+    # The buffer wraps around between the checkpoints, the last one is done before storing the last transition
+    model.learn(450, callback=checkpoint_callback)
+    assert checkpoint_callback.executor is None
+    assert os.path.exists(tmp_path / "rl_model_450_steps.sb3")
+
+    buffer = load_replay_buffer_chunks(tmp_path / "rl_model_replay_buffer")
+    assert buffer.pos == model.replay_buffer.pos - 1 and buffer.full
+    for name, array in model.replay_buffer._storage_arrays().items():
+        saved_rows = np.arange(len(array)) != buffer.pos
+        assert np.array_equal(buffer._storage_arrays()[name][saved_rows], array[saved_rows])
+    model = SAC.load(tmp_path / "rl_model_450_steps.sb3", env=model.get_env())
+    model.replay_buffer = buffer
+    model.learn(50, reset_num_timesteps=False)
+
+
+@pytest.mark.parametrize("async_save", [False, True])
+def test_checkpoint_episode_lengths(tmp_path, async_save):
+    # Short episodes: the episode lengths are not in the chunks of the rows written since the previous save
+    env = gym.wrappers.TimeLimit(gym.make("Pendulum-v0"), max_episode_steps=10)
+    prior = th.distributions.OneHotCategorical(th.ones(3) / 3)
+    model = DIAYN("MlpPolicy", env, prior, buffer_size=1000, learning_starts=50, policy_kwargs=dict(net_arch=[16]))
+    checkpoint_callback = CheckpointCallback(
+        save_freq=30, save_path=str(tmp_path), save_replay_buffer=True, async_save=async_save, buffer_chunk_size=16
+    )
+    # Episode lengths at the time of the last checkpoint
+    saved_ep_lengths = []
+    save_checkpoint = checkpoint_callback._save_checkpoint
+
+    def spy_save_checkpoint(path):
+        save_checkpoint(path)
+        buffer = model.replay_buffer
+        saved_ep_lengths.append((buffer.ep_lengths.copy(), buffer.ep_lengths_index.copy()))
+
+    checkpoint_callback._save_checkpoint = spy_save_checkpoint
+    model.learn(300, callback=checkpoint_callback)
+
+    buffer = load_replay_buffer_chunks(tmp_path / "rl_model_replay_buffer")
+    ep_lengths, ep_lengths_index = saved_ep_lengths[-1]
+    assert np.array_equal(buffer.ep_lengths, ep_lengths)
+    assert np.array_equal(buffer.ep_lengths_index, ep_lengths_index)
+    # Every stored transition has the length of its episode
+    assert np.all(buffer.ep_lengths[buffer.ep_index[: buffer.pos] % buffer.buffer_size] > 0)
+
+
+def test_checkpoint_her_replay_buffer(tmp_path):
+    model = DQN(
+        "MultiInputPolicy",
+        BitFlippingEnv(n_bits=2),
+        replay_buffer_class=HerReplayBuffer,
+        replay_buffer_kwargs=dict(max_episode_length=2),
+        learning_starts=50,
+        policy_kwargs=dict(net_arch=[16]),
+        seed=0,
+    )
+    checkpoint_callback = CheckpointCallback(
+        save_freq=25, save_path=str(tmp_path), save_replay_buffer=True, buffer_chunk_size=8
+    )
+    model.learn(100, callback=checkpoint_callback)
+
+    # The last transition can end an episode after the last checkpoint
+    buffer = load_replay_buffer_chunks(tmp_path / "rl_model_replay_buffer")
+    assert 0 <= model.replay_buffer.pos - buffer.pos <= 1
+    for key, array in model.replay_buffer._buffer.items():
+        assert np.array_equal(buffer._buffer[key][: buffer.pos], array[: buffer.pos])
+
+
+def test_evaluate_policy_episode_split():
+    """The episodes are spread evenly across the envs, extra episodes are not counted"""
+    env = make_vec_env(IdentityEnv, n_envs=3, env_kwargs=dict(dim=2, ep_length=4))
+    model = A2C("MlpPolicy", env, seed=0)
+    episode_rewards, episode_lengths = evaluate_policy(model, env, n_eval_episodes=7, return_episode_rewards=True)
+    assert len(episode_rewards) == len(episode_lengths) == 7
+    assert all(length == 4 for length in episode_lengths)
+
+
 def test_eval_success_logging(tmp_path):
     n_bits = 2
     n_envs = 2
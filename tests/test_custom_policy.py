@@ -2,6 +2,7 @@ import pytest
 import torch as th
 
 from stable_baselines3 import A2C, DQN, PPO, SAC, TD3
+from stable_baselines3.common.policies import VectorizedContinuousCritic
 from stable_baselines3.common.sb2_compat.rmsprop_tf_like import RMSpropTFLike
 
 
@@ -49,3 +50,38 @@ def test_tf_like_rmsprop_optimizer():
 def test_dqn_custom_policy():
     policy_kwargs = dict(optimizer_class=RMSpropTFLike, net_arch=[32])
     _ = DQN("MlpPolicy", "CartPole-v1", policy_kwargs=policy_kwargs, learning_starts=100).learn(300)
+
+
+@pytest.mark.parametrize("net_arch", [[], [8, 4]])
+def test_vectorized_critic_conversion(net_arch):
+    model = SAC("MlpPolicy", "Pendulum-v0", policy_kwargs=dict(net_arch=net_arch, n_critics=3))
+    vectorized_model = SAC(
+        "MlpPolicy", "Pendulum-v0", policy_kwargs=dict(net_arch=net_arch, n_critics=3, vectorized_critic=True)
+    )
+    assert isinstance(vectorized_model.critic, VectorizedContinuousCritic)
+    # Checkpoints of the per-critic layout are converted
+    vectorized_model.policy.load_state_dict(model.policy.state_dict())
+
+    obs = th.randn(5, 3)
+    actions = th.rand(5, 1)
+    with th.no_grad():
+        for q_values, vectorized_q_values in zip(model.critic(obs, actions), vectorized_model.critic(obs, actions)):
+            assert vectorized_q_values.shape == (5, 1)
+            assert th.allclose(q_values, vectorized_q_values, atol=1e-6)
+        assert th.allclose(model.critic.q1_forward(obs, actions), vectorized_model.critic.q1_forward(obs, actions), atol=1e-6)
+
+    with pytest.raises(AssertionError):
+        SAC("MlpPolicy", "Pendulum-v0", policy_kwargs=dict(n_critics=2, vectorized_critic=True)).policy.load_state_dict(
+            model.policy.state_dict()
+        )
+
+
+@pytest.mark.parametrize("model_class", [SAC, TD3])
+def test_vectorized_critic(model_class, tmp_path):
+    policy_kwargs = dict(net_arch=[16], n_critics=10, vectorized_critic=True)
+    model = model_class("MlpPolicy", "Pendulum-v0", policy_kwargs=policy_kwargs, learning_starts=100)
+    model.learn(300)
+    model.save(tmp_path / "model.zip")
+    loaded_model = model_class.load(tmp_path / "model.zip")
+    assert isinstance(loaded_model.critic, VectorizedContinuousCritic)
+    assert loaded_model.critic.q_ensemble[0].weight.shape == (10, 4, 16)
@@ -0,0 +1,166 @@
+import gym
+import numpy as np
+import pytest
+import torch as th
+
+from stable_baselines3 import DIAYN
+from stable_baselines3.common.behaviour_functions import GatherDescriptor
+from stable_baselines3.common.exp_utils import DiscriminatorFunction
+from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+
+N_SKILLS = 3
+
+
+def make_model(policy_kwargs=None, **kwargs):
+    prior = th.distributions.OneHotCategorical(th.ones(N_SKILLS) / N_SKILLS)
+    return DIAYN(
+        "MlpPolicy",
+        gym.make("Pendulum-v0"),
+        prior,
+        learning_starts=50,
+        batch_size=16,
+        policy_kwargs=dict(net_arch=[16]) if policy_kwargs is None else policy_kwargs,
+        verbose=0,
+        seed=0,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("v1", [True, False])
+@pytest.mark.parametrize("batched_gradient_steps", [1, 3])
+def test_batched_gradient_steps(v1, batched_gradient_steps):
+    model = make_model(v1=v1, gradient_steps=4, batched_gradient_steps=batched_gradient_steps)
+    model.learn(250)
+    assert model._n_updates == 4 * (250 - 50)
+
+    # The minibatches are sampled by groups of `batched_gradient_steps`, and split in `batch_size` chunks
+    sample_sizes = []
+    sampled = []
+    sample = model.replay_buffer.sample
+
+    def spy_sample(batch_size, env=None):
+        sample_sizes.append(batch_size)
+        sampled.append(sample(batch_size, env=env))
+        return sampled[-1]
+
+    model.replay_buffer.sample = spy_sample
+    minibatches = list(model._sample_minibatches(5, 16))
+    n_full, remainder = divmod(5, batched_gradient_steps)
+    assert sample_sizes == [16 * batched_gradient_steps] * n_full + ([16 * remainder] if remainder else [])
+    assert len(minibatches) == 5
+    for idx, minibatch in enumerate(minibatches):
+        replay_data = sampled[idx // batched_gradient_steps]
+        offset = (idx % batched_gradient_steps) * 16
+        for data, batch_data in zip(replay_data, minibatch):
+            assert th.equal(batch_data, data[offset : offset + 16])
+    del model.replay_buffer.sample
+
+    # The deferred reductions log the mean of the per gradient step values
+    disc_losses, critic_losses, ent_coefs = [], [], []
+    disc_loss, critic_loss = model.discriminator.loss, model._critic_loss
+    zero_grad = model.ent_coef_optimizer.zero_grad
+
+    def spy_disc_loss(*args, **kwargs):
+        loss = disc_loss(*args, **kwargs)
+        disc_losses.append(loss.item())
+        return loss
+
+    def spy_critic_loss(*args, **kwargs):
+        loss = critic_loss(*args, **kwargs)
+        critic_losses.append(loss.item())
+        return loss
+
+    def spy_zero_grad(*args, **kwargs):
+        # Called before the entropy coefficient is updated
+        ent_coefs.append(th.exp(model.log_ent_coef.detach()).item())
+        return zero_grad(*args, **kwargs)
+
+    model.discriminator.loss = spy_disc_loss
+    model._critic_loss = spy_critic_loss
+    model.ent_coef_optimizer.zero_grad = spy_zero_grad
+    model.train(gradient_steps=5, batch_size=16)
+    logged_values = model.logger.name_to_value
+    assert len(disc_losses) == len(critic_losses) == len(ent_coefs) == 5
+    assert np.isclose(logged_values["train/discriminator_loss"], np.mean(disc_losses))
+    assert np.isclose(logged_values["train/critic_loss"], np.mean(critic_losses))
+    assert np.isclose(logged_values["train/ent_coef"], np.mean(ent_coefs))
+
+
+def test_combined_rewards():
+    model = make_model(combined_rewards=True, beta=0.5, smerl=-100, batched_gradient_steps=2)
+    model.learn(250)
+
+
+def test_mean_reward():
+    model = make_model(combined_rewards=True, beta=0.5, smerl=-100, mean_reward=True)
+    model.learn(250)
+    assert not hasattr(model, "len_episodes")
+
+
+@pytest.mark.parametrize("v1", [True, False])
+@pytest.mark.parametrize("device", [None, "cpu"])
+def test_cache_disc_obs(v1, device):
+    disc_on = DiscriminatorFunction(GatherDescriptor([0, 2]), "cos_velocity", 2, function_kwargs={}, device=device)
+    model = make_model(v1=v1, disc_on=disc_on, cache_disc_obs=True)
+    model.learn(150)
+
+    # The descriptor of the stored observations is precomputed
+    buffer = model.replay_buffer
+    assert buffer.disc_obs.shape == (buffer.buffer_size, 1, 2)
+    observations = buffer.observations[: buffer.pos, 0]
+    assert np.allclose(buffer.disc_obs[: buffer.pos, 0], observations[:, [0, 2]])
+
+
+def test_cache_disc_obs_tuple_shape():
+    # With a behaviour descriptor, the observation shape of the discriminator is already a tuple
+    model = make_model(cache_disc_obs=True, _init_setup_model=False)
+    model.disc_obs_space_shape = (3,)
+    model._setup_model()
+    model.learn(100)
+    buffer = model.replay_buffer
+    assert buffer.disc_obs.shape == (buffer.buffer_size, 1, 3)
+    assert np.allclose(buffer.disc_obs[: buffer.pos], buffer.observations[: buffer.pos])
+
+
+def test_cache_disc_obs_vec_normalize():
+    prior = th.distributions.OneHotCategorical(th.ones(N_SKILLS) / N_SKILLS)
+    env = VecNormalize(DummyVecEnv([lambda: gym.make("Pendulum-v0")]))
+    # The cached output would be computed from the unnormalized observations
+    model = DIAYN("MlpPolicy", env, prior, learning_starts=50, cache_disc_obs=True, disc_on=[0, 2])
+    with pytest.raises(AssertionError):
+        model.learn(100)
+
+
+def test_discriminator_function_device():
+    disc_on = DiscriminatorFunction(GatherDescriptor([1]), "sin", 1, device="cpu")
+    obs = np.arange(6, dtype=np.float32).reshape(2, 3)
+    assert isinstance(disc_on(obs), np.ndarray)
+    assert np.allclose(disc_on(obs), [[1], [4]])
+    assert th.allclose(disc_on(th.as_tensor(obs)), th.tensor([[1.0], [4.0]]))
+
+
+def test_vectorized_critic():
+    model = make_model(policy_kwargs=dict(net_arch=[16], n_critics=4, vectorized_critic=True))
+    model.learn(150)
+    assert model.critic.q_ensemble[0].weight.shape[0] == 4
+
+
+@pytest.mark.skipif(not hasattr(th, "autocast"), reason="torch.autocast requires PyTorch >= 1.10")
+def test_mixed_precision():
+    model = make_model(mixed_precision=True, replay_buffer_kwargs=dict(obs_dtype=np.float16))
+    model.learn(150)
+    assert model.replay_buffer.observations.dtype == np.float16
+    assert all(param.dtype == th.float32 for param in model.discriminator.parameters())
+
+
+def test_save_load_replay_buffer_chunks(tmp_path):
+    model = make_model(buffer_size=100)
+    model.learn(150)
+    old_replay_buffer = model.replay_buffer
+    model.save_replay_buffer(tmp_path / "replay_buffer", file_format="chunks", chunk_size=32, compression="zlib")
+    model.load_replay_buffer(tmp_path / "replay_buffer")
+    assert model.replay_buffer.full and model.replay_buffer.pos == old_replay_buffer.pos
+    assert th.equal(model.replay_buffer.prior.probs, old_replay_buffer.prior.probs)
+    for name, array in old_replay_buffer._storage_arrays().items():
+        assert np.array_equal(model.replay_buffer._storage_arrays()[name], array)
+    model.learn(50)
@@ -13,6 +13,7 @@ from stable_baselines3.common.distributions import (
     StateDependentNoiseDistribution,
     TanhBijector,
     kl_divergence,
+    squashed_diag_gaussian_log_prob_from_params,
 )
 from stable_baselines3.common.utils import set_random_seed
 
@@ -51,6 +52,41 @@ def test_squashed_gaussian(model_class):
     assert th.max(th.abs(actions)) <= 1.0
 
 
+def test_squashed_gaussian_log_prob_fast_path():
+    mean_actions = th.randn(1000, N_ACTIONS) * 0.5
+    log_std = th.rand(1000, N_ACTIONS) - 1.0
+    dist = SquashedDiagGaussianDistribution(N_ACTIONS)
+
+    # Reference: through the torch.distributions.Normal object and the epsilon-corrected log probability
+    set_random_seed(1)
+    actions = dist.actions_from_params(mean_actions, log_std)
+    log_prob = dist.log_prob(actions, dist.gaussian_actions)
+
+    set_random_seed(1)
+    fast_actions, fast_log_prob = SquashedDiagGaussianDistribution(N_ACTIONS).stateless_log_prob_from_params(
+        mean_actions, log_std
+    )
+    assert th.allclose(actions, fast_actions)
+    assert th.allclose(log_prob, fast_log_prob, atol=1e-3)
+
+    # log_prob_from_params() still updates the distribution
+    set_random_seed(1)
+    actions, log_prob = dist.log_prob_from_params(mean_actions * 2, log_std)
+    assert th.allclose(th.tanh(dist.gaussian_actions), actions)
+    assert th.allclose(dist.mode(), th.tanh(mean_actions * 2))
+
+    # Deterministic actions are the squashed mean
+    det_actions, det_log_prob = squashed_diag_gaussian_log_prob_from_params(mean_actions, log_std, deterministic=True)
+    assert th.allclose(det_actions, th.tanh(mean_actions))
+    assert th.allclose(det_log_prob, dist.proba_distribution(mean_actions, log_std).log_prob(det_actions), atol=1e-3)
+
+    # The softplus form of the squash correction remains finite for saturated actions
+    mean_actions = (th.ones(10, N_ACTIONS) * 20.0).requires_grad_()
+    actions, log_prob = squashed_diag_gaussian_log_prob_from_params(mean_actions, th.zeros(10, N_ACTIONS))
+    log_prob.sum().backward()
+    assert th.isfinite(log_prob).all() and th.isfinite(mean_actions.grad).all()
+
+
 def test_sde_distribution():
     n_actions = 1
     deterministic_actions = th.ones(N_SAMPLES, n_actions) * 0.1
@@ -1,7 +1,9 @@
+import gc
 import os
 from typing import Sequence
 
 import numpy as np
+import pandas
 import pytest
 import torch as th
 from matplotlib import pyplot as plt
@@ -16,12 +18,15 @@ from stable_baselines3.common.logger import (
     FormatUnsupportedError,
     HumanOutputFormat,
     Image,
+    KVWriter,
+    Logger,
     TensorBoardOutputFormat,
     Video,
     configure,
     make_output_format,
     read_csv,
     read_json,
+    read_tidy_csv,
 )
 
 KEY_VALUES = {
@@ -60,9 +65,9 @@ class LogContent:
 @pytest.fixture
 def read_log(tmp_path, capsys):
     def read_fn(_format):
-        if _format == "csv":
+        if _format in ["csv", "tidy_csv"]:
             try:
-                df = read_csv(tmp_path / "progress.csv")
+                df = read_csv(tmp_path / "progress.csv") if _format == "csv" else read_tidy_csv(tmp_path / "progress.tidy.csv")
             except EmptyDataError:
                 return LogContent(_format, [])
             return LogContent(_format, [r for _, r in df.iterrows() if not r.empty])
@@ -173,7 +178,7 @@ def test_main(tmp_path):
     logger.error("oh")
 
 
-@pytest.mark.parametrize("_format", ["stdout", "log", "json", "csv", "tensorboard"])
+@pytest.mark.parametrize("_format", ["stdout", "log", "json", "csv", "tidy_csv", "tensorboard"])
 def test_make_output(tmp_path, read_log, _format):
     """
     test make output
@@ -198,7 +203,7 @@ def test_make_output_fail(tmp_path):
         make_output_format("dummy_format", tmp_path)
 
 
-@pytest.mark.parametrize("_format", ["stdout", "log", "json", "csv", "tensorboard"])
+@pytest.mark.parametrize("_format", ["stdout", "log", "json", "csv", "tidy_csv", "tensorboard"])
 @pytest.mark.filterwarnings("ignore:Tried to write empty key-value dict")
 def test_exclude_keys(tmp_path, read_log, _format):
     if _format == "tensorboard":
@@ -290,3 +295,92 @@ def test_report_figure_to_unsupported_format_raises_error(tmp_path, unsupported_
         writer.write({"figure": figure}, key_excluded={"figure": ()})
     assert unsupported_format in str(exec_info.value)
     writer.close()
+
+
+def test_queued_logger(tmp_path):
+    logger = configure(str(tmp_path), ["log", "csv", "json"], queue_size=2)
+    for step in range(10):
+        logger.record("step", step)
+        if step % 3 == 0:
+            logger.record(f"skill_{step}", -step)
+        logger.dump(step=step)
+        logger.info(f"after dump {step}")
+    logger.flush()
+    log_lines = (tmp_path / "log.txt").read_text().splitlines()
+    # The logs and the dumps are written in order
+    skill_6_line = next(idx for idx, line in enumerate(log_lines) if "skill_6" in line)
+    assert log_lines.index("after dump 3") < skill_6_line < log_lines.index("after dump 6")
+    logger.record("step", 10)
+    logger.dump(step=10)
+    logger.close()
+
+    for data in [read_csv(tmp_path / "progress.csv"), read_json(tmp_path / "progress.json")]:
+        assert list(data["step"]) == list(range(11))
+        assert data["skill_6"][6] == -6 and np.isnan(data["skill_6"][5])
+
+
+def test_queued_logger_error(tmp_path):
+    logger = configure(str(tmp_path), ["csv"], queue_size=1)
+    logger.record("video", Video(frames=th.rand(1, 20, 3, 16, 16), fps=20))
+    # The error is raised by the background thread, and re-raised by the logger
+    logger.dump()
+    with pytest.raises(FormatUnsupportedError):
+        logger.flush()
+    logger.record("a", 1)
+    logger.dump()
+    logger.close()
+    assert list(read_csv(tmp_path / "progress.csv")["a"]) == [1]
+
+
+class FailingOutputFormat(KVWriter):
+    def write(self, key_values, key_excluded, step=0):
+        raise ValueError("Cannot write")
+
+    def close(self):
+        pass
+
+
+def test_queued_logger_failing_format(tmp_path):
+    logger = Logger(str(tmp_path), [FailingOutputFormat(), make_output_format("csv", tmp_path)], queue_size=1)
+    logger.record("step", 0)
+    logger.dump(step=0)
+    with pytest.raises(ValueError):
+        logger.flush()
+    # The error of the first format does not prevent the csv format from writing the row
+    logger.close()
+    assert list(read_csv(tmp_path / "progress.csv")["step"]) == [0]
+
+
+def test_queued_logger_garbage_collected(tmp_path):
+    logger = configure(str(tmp_path), ["csv"], queue_size=2)
+    logger.record("a", 1)
+    logger.dump()
+    thread = logger._thread
+    del logger
+    gc.collect()
+    # The background thread is stopped after writing the queue
+    assert not thread.is_alive()
+    assert list(read_csv(tmp_path / "progress.csv")["a"]) == [1]
+
+
+def test_tidy_csv(tmp_path):
+    csv_writer = make_output_format("csv", tmp_path)
+    tidy_writer = make_output_format("tidy_csv", tmp_path)
+    key_values = [
+        {"step": 0, "text": 'a "quoted", text', "flag": True},
+        {"step": 1, "text": "", "skill_0": 0.5, "flag": False},
+        {"step": 2, "skill_0": -1.5, "skill_1": 3, "flag": True, "array": np.array([1, 2])},
+        {},
+        {"step": 4, "skill_1": None},
+    ]
+    for step_values in key_values:
+        for writer in [csv_writer, tidy_writer]:
+            writer.write(step_values, {key: None for key in step_values})
+    csv_writer.close()
+    tidy_writer.close()
+
+    expected = read_csv(tmp_path / "progress.csv").drop(columns="array")
+    data = read_tidy_csv(tmp_path / "progress.tidy.csv")
+    assert data["array"][2] == "[1 2]"
+    data = data.drop(columns="array")[expected.columns]
+    pandas.testing.assert_frame_equal(data, expected)
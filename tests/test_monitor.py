@@ -3,9 +3,11 @@ import os
 import uuid
 
 import gym
+import numpy as np
 import pandas
+import pytest
 
-from stable_baselines3.common.monitor import Monitor, get_monitor_files, load_results
+from stable_baselines3.common.monitor import Monitor, get_monitor_files, load_results, read_binary_monitor_file
 
 
 def test_monitor(tmp_path):
@@ -97,3 +99,89 @@ def test_monitor_load_results(tmp_path):
 
     os.remove(monitor_file1)
     os.remove(monitor_file2)
+
+
+def _run_episodes(monitor_env, n_steps):
+    monitor_env.reset()
+    for _ in range(n_steps):
+        _, _, done, _ = monitor_env.step(monitor_env.action_space.sample())
+        if done:
+            monitor_env.reset()
+
+
+def test_monitor_buffered(tmp_path):
+    """
+    The episodes are written by batches of ``buffer_size`` and when the monitor is closed
+    """
+    monitor_file = os.path.join(str(tmp_path), "buffered.monitor.csv")
+    env = gym.make("CartPole-v1")
+    env.seed(0)
+    monitor_env = Monitor(env, monitor_file, results_writer_kwargs=dict(buffer_size=5))
+    _run_episodes(monitor_env, 1000)
+    n_episodes = len(monitor_env.get_episode_rewards())
+    assert n_episodes > 5
+
+    assert len(load_results(str(tmp_path))) == n_episodes - n_episodes % 5
+    monitor_env.close()
+    results = load_results(str(tmp_path))
+    assert len(results) == n_episodes
+    assert np.allclose(results["r"], monitor_env.get_episode_rewards())
+    assert np.array_equal(results["l"], monitor_env.get_episode_lengths())
+
+
+def test_monitor_binary(tmp_path):
+    monitor_file = os.path.join(str(tmp_path), "binary")
+    env = gym.make("CartPole-v1")
+    env.seed(0)
+    monitor_env = Monitor(
+        env, monitor_file, info_keywords=("extra",), results_writer_kwargs=dict(file_format="binary", buffer_size=3)
+    )
+    monitor_env.env.step = _add_info(monitor_env.env.step)
+    _run_episodes(monitor_env, 500)
+    monitor_env.close()
+
+    header, records = read_binary_monitor_file(monitor_file + "." + Monitor.BINARY_EXT)
+    assert header["env_id"] == "CartPole-v1"
+    assert records.dtype.names == ("r", "l", "t", "extra")
+    assert np.allclose(records["r"], monitor_env.get_episode_rewards())
+    assert np.array_equal(records["l"], monitor_env.get_episode_lengths())
+    assert np.all(records["extra"] == 1.0)
+    assert len(load_results(str(tmp_path))) == len(records)
+
+
+def _add_info(step):
+    def step_with_info(action):
+        observation, reward, done, info = step(action)
+        info["extra"] = 1.0
+        return observation, reward, done, info
+
+    return step_with_info
+
+
+@pytest.mark.parametrize("n_files", [1, 4])
+def test_load_results_matches_per_file(tmp_path, n_files):
+    """
+    The csv files are parsed at once, the result must match the per-file parsing
+    """
+    for i in range(n_files):
+        env = gym.make("CartPole-v1")
+        env.seed(i)
+        monitor_env = Monitor(env, os.path.join(str(tmp_path), f"{i}.monitor.csv"))
+        _run_episodes(monitor_env, 300)
+        monitor_env.close()
+
+    data_frames, t_starts = [], []
+    for file_name in get_monitor_files(str(tmp_path)):
+        with open(file_name, "rt") as file_handler:
+            header = json.loads(file_handler.readline()[1:])
+            data_frame = pandas.read_csv(file_handler, index_col=None)
+        data_frame["t"] += header["t_start"]
+        t_starts.append(header["t_start"])
+        data_frames.append(data_frame)
+    expected = pandas.concat(data_frames).sort_values("t")
+    expected["t"] -= min(t_starts)
+
+    results = load_results(str(tmp_path))
+    assert len(results) == len(expected)
+    for key in ("r", "l", "t"):
+        assert np.allclose(results[key], expected[key])
@@ -1,8 +1,10 @@
 import numpy as np
 import pytest
+import torch as th
 
 from stable_baselines3 import A2C, DDPG, DQN, PPO, SAC, TD3
 from stable_baselines3.common.noise import NormalActionNoise, OrnsteinUhlenbeckActionNoise
+from stable_baselines3.common.utils import CompiledFunction
 
 normal_action_noise = NormalActionNoise(np.zeros(1), 0.1 * np.ones(1))
 
@@ -139,3 +141,72 @@ def test_train_freq_fail(train_freq):
             train_freq=train_freq,
         )
         model.learn(total_timesteps=250)
+
+
+@pytest.mark.parametrize("model_class", [A2C, PPO, SAC, TD3])
+def test_compile(model_class, tmp_path):
+    kwargs = dict(n_steps=32) if model_class in {A2C, PPO} else dict(learning_starts=50)
+    env_id = "CartPole-v1" if model_class in {A2C, PPO} else "Pendulum-v0"
+    # The eager backend of torch.compile() avoids the code generation in the tests
+    model = model_class(
+        "MlpPolicy", env_id, policy_kwargs=dict(net_arch=[16]), compile=True, compile_kwargs=dict(backend="eager"), **kwargs
+    )
+    model.learn(100)
+    assert model.compile_mode == "compile"
+    assert all(compiled_function._compiled_function is not None for compiled_function in model.compiled_functions)
+
+    # Compiled functions are not saved, they are compiled again when learning
+    model.save(tmp_path / "model.zip")
+    model = model_class.load(tmp_path / "model.zip", env=model.get_env())
+    assert model.compile and model.compiled_functions is None
+    model.learn(50, reset_num_timesteps=False)
+    assert model.compile_mode == "compile"
+
+
+def test_compile_fallback():
+    model = SAC("MlpPolicy", "Pendulum-v0", learning_starts=50, compile=True, compile_kwargs=dict(backend="unknown_backend"))
+    with pytest.warns(UserWarning, match="falling back to eager mode"):
+        model.learn(100)
+    assert model.compile_mode == "eager"
+    assert all(compiled_function.failed for compiled_function in model.compiled_functions)
+
+
+def test_compiled_function_error():
+    def function(tensor):
+        raise ValueError("Invalid input")
+
+    compiled_function = CompiledFunction(function, backend="eager")
+    # The errors raised by the function are not compilation failures
+    with pytest.raises(ValueError, match="Invalid input"):
+        compiled_function(th.ones(2))
+    assert not compiled_function.failed
+
+
+@pytest.mark.skipif(not hasattr(th, "autocast"), reason="torch.autocast requires PyTorch >= 1.10")
+@pytest.mark.parametrize("model_class", [SAC, TD3])
+def test_mixed_precision(model_class, tmp_path):
+    model = model_class(
+        "MlpPolicy",
+        "Pendulum-v0",
+        policy_kwargs=dict(net_arch=[16]),
+        replay_buffer_kwargs=dict(obs_dtype=np.float16),
+        learning_starts=50,
+        mixed_precision=True,
+    )
+    model.learn(100)
+    assert model.replay_buffer.observations.dtype == np.float16
+    # The weights are kept in full precision
+    assert all(param.dtype == th.float32 for param in model.policy.parameters())
+    action, _ = model.predict(model.get_env().reset())
+    assert action.dtype == np.float32
+
+    model.save(tmp_path / "model.zip")
+    model = model_class.load(tmp_path / "model.zip", env=model.get_env())
+    assert model.mixed_precision and model.autocast_functions is None
+    model.learn(50, reset_num_timesteps=False)
+
+
+def test_mixed_precision_unavailable(monkeypatch):
+    monkeypatch.delattr(th, "autocast", raising=False)
+    with pytest.raises(AssertionError):
+        SAC("MlpPolicy", "Pendulum-v0", mixed_precision=True)
@@ -10,10 +10,17 @@ import numpy as np
 import pytest
 import torch as th
 
-from stable_baselines3 import A2C, DDPG, DQN, PPO, SAC, TD3
+from stable_baselines3 import A2C, DDPG, DQN, PPO, SAC, TD3, HerReplayBuffer
 from stable_baselines3.common.base_class import BaseAlgorithm
-from stable_baselines3.common.envs import FakeImageEnv, IdentityEnv, IdentityEnvBox
-from stable_baselines3.common.save_util import load_from_pkl, open_path, save_to_pkl
+from stable_baselines3.common.envs import BitFlippingEnv, FakeImageEnv, IdentityEnv, IdentityEnvBox
+from stable_baselines3.common.save_util import (
+    is_stream_file,
+    load_from_pkl,
+    load_from_stream_file,
+    open_path,
+    save_to_pkl,
+    save_to_stream_file,
+)
 from stable_baselines3.common.utils import get_device
 from stable_baselines3.common.vec_env import DummyVecEnv
 
@@ -322,6 +329,45 @@ def test_save_load_replay_buffer(tmp_path, model_class):
     )
 
 
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+@pytest.mark.parametrize("n_threads", [1, 2])
+def test_save_load_replay_buffer_chunks(tmp_path, compression, n_threads):
+    model = SAC("MlpPolicy", "Pendulum-v0", buffer_size=1000, policy_kwargs=dict(net_arch=[16]), learning_starts=200)
+    model.learn(300)
+    path = tmp_path / "replay_buffer"
+    model.save_replay_buffer(path, file_format="chunks", chunk_size=64, compression=compression, n_threads=n_threads)
+    # Only the filled rows are saved
+    assert len(list(path.glob("observations.*"))) == 5
+
+    old_replay_buffer = model.replay_buffer
+    model.load_replay_buffer(path, n_threads=n_threads)
+    assert model.replay_buffer is not old_replay_buffer and model.replay_buffer.pos == old_replay_buffer.pos
+    for name, array in old_replay_buffer._storage_arrays().items():
+        assert np.array_equal(model.replay_buffer._storage_arrays()[name], array)
+    model.learn(100)
+
+
+def test_save_load_her_replay_buffer_chunks(tmp_path):
+    env = BitFlippingEnv(n_bits=2)
+    model = DQN(
+        "MultiInputPolicy",
+        env,
+        replay_buffer_class=HerReplayBuffer,
+        replay_buffer_kwargs=dict(max_episode_length=2),
+        learning_starts=50,
+        policy_kwargs=dict(net_arch=[16]),
+        seed=0,
+    )
+    model.learn(100)
+    old_replay_buffer = model.replay_buffer
+    model.save_replay_buffer(tmp_path / "replay_buffer", file_format="chunks", chunk_size=16, compression="zlib")
+    model.load_replay_buffer(tmp_path / "replay_buffer", truncate_last_traj=False)
+    assert model.replay_buffer.n_episodes_stored == old_replay_buffer.n_episodes_stored
+    for key, array in old_replay_buffer._buffer.items():
+        assert np.array_equal(model.replay_buffer._buffer[key], array)
+    model.learn(50)
+
+
 @pytest.mark.parametrize("model_class", [DQN, SAC, TD3])
 @pytest.mark.parametrize("optimize_memory_usage", [False, True])
 def test_warn_buffer(recwarn, model_class, optimize_memory_usage):
@@ -621,3 +667,56 @@ def test_open_file(tmp_path):
     with pytest.raises(ValueError):
         buff.close()
         open_path(buff, "w")
+
+
+@pytest.mark.parametrize("model_class", [PPO, SAC, DQN])
+@pytest.mark.parametrize("load_kwargs", [{}, dict(mmap=True), dict(n_threads=2)])
+def test_save_load_stream(tmp_path, model_class, load_kwargs):
+    model = model_class("MlpPolicy", select_env(model_class), policy_kwargs=dict(net_arch=[16]), seed=0)
+    model.learn(300)
+    observations = np.stack([model.env.observation_space.sample() for _ in range(10)])
+    actions, _ = model.predict(observations, deterministic=True)
+    params = model.get_parameters()
+
+    model.save(tmp_path / "model", file_format="stream")
+    assert is_stream_file(tmp_path / "model") and is_stream_file(tmp_path / "model.sb3")
+    model = model_class.load(tmp_path / "model", env=model.get_env(), **load_kwargs)
+    assert np.allclose(actions, model.predict(observations, deterministic=True)[0])
+    for name, state_dict in model.get_parameters().items():
+        if name == "policy":
+            assert all(th.equal(param, params[name][key]) for key, param in state_dict.items())
+        else:
+            # Optimizers
+            assert state_dict["param_groups"] == params[name]["param_groups"]
+            assert state_dict["state"].keys() == params[name]["state"].keys()
+    model.learn(100)
+
+    # Only the policy is needed for inference
+    model.save(tmp_path / "model.zip")
+    model = model_class.load(tmp_path / "model.zip", params_to_load=["policy"])
+    assert np.allclose(actions, model.predict(observations, deterministic=True)[0])
+
+
+def test_stream_file_structures(tmp_path):
+    params = {
+        "module": th.nn.Sequential(th.nn.Linear(3, 2), th.nn.BatchNorm1d(2)).state_dict(),
+        "other": {0: (th.zeros(0), th.ones(2, dtype=th.bfloat16)), ":key": [1.5, None, "str"], "obj": np.float32(1.0)},
+    }
+    save_to_stream_file(tmp_path / "file.sb3", data={"value": 1}, params=params, pytorch_variables={"var": th.tensor(2.0)})
+    assert not is_stream_file(tmp_path / "other.sb3")
+
+    data, loaded_params, pytorch_variables = load_from_stream_file(tmp_path / "file.sb3", device="cpu")
+    assert data == {"value": 1}
+    assert th.equal(pytorch_variables["var"], th.tensor(2.0))
+    assert loaded_params["module"].keys() == params["module"].keys()
+    assert loaded_params["module"]._metadata == params["module"]._metadata
+    assert all(th.equal(loaded_params["module"][key], value) for key, value in params["module"].items())
+    empty, bf16 = loaded_params["other"][0]
+    assert empty.shape == (0,) and th.equal(bf16, params["other"][0][1])
+    assert loaded_params["other"][":key"] == [1.5, None, "str"] and loaded_params["other"]["obj"] == np.float32(1.0)
+
+    # Only the selected state_dicts are loaded
+    data, loaded_params, pytorch_variables = load_from_stream_file(
+        tmp_path / "file.sb3", load_data=False, params_to_load=["module"], mmap=True
+    )
+    assert data is None and pytorch_variables is None and list(loaded_params) == ["module"]
@@ -321,7 +321,11 @@ def test_vec_noise():
     assert len(vec.noises) == num_envs
 
 
-def test_polyak():
+@pytest.mark.parametrize("foreach_ops", [(), ("_foreach_lerp_",), ("_foreach_lerp_", "_foreach_mul_")])
+def test_polyak(monkeypatch, foreach_ops):
+    # Fallbacks for the versions of PyTorch without these multi-tensor operations
+    for name in foreach_ops:
+        monkeypatch.delattr(th, name, raising=False)
     param1, param2 = th.nn.Parameter(th.ones((5, 5))), th.nn.Parameter(th.zeros((5, 5)))
     target1, target2 = th.nn.Parameter(th.ones((5, 5))), th.nn.Parameter(th.zeros((5, 5)))
     tau = 0.1
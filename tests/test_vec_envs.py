@@ -1,17 +1,33 @@
 import collections
+import copy
 import functools
 import itertools
 import multiprocessing
+import sys
+import time
 
 import gym
 import numpy as np
 import pytest
 
 from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecFrameStack, VecNormalize
+from stable_baselines3.common.vec_env import (
+    AsyncSubprocVecEnv,
+    DummyVecEnv,
+    StackedDictObservations,
+    StackedObservations,
+    SubprocVecEnv,
+    VecFrameStack,
+    VecNormalize,
+)
+from stable_baselines3.common.vec_env.subproc_vec_env import _SharedMemoryBuffers
 
 N_ENVS = 3
-VEC_ENV_CLASSES = [DummyVecEnv, SubprocVecEnv]
+THREADED_VEC_ENV = functools.partial(DummyVecEnv, n_threads=2, copy_infos=False)
+VEC_ENV_CLASSES = [DummyVecEnv, THREADED_VEC_ENV, SubprocVecEnv, AsyncSubprocVecEnv]
+SHARED_MEMORY_VEC_ENV = functools.partial(SubprocVecEnv, shared_memory=True)
+requires_shared_memory = pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+MULTI_ENV_WORKER_VEC_ENV = functools.partial(SubprocVecEnv, n_envs_per_worker=2)
 VEC_ENV_WRAPPERS = [None, VecNormalize, VecFrameStack]
 
 
@@ -60,7 +76,7 @@ class CustomGymEnv(gym.Env):
         return np.ones((dim_0, dim_1))
 
 
-@pytest.mark.parametrize("vec_env_class", VEC_ENV_CLASSES)
+@pytest.mark.parametrize("vec_env_class", VEC_ENV_CLASSES + [MULTI_ENV_WORKER_VEC_ENV])
 @pytest.mark.parametrize("vec_env_wrapper", VEC_ENV_WRAPPERS)
 def test_vecenv_custom_calls(vec_env_class, vec_env_wrapper):
     """Test access to methods/attributes of vectorized environments"""
@@ -151,7 +167,35 @@ class StepEnv(gym.Env):
         return np.array([prev_step], dtype="int"), 0.0, done, {}
 
 
-@pytest.mark.parametrize("vec_env_class", VEC_ENV_CLASSES)
+class SameInfoStepEnv(StepEnv):
+    def __init__(self, max_steps):
+        super().__init__(max_steps)
+        self.info = {"step_info": [0]}
+
+    def step(self, action):
+        obs, reward, done, _ = super().step(action)
+        return obs, reward, done, self.info
+
+
+@pytest.mark.parametrize("copy_infos", [False, True])
+def test_dummy_vec_env_infos_not_shared(copy_infos):
+    vec_env = DummyVecEnv([lambda: SameInfoStepEnv(2)], copy_infos=copy_infos)
+    vec_env.reset()
+    infos = [vec_env.step(np.array([0]))[3][0] for _ in range(2)]
+    env_info = vec_env.envs[0].info
+    # Fresh dict at every step, the dict of the environment is not modified
+    assert infos[0] is not infos[1] and all(info is not env_info for info in infos)
+    assert "terminal_observation" in infos[1] and env_info.keys() == {"step_info"}
+    # The values are only copied with copy_infos=True
+    assert (infos[0]["step_info"] is env_info["step_info"]) != copy_infos
+    vec_env.close()
+
+
+@pytest.mark.parametrize(
+    "vec_env_class",
+    VEC_ENV_CLASSES
+    + [pytest.param(SHARED_MEMORY_VEC_ENV, marks=requires_shared_memory), MULTI_ENV_WORKER_VEC_ENV],
+)
 @pytest.mark.parametrize("vec_env_wrapper", VEC_ENV_WRAPPERS)
 def test_vecenv_terminal_obs(vec_env_class, vec_env_wrapper):
     """Test that 'terminal_observation' gets added to info dict upon
@@ -279,6 +323,166 @@ def test_vecenv_tuple_spaces(vec_env_class):
     return check_vecenv_spaces(vec_env_class, space, obs_assert)
 
 
+@requires_shared_memory
+@pytest.mark.parametrize(
+    "space", list(SPACES.values()) + [_UnorderedDictSpace(SPACES), gym.spaces.Tuple(tuple(SPACES.values()))]
+)
+def test_subproc_shared_memory(space):
+    """Test that observations written in shared memory are the ones of the environments."""
+
+    def obs_assert(obs):
+        if isinstance(space, gym.spaces.Dict):
+            assert isinstance(obs, collections.OrderedDict)
+            for key, values in obs.items():
+                check_vecenv_obs(values, space.spaces[key])
+        elif isinstance(space, gym.spaces.Tuple):
+            assert isinstance(obs, tuple)
+            for values, inner_space in zip(obs, space.spaces):
+                check_vecenv_obs(values, inner_space)
+        else:
+            check_vecenv_obs(obs, space)
+
+    check_vecenv_spaces(SHARED_MEMORY_VEC_ENV, space, obs_assert)
+
+
+@requires_shared_memory
+def test_shared_memory_attach_untracked(monkeypatch):
+    """The workers attach to the blocks without registering them with the resource tracker of the parent."""
+    from multiprocessing import resource_tracker
+
+    parent_buffers = _SharedMemoryBuffers(gym.spaces.Box(-1, 1, (3,)), 2)
+    registered = []
+    monkeypatch.setattr(resource_tracker, "register", lambda name, rtype: registered.append(name))
+    worker_buffers = _SharedMemoryBuffers(gym.spaces.Box(-1, 1, (3,)), 2, parent_buffers.names)
+    assert registered == []
+    worker_buffers.obs[None][1] = 0.5
+    assert np.all(parent_buffers.obs[None][1] == 0.5)
+    worker_buffers.close()
+    parent_buffers.close(unlink=True)
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 8), reason="Shared memory is available")
+def test_shared_memory_unavailable():
+    with pytest.raises(ImportError):
+        SubprocVecEnv([lambda: gym.make("CartPole-v1")], shared_memory=True)
+
+
+@pytest.mark.parametrize("shared_memory", [False, pytest.param(True, marks=requires_shared_memory)])
+def test_subproc_n_envs_per_worker(shared_memory):
+    """Test that the envs hosted by the same worker keep their order."""
+    step_nums = [2, 3, 4, 5, 6]
+    vec_env = SubprocVecEnv(
+        [functools.partial(StepEnv, n) for n in step_nums], shared_memory=shared_memory, n_envs_per_worker=2
+    )
+    assert len(vec_env.processes) == 3
+    assert vec_env.get_attr("max_steps") == step_nums
+    assert vec_env.get_attr("max_steps", indices=[4, 1, 0, -2]) == [6, 3, 2, 5]
+
+    vec_env.reset()
+    for step_num in range(1, max(step_nums) + 1):
+        obs, _, dones, infos = vec_env.step(np.zeros(len(step_nums), dtype="int"))
+        current_steps = step_num % np.array(step_nums)
+        assert np.all(dones == (current_steps == 0))
+        # Observation before the step, or first observation after a reset
+        assert np.all(obs[:, 0] == np.where(dones, 0, current_steps - 1))
+        for info, done in zip(infos, dones):
+            assert ("terminal_observation" in info) == done
+    vec_env.close()
+
+
+def test_subproc_static_attributes_and_parent_methods():
+    def make_env():
+        return CustomGymEnv(gym.spaces.Box(low=np.zeros(2), high=np.ones(2)))
+
+    vec_env = SubprocVecEnv(
+        [make_env for _ in range(N_ENVS)], static_attributes=["ep_length"], parent_methods={"custom_method": np.zeros}
+    )
+    assert vec_env.get_attr("ep_length") == [4] * N_ENVS
+    # Changed in the workers without going through set_attr(): the memoized values are returned
+    vec_env.remotes[0].send(("set_attr", ([0], ("ep_length", 10))))
+    vec_env.remotes[0].recv()
+    assert vec_env.get_attr("current_step", indices=[0]) == [0]
+    assert vec_env.get_attr("ep_length") == [4] * N_ENVS
+    # set_attr() and env_method() invalidate the memoized values of the environments they target
+    vec_env.set_attr("ep_length", 7, indices=[1])
+    assert vec_env.get_attr("ep_length") == [4, 7, 4]
+    vec_env.env_method("__setattr__", "ep_length", 8, indices=[-1])
+    assert vec_env.get_attr("ep_length", indices=[-1, 1, 0]) == [8, 7, 4]
+
+    # The memoized values are copied
+    vec_env.static_attributes.add("metadata")
+    vec_env.get_attr("metadata")[0]["render.modes"] = ["modified"]
+    assert vec_env.get_attr("metadata")[0]["render.modes"] != ["modified"]
+
+    # Registered methods run in the main process
+    results = vec_env.env_method("custom_method", (1, 3), indices=[0, 1])
+    assert len(results) == 2 and all(result.shape == (1, 3) and not result.any() for result in results)
+    vec_env.register_parent_method("custom_method", np.full)
+    assert vec_env.env_method("custom_method", 2, 5)[0].tolist() == [5, 5]
+    vec_env.close()
+
+
+class SlowStepEnv(StepEnv):
+    def __init__(self, max_steps, step_time):
+        super().__init__(max_steps)
+        self.step_time = step_time
+
+    def step(self, action):
+        time.sleep(self.step_time)
+        return super().step(action)
+
+
+@pytest.mark.parametrize("shared_memory", [False, pytest.param(True, marks=requires_shared_memory)])
+def test_async_subproc_vec_env(shared_memory):
+    """Test that the environments ready first are returned without waiting for the slow one."""
+    vec_env = AsyncSubprocVecEnv(
+        [functools.partial(SlowStepEnv, 100, step_time) for step_time in [0.0, 3.0, 0.0]],
+        shared_memory=shared_memory,
+        n_ready=2,
+    )
+    obs = vec_env.reset()
+    assert obs.shape == (3, 1)
+
+    vec_env.step_async(np.zeros(3, dtype="int"))
+    env_indices, obs, rewards, dones, infos = vec_env.step_wait_any()
+    assert list(env_indices) == [0, 2]
+    assert obs.shape == (2, 1) and rewards.shape == (2,) and dones.shape == (2,) and len(infos) == 2
+
+    # The fast environments keep stepping while the slow one is busy
+    for step_num in range(2, 5):
+        vec_env.step_async_indices(np.zeros(2, dtype="int"), indices=env_indices)
+        env_indices, obs, _, _, _ = vec_env.step_wait_any(timeout=1.0)
+        assert list(env_indices) == [0, 2]
+        assert np.all(obs[:, 0] == step_num - 1)
+
+    # The slow environment is still busy
+    with pytest.raises(AssertionError):
+        vec_env.step_async_indices(np.zeros(1, dtype="int"), indices=[1])
+    env_indices, obs, _, _, _ = vec_env.step_wait_any(n_ready=1)
+    assert list(env_indices) == [1]
+    assert obs[0, 0] == 0
+
+    # step_wait() cannot wait for a partial step
+    vec_env.step_async_indices(np.zeros(2, dtype="int"), indices=[0, 2])
+    with pytest.raises(AssertionError):
+        vec_env.step_wait()
+    vec_env.close()
+
+
+def test_async_subproc_vec_env_timeout():
+    """Test that the timeout bounds the whole call, and not each wait for a worker."""
+    vec_env = AsyncSubprocVecEnv([functools.partial(SlowStepEnv, 100, step_time) for step_time in [0.3, 0.6, 0.9]])
+    vec_env.reset()
+    vec_env.step_async(np.zeros(3, dtype="int"))
+    start_time = time.monotonic()
+    env_indices, _, _, _, _ = vec_env.step_wait_any(n_ready=3, timeout=0.4)
+    assert time.monotonic() - start_time < 0.7
+    assert list(env_indices) == [0]
+    env_indices, _, _, _, _ = vec_env.step_wait_any(n_ready=2)
+    assert list(env_indices) == [1, 2]
+    vec_env.close()
+
+
 def test_subproc_start_method():
     start_methods = [None]
     # Only test thread-safe methods. Others may deadlock tests! (gh/428)
@@ -418,6 +622,111 @@ def test_framestack_vecenv():
     vec_env = VecFrameStack(vec_env, n_stack=2)
 
 
+def _roll_frame_stack(stackedobs, observations, dones, infos, stack_dimension):
+    """Reference implementation of the frame stacking, rolling the whole stack at each step."""
+    stack_ax_size = observations.shape[stack_dimension]
+    stackedobs = np.roll(stackedobs, shift=-stack_ax_size, axis=stack_dimension)
+    for i, done in enumerate(dones):
+        if done:
+            old_terminal = infos[i]["terminal_observation"]
+            if stack_dimension == 1:
+                previous_stack = stackedobs[i, :-stack_ax_size, ...]
+            else:
+                previous_stack = stackedobs[i, ..., :-stack_ax_size]
+            infos[i]["terminal_observation"] = np.concatenate((previous_stack, old_terminal), axis=stack_dimension)
+            stackedobs[i] = 0
+    if stack_dimension == 1:
+        stackedobs[:, -stack_ax_size:, ...] = observations
+    else:
+        stackedobs[..., -stack_ax_size:] = observations
+    return stackedobs, infos
+
+
+@pytest.mark.parametrize("channels_order", ["first", "last"])
+@pytest.mark.parametrize("copy_obs", [True, False])
+def test_framestack_ring_buffer(channels_order, copy_obs):
+    """The ring buffer must give the same observations and terminal observations as rolling the stack"""
+    # The terminal observation of channels-first images is concatenated along the height,
+    # which only matches the shape of the other dimensions with two frames
+    n_stack = 2 if channels_order == "first" else 3
+    space = gym.spaces.Box(low=0, high=255, shape=(2, 4, 3), dtype=np.uint8)
+    stacked_obs = StackedObservations(N_ENVS, n_stack, space, channels_order, copy_obs=copy_obs)
+    stack_dimension = 1 if channels_order == "first" else -1
+    rng = np.random.RandomState(0)
+
+    def sample_frames():
+        return rng.randint(0, 256, size=(N_ENVS,) + space.shape).astype(np.uint8)
+
+    frames = sample_frames()
+    _, _, expected, _ = StackedObservations.compute_stacking(N_ENVS, n_stack, space, channels_order)
+    expected, _ = _roll_frame_stack(expected, frames, [], [], stack_dimension)
+    obs = stacked_obs.reset(frames)
+    assert np.array_equal(obs, expected)
+    previous_obs, previous_expected = obs, expected.copy()
+
+    for _ in range(4 * n_stack):
+        frames = sample_frames()
+        dones = rng.rand(N_ENVS) < 0.3
+        infos = [{"terminal_observation": frame} if done else {} for frame, done in zip(sample_frames(), dones)]
+        expected, expected_infos = _roll_frame_stack(expected, frames, dones, copy.deepcopy(infos), stack_dimension)
+        obs, infos = stacked_obs.update(frames, dones, infos)
+        assert np.array_equal(obs, expected)
+        for info, expected_info in zip(infos, expected_infos):
+            assert info.keys() == expected_info.keys()
+            if "terminal_observation" in info:
+                assert np.array_equal(info["terminal_observation"], expected_info["terminal_observation"])
+        # Views on the ring buffer are read-only, copies are not modified by the next steps
+        assert obs.flags.writeable == copy_obs
+        if copy_obs:
+            assert np.array_equal(previous_obs, previous_expected)
+        previous_obs, previous_expected = obs, expected.copy()
+
+
+def test_framestack_dict_ring_buffer():
+    n_stack = 2
+    space = gym.spaces.Dict(
+        {
+            "image": gym.spaces.Box(low=0, high=255, shape=(3, 4, 4), dtype=np.uint8),
+            "vector": gym.spaces.Box(low=-1, high=1, shape=(2,), dtype=np.float32),
+        }
+    )
+    channels_order = {"image": "first", "vector": "last"}
+    stacked_obs = StackedDictObservations(N_ENVS, n_stack, space, channels_order)
+    references = {
+        key: StackedObservations(N_ENVS, n_stack, subspace, channels_order[key]) for key, subspace in space.spaces.items()
+    }
+
+    def sample_frames():
+        return {key: np.stack([subspace.sample() for _ in range(N_ENVS)]) for key, subspace in space.spaces.items()}
+
+    frames = sample_frames()
+    obs = stacked_obs.reset(frames)
+    for key, reference in references.items():
+        assert np.array_equal(obs[key], reference.reset(frames[key]))
+
+    for step in range(3 * n_stack):
+        frames = sample_frames()
+        dones = np.arange(N_ENVS) == step % N_ENVS
+        terminal_frames = sample_frames()
+        infos = [
+            {"terminal_observation": {key: values[i] for key, values in terminal_frames.items()}} if done else {}
+            for i, done in enumerate(dones)
+        ]
+        previous_obs = obs
+        obs, infos = stacked_obs.update(frames, dones, infos)
+        for key, reference in references.items():
+            key_infos = [{"terminal_observation": terminal_frames[key][i]} if done else {} for i, done in enumerate(dones)]
+            expected, _ = reference.update(frames[key], dones, key_infos)
+            assert np.array_equal(obs[key], expected)
+            # The terminal frame replaces the oldest frame, along the channels for images
+            terminal_idx = step % N_ENVS
+            frame_size = space.spaces[key].shape[0]
+            expected_terminal = np.concatenate(
+                (previous_obs[key][terminal_idx, frame_size:], terminal_frames[key][terminal_idx]), axis=0
+            )
+            assert np.array_equal(infos[terminal_idx]["terminal_observation"][key], expected_terminal)
+
+
 def test_vec_env_is_wrapped():
     # Test is_wrapped call of subproc workers
     def make_env():
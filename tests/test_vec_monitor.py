@@ -3,6 +3,7 @@ import os
 import uuid
 
 import gym
+import numpy as np
 import pandas
 import pytest
 
@@ -10,6 +11,7 @@ from stable_baselines3 import PPO
 from stable_baselines3.common.evaluation import evaluate_policy
 from stable_baselines3.common.monitor import Monitor, get_monitor_files, load_results
 from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor, VecNormalize
+from stable_baselines3.common.vec_env.vec_monitor import EPISODE_RECORD_DTYPE, EpisodeRecordBuffer
 
 
 def test_vec_monitor(tmp_path):
@@ -95,6 +97,69 @@ def test_vec_monitor_load_results(tmp_path):
     os.remove(monitor_file2)
 
 
+def test_vec_monitor_episode_records(tmp_path):
+    """
+    The episodes completed at each step are available as a structured array
+    """
+    n_envs = 4
+    env = DummyVecEnv([lambda: gym.make("CartPole-v1") for _ in range(n_envs)])
+    env.seed(0)
+    monitor_file = os.path.join(str(tmp_path), "records.monitor.csv")
+    monitor_env = VecMonitor(env, monitor_file)
+    monitor_env.reset()
+    ep_rewards, ep_lengths = np.zeros(n_envs), np.zeros(n_envs, dtype=int)
+    n_episodes = 0
+    for _ in range(300):
+        _, rewards, dones, infos = monitor_env.step([monitor_env.action_space.sample() for _ in range(n_envs)])
+        ep_rewards += rewards
+        ep_lengths += 1
+        records = monitor_env.episode_records
+        assert np.array_equal(records["env_idx"], np.flatnonzero(dones))
+        for record in records:
+            episode_info = infos[record["env_idx"]]["episode"]
+            assert record["r"] == episode_info["r"] == ep_rewards[record["env_idx"]]
+            assert record["l"] == episode_info["l"] == ep_lengths[record["env_idx"]]
+        for idx in np.flatnonzero(~dones):
+            assert "episode" not in infos[idx]
+        ep_rewards[dones] = 0
+        ep_lengths[dones] = 0
+        n_episodes += len(records)
+
+    monitor_env.close()
+    assert n_episodes > 0
+    assert monitor_env.episode_count == n_episodes
+    assert len(load_results(str(tmp_path))) == n_episodes
+
+
+def test_episode_record_buffer():
+    buffer = EpisodeRecordBuffer(maxlen=5)
+    records = np.zeros(7, dtype=EPISODE_RECORD_DTYPE)
+    records["l"] = np.arange(7)
+    buffer.extend(records[:3])
+    assert len(buffer) == 3 and buffer.records["l"].tolist() == [0, 1, 2]
+    buffer.extend(records[3:7])
+    assert len(buffer) == 5 and buffer.records["l"].tolist() == [2, 3, 4, 5, 6]
+    buffer.extend(records)
+    assert buffer.records["l"].tolist() == [2, 3, 4, 5, 6]
+
+
+def test_vec_monitor_episode_records_logged():
+    """
+    The algorithms read the records of the ``VecMonitor`` instead of the info dicts
+    """
+    env = VecMonitor(DummyVecEnv([lambda: gym.make("CartPole-v1") for _ in range(2)]))
+    model = PPO("MlpPolicy", env, n_steps=64, batch_size=32, n_epochs=1, seed=0)
+    model.learn(256)
+    # The wrapper is resolved once, not at every step
+    assert model._vec_monitor is env
+    records = model.ep_record_buffer.records
+    assert len(records) > 0 and len(model.ep_info_buffer) == 0
+    assert model._get_episode_stats() == (float(records["r"].mean()), float(records["l"].mean()))
+    # The records are not saved with the model, like the info dicts
+    data, _, _ = model._get_save_data()
+    assert "ep_record_buffer" not in data and "ep_info_buffer" not in data and "_vec_monitor" not in data
+
+
 def test_vec_monitor_ppo(recwarn):
     """
     Test the `VecMonitor` with PPO
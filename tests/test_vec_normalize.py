@@ -1,9 +1,11 @@
 import gym
 import numpy as np
 import pytest
+import torch as th
 from gym import spaces
 
 from stable_baselines3 import SAC, TD3, HerReplayBuffer
+from stable_baselines3.common.buffers import ReplayBuffer
 from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.running_mean_std import RunningMeanStd
 from stable_baselines3.common.vec_env import (
@@ -143,6 +145,20 @@ def test_runningmeanstd():
         assert np.allclose(moments_1, moments_2)
 
 
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_runningmeanstd_batched(dtype):
+    """Batches with several leading dimensions are merged at once"""
+    x_1, x_2 = np.random.randn(5, 3, 2), np.random.randn(4, 3, 2)
+    rms = RunningMeanStd(epsilon=0.0, shape=(2,), dtype=dtype)
+    rms.update(x_1)
+    rms.update(x_2)
+
+    x_cat = np.concatenate([x_1, x_2], axis=0).reshape(-1, 2)
+    assert rms.mean.dtype == rms.var.dtype == dtype
+    assert np.allclose(rms.mean, x_cat.mean(axis=0), atol=1e-6)
+    assert np.allclose(rms.var, x_cat.var(axis=0), atol=1e-6)
+
+
 @pytest.mark.parametrize("make_env", [make_env, make_dict_env])
 def test_vec_env(tmp_path, make_env):
     """Test VecNormalize Object"""
@@ -217,6 +233,78 @@ def test_normalize_external():
     assert np.all(norm_rewards < 1)
 
 
+@pytest.mark.parametrize("make_env", [make_env, make_dict_env])
+def test_float32_stats(make_env):
+    venv = VecNormalize(DummyVecEnv([make_env]), stats_dtype=np.float32)
+    venv_64 = VecNormalize(DummyVecEnv([make_env]))
+    venv.seed(0)
+    venv_64.seed(0)
+    venv.reset()
+    venv_64.reset()
+    for _ in range(10):
+        actions = [venv.action_space.sample()]
+        obs, rewards, _, _ = venv.step(actions)
+        obs_64, rewards_64, _, _ = venv_64.step(actions)
+        if not isinstance(obs, dict):
+            # The dict env is not seeded
+            assert np.allclose(obs, obs_64, atol=1e-4)
+            assert np.allclose(rewards, rewards_64, atol=1e-4)
+
+    rms = venv.obs_rms["observation"] if isinstance(venv.obs_rms, dict) else venv.obs_rms
+    assert rms.mean.dtype == rms.var.dtype == np.float32
+    for values in obs.values() if isinstance(obs, dict) else [obs]:
+        assert values.dtype == np.float32
+
+
+@pytest.mark.parametrize("make_env", [make_env, make_dict_env])
+def test_normalize_obs_th(make_env):
+    venv = VecNormalize(DummyVecEnv([make_env]))
+    venv.reset()
+    for _ in range(10):
+        venv.step([venv.action_space.sample()])
+    original_obs = venv.get_original_obs()
+    normalized_obs = venv.normalize_obs(original_obs)
+    normalized_obs_th = venv.normalize_obs_th(original_obs)
+    if isinstance(normalized_obs, dict):
+        for key in normalized_obs.keys():
+            assert isinstance(normalized_obs_th[key], th.Tensor)
+            assert np.allclose(normalized_obs[key], normalized_obs_th[key].numpy(), atol=1e-6)
+    else:
+        assert isinstance(normalized_obs_th, th.Tensor)
+        assert np.allclose(normalized_obs, normalized_obs_th.numpy(), atol=1e-6)
+
+    # The cached statistics are updated with the running statistics
+    venv.step([venv.action_space.sample()])
+    normalized_obs = venv.normalize_obs(original_obs)
+    normalized_obs_th = venv.normalize_obs_th(original_obs)
+    for key, values in normalized_obs.items() if isinstance(normalized_obs, dict) else [(None, normalized_obs)]:
+        values_th = normalized_obs_th if key is None else normalized_obs_th[key]
+        assert np.allclose(values, values_th.numpy(), atol=1e-6)
+
+
+def test_replay_buffer_normalize_on_device():
+    env = VecNormalize(DummyVecEnv([make_env]))
+    buffer = ReplayBuffer(100, env.observation_space, env.action_space)
+    env.reset()
+    for _ in range(50):
+        obs = env.get_original_obs()
+        action = np.array([env.action_space.sample()])
+        _, _, done, info = env.step(action)
+        buffer.add(obs, env.get_original_obs(), action, env.get_original_reward(), done, info)
+
+    batch_inds = np.arange(50)
+    samples = buffer._get_samples(batch_inds, env=env)
+    buffer.normalize_on_device = True
+    samples_th = buffer._get_samples(batch_inds, env=env)
+    assert th.allclose(samples.observations, samples_th.observations, atol=1e-6)
+    assert th.allclose(samples.rewards, samples_th.rewards)
+
+    # Enabled through the replay buffer arguments of the algorithms
+    model = SAC("MlpPolicy", env, learning_starts=50, replay_buffer_kwargs=dict(normalize_on_device=True), seed=0)
+    assert model.replay_buffer.normalize_on_device
+    model.learn(60)
+
+
 @pytest.mark.parametrize("model_class", [SAC, TD3, HerReplayBuffer])
 @pytest.mark.parametrize("online_sampling", [False, True])
 def test_offpolicy_normalization(model_class, online_sampling):